@@ -0,0 +1,317 @@
+"""
+Timing benchmarks for pyClarion agents.
+
+This script builds synthetic NACS agents of configurable size and times agent
+construction, propagation, the NACS activation cycle, response selection and
+activation clearing. Results are written as JSON so that runs made on
+different commits may be compared.
+
+Usage (from the repository root, with pyClarion installed):
+
+    python benchmarks/agent_benchmarks.py --chunks 2000 --output new.json
+    python benchmarks/agent_benchmarks.py --compare old.json new.json
+"""
+
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import pyClarion
+from pyClarion import *
+
+
+########################
+### Synthetic Agents ###
+########################
+
+
+NACS = Subsystem("NACS")
+RULES = Flow("Associative Rules", ftype=FlowType.TT)
+TOP_DOWN = Flow("Top Down", ftype=FlowType.TB)
+BOTTOM_UP = Flow("Bottom Up", ftype=FlowType.BT)
+RESPONSE = Response("Output", itype=ConstructType.Chunk)
+BEHAVIOR = Behavior("Report", response=RESPONSE)
+
+
+def make_layers(chunks, features):
+    """
+    Return chunk and feature layer symbols.
+    
+    Node layers are looked up at run time, so that the script still runs on 
+    revisions without them when --layers is not passed.
+    """
+
+    Layer = getattr(pyClarion, "Layer", None)
+    if Layer is None:
+        raise SystemExit("--layers requires node layer support.")
+    return Layer("Chunks", chunks), Layer("Features", features)
+
+
+def default_strength(node=None):
+
+    return 0.0
+
+
+def make_buffers(n_buffers):
+
+    return [Buffer(("Stimulus", i), outputs=(NACS,)) for i in range(n_buffers)]
+
+
+def make_synthetic_agent(
+    chunks, features, dims, rules, links, buffers, layers=False, seed=0
+):
+    """
+    Return a ready NACS agent with randomly generated knowledge.
+
+    :param chunks: Number of chunk nodes.
+    :param features: Number of feature nodes.
+    :param dims: Number of feature dimensions.
+    :param rules: Number of associative rules.
+    :param links: Number of interlevel chunk-feature links.
+    :param buffers: Number of stimulus buffers.
+    :param layers: If true, realize chunk and feature nodes with one node 
+        layer each instead of one node realizer per node.
+    :param seed: Seed for knowledge generation.
+    """
+
+    rng = random.Random(seed)
+    chunk_symbols = [Chunk(i) for i in range(chunks)]
+    feature_symbols = [Feature(i % dims, i) for i in range(features)]
+
+    if layers:
+        chunk_layer, feature_layer = make_layers(
+            chunk_symbols, feature_symbols
+        )
+        nodes = [chunk_layer, feature_layer]
+    else:
+        nodes = chunk_symbols + feature_symbols
+    agent = make_agent(
+        csym=Agent("Benchmark"),
+        subsystems={
+            NACS: nodes + [
+                RULES, TOP_DOWN, BOTTOM_UP, RESPONSE, BEHAVIOR
+            ]
+        },
+        buffers=make_buffers(buffers)
+    )
+
+    for buffer in agent.buffers:
+        agent[buffer].source = ConstantSource()
+    agent[NACS].propagation_rule = nacs_propagation_cycle
+
+    assoc = {}
+    for _ in range(rules):
+        conc, cond = rng.sample(chunk_symbols, 2)
+        assoc.setdefault(conc, []).append({cond: rng.random()})
+    agent[NACS, RULES].junction = SimpleJunction()
+    agent[NACS, RULES].channel = AssociativeRuleCollection(
+        assoc=assoc, default_strength=default_strength
+    )
+
+    interlevel = {}
+    for _ in range(links):
+        chunk, feature = rng.choice(chunk_symbols), rng.choice(feature_symbols)
+        dim_dict = interlevel.setdefault(chunk, {})
+        weight, mfs = dim_dict.setdefault(feature.cid.dim, (1., set()))
+        mfs.add(feature)
+    agent[NACS, TOP_DOWN].junction = SimpleJunction()
+    agent[NACS, TOP_DOWN].channel = TopDownLinks(
+        assoc=interlevel, default_strength=default_strength
+    )
+    agent[NACS, BOTTOM_UP].junction = SimpleJunction()
+    agent[NACS, BOTTOM_UP].channel = BottomUpLinks(
+        assoc=interlevel, default_strength=default_strength
+    )
+
+    if layers:
+        agent[NACS, chunk_layer].junction = pyClarion.NodeLayerJunction(
+            chunk_symbols, default_strength
+        )
+        agent[NACS, feature_layer].junction = pyClarion.NodeLayerJunction(
+            feature_symbols, default_strength
+        )
+    else:
+        for node, realizer in agent[NACS].items_ctype(ConstructType.Node):
+            realizer.junction = SimpleNodeJunction(node, default_strength)
+    agent[NACS, RESPONSE].junction = SimpleJunction()
+    agent[NACS, RESPONSE].selector = BoltzmannSelector(temperature=.1)
+    agent[NACS, BEHAVIOR].effector = MappingEffector(
+        chunk2callback={chunk: lambda: None for chunk in chunk_symbols}
+    )
+
+    assert agent.ready()
+    return agent
+
+
+def present_stimulus(agent, active, seed=0):
+    """Activate a random sample of chunks through each stimulus buffer."""
+
+    rng = random.Random(seed)
+    chunks = []
+    chunk_layer = getattr(
+        ConstructType, "ChunkLayer", ConstructType.NullConstruct
+    )
+    for csym in agent[NACS].iter_ctype(ConstructType.Chunk | chunk_layer):
+        chunks.extend(csym.cid.nodes if csym.ctype == chunk_layer else (csym,))
+    for buffer in agent.buffers:
+        agent[buffer].source.update(
+            {chunk: 1. for chunk in rng.sample(chunks, active)}
+        )
+
+
+##################
+### Benchmarks ###
+##################
+
+
+def time_call(func, repeat, setup=None):
+    """Return timing summary (in seconds) of repeated calls to func."""
+
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "max": max(times),
+        "repeat": repeat
+    }
+
+
+def run_benchmarks(config):
+    """Run all benchmarks for given configuration and return results."""
+
+    repeat = config["repeat"]
+    size = {
+        key: config[key]
+        for key in (
+            "chunks", "features", "dims", "rules", "links", "buffers", 
+            "layers"
+        )
+    }
+    agent = make_synthetic_agent(**size)
+    present_stimulus(agent, config["active"])
+    agent.propagate()
+    strengths = agent[NACS, RESPONSE].junction(
+        agent[NACS, RESPONSE].input.pull()
+    )
+    selector = agent[NACS, RESPONSE].selector
+
+    results = {}
+    results["make_agent"] = time_call(
+        lambda: make_synthetic_agent(**size), max(1, repeat // 5)
+    )
+    results["propagate"] = time_call(
+        agent.propagate, repeat, setup=agent.clear_activations
+    )
+    results["nacs_propagation_cycle"] = time_call(
+        lambda: nacs_propagation_cycle(agent[NACS]), repeat
+    )
+    results["selector"] = time_call(lambda: selector(strengths), repeat)
+    results["clear_activations"] = time_call(
+        agent.clear_activations, repeat, setup=agent.propagate
+    )
+    return results
+
+
+def get_metadata():
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL, universal_newlines=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def compare(old_path, new_path):
+    """Print median timing ratios (new / old) for two result files."""
+
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    if old["config"] != new["config"]:
+        print("Warning: benchmark configurations differ.", file=sys.stderr)
+    print(
+        "{:<24} {:>12} {:>12} {:>8}".format("benchmark", "old", "new", "ratio")
+    )
+    for name, new_result in new["results"].items():
+        old_result = old["results"].get(name)
+        if old_result is None:
+            continue
+        ratio = new_result["median"] / old_result["median"]
+        print(
+            "{:<24} {:>12.6f} {:>12.6f} {:>8.3f}".format(
+                name, old_result["median"], new_result["median"], ratio
+            )
+        )
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--chunks", type=int, default=1000)
+    parser.add_argument("--features", type=int, default=1000)
+    parser.add_argument("--dims", type=int, default=50)
+    parser.add_argument("--rules", type=int, default=2000)
+    parser.add_argument("--links", type=int, default=3000)
+    parser.add_argument("--buffers", type=int, default=1)
+    parser.add_argument(
+        "--active", type=int, default=10,
+        help="number of chunks activated by each buffer"
+    )
+    parser.add_argument(
+        "--layers", action="store_true",
+        help="realize nodes with node layers instead of one realizer per node"
+    )
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output", help="path of JSON result file")
+    parser.add_argument(
+        "--compare", nargs=2, metavar=("OLD", "NEW"),
+        help="compare two result files instead of running benchmarks"
+    )
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    config = {
+        key: getattr(args, key) for key in (
+            "chunks", "features", "dims", "rules", "links", "buffers",
+            "layers", "active", "repeat"
+        )
+    }
+    report = {
+        "meta": get_metadata(),
+        "config": config,
+        "results": run_benchmarks(config)
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
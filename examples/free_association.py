@@ -115,6 +115,12 @@ behavior = Behavior("Report Associations", response=response)
 nacs = Subsystem("NACS")
 stimulus = Buffer("Stimulus", outputs=(Subsystem("NACS"),))
 
+# Nodes missing from activation packets are taken to be at their default 
+# strength. We declare the default once for the whole agent; node junctions and 
+# response selectors fall back on it.
+
+alice.default_strength = default_strength
+
 # We begin by setting up the stimulus buffer. ConstantSource simply stores an 
 # activation pattern and outputs it every propagation cycle. The stored pattern 
 # may be modified over the course of a simulation.
@@ -181,13 +187,15 @@ alice[nacs, bottom_up_links].channel = BottomUpLinks(
     default_strength=default_strength
 )
 
-# Note that top down and bottom up links in this simulation share the same assoc 
-# dict.
+# Note that top down and bottom up links in this simulation share the same assoc. 
+# Channels given the same assoc dict share one InterlevelLinks wrapper, which 
+# reports changes made through it (e.g., assigning links to a new chunk) to 
+# both flows.
 
 # Now we define the behavior of individual nodes (chunks and features). 
 
 for node, realizer in alice[nacs].items_ctype(ConstructType.Node):
-    realizer.junction = SimpleNodeJunction(node, default_strength)
+    realizer.junction = SimpleNodeJunction(node)
 
 # Node junctions determine the final output of a node given recommendations 
 # from various afferent flows.
@@ -351,14 +359,11 @@ class HeavyHandedLearningRoutine(object):
         # Add orange chunk node and orange color feature to NACS
         self.nacs.insert_realizers(
             NodeRealizer(
-                Chunk("ORANGE"), 
-                SimpleNodeJunction(Chunk("ORANGE"), default_strength)
+                Chunk("ORANGE"), SimpleNodeJunction(Chunk("ORANGE"))
             ),
             NodeRealizer(
                 Feature("color", "#ffa500"), 
-                SimpleNodeJunction(
-                    Feature("color", "#ffa500"), default_strength
-                )
+                SimpleNodeJunction(Feature("color", "#ffa500"))
             )    
         )
 
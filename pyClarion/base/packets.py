@@ -1,12 +1,18 @@
 """Tools for representing information about node strengths and decisions."""
 
 
-from typing import Any, Mapping, Collection, Tuple, NamedTuple, Union, cast 
+from typing import (
+    Any, Mapping, Collection, Tuple, NamedTuple, Union, Iterator, Sequence, 
+    cast
+)
 from types import MappingProxyType
-from pyClarion.base.symbols import ConstructSymbol, ConstructType
+from array import array
+from itertools import islice
+from collections.abc import ItemsView
+from pyClarion.base.symbols import ConstructSymbol, ConstructType, SymbolIndex
 
 
-__all__ = ["ActivationPacket", "DecisionPacket"]
+__all__ = ["ActivationPacket", "DecisionPacket", "ArrayStrengths"]
 
 
 ####################
@@ -23,6 +29,110 @@ ConstructSymbolCollection = Collection[ConstructSymbol]
 ###################
 
 
+class ArrayStrengths(Mapping[ConstructSymbol, float]):
+    """
+    Represents node strengths as a contiguous float array.
+
+    Implements the read-only mapping interface over a shared symbol index. 
+    Keys are the first len(data) symbols of the index, in index order; the 
+    value of each key is stored at its index position. Multiple instances may 
+    share one index, in which case they may be combined elementwise without 
+    per-key lookups.
+
+    Instances should be treated as immutable: the data array must not be 
+    modified once the mapping has been emitted in a packet.
+
+    :param index: Symbol index giving the position of each node.
+    :param data: Array of strengths, one for each leading index position.
+    """
+
+    __slots__ = ("index", "data")
+
+    def __init__(self, index: SymbolIndex, data: Sequence[float]) -> None:
+
+        if len(data) > len(index):
+            raise ValueError(
+                "Got {} strengths for index of length {}.".format(
+                    len(data), len(index)
+                )
+            )
+        self.index = index
+        self.data = data
+
+    def __repr__(self) -> str:
+
+        return "{}({})".format(type(self).__name__, dict(self.items()))
+
+    def __getitem__(self, csym: ConstructSymbol) -> float:
+
+        i = self.index.get(csym)
+        if i is None or i >= len(self.data):
+            raise KeyError(csym)
+        return self.data[i]
+
+    def __iter__(self) -> Iterator[ConstructSymbol]:
+
+        return islice(self.index, len(self.data))
+
+    def __len__(self) -> int:
+
+        return len(self.data)
+
+    def __contains__(self, csym: object) -> bool:
+
+        i = self.index.get(cast(ConstructSymbol, csym))
+        return i is not None and i < len(self.data)
+
+    def get(self, csym: ConstructSymbol, default: Any = None) -> Any:
+
+        i = self.index.get(csym)
+        if i is None or i >= len(self.data):
+            return default
+        return self.data[i]
+
+    def items(self) -> ItemsView:
+
+        return _ArrayStrengthsItems(self)
+
+    @classmethod
+    def from_mapping(
+        cls, 
+        index: SymbolIndex, 
+        strengths: Mapping[ConstructSymbol, float], 
+        default: float = 0.0
+    ) -> 'ArrayStrengths':
+        """
+        Pack a mapping of strengths over given index.
+        
+        Symbols in strengths are added to index if necessary. Indexed symbols 
+        absent from strengths are given the default strength.
+        """
+
+        index.extend(strengths)
+        data = array('d', [default]) * len(index)
+        for csym, s in strengths.items():
+            data[index[csym]] = s
+        return cls(index, data)
+
+    def aligned(self, other: Any) -> bool:
+        """Return true iff other covers the same index positions as self."""
+
+        return (
+            isinstance(other, ArrayStrengths) and 
+            other.index is self.index and 
+            len(other.data) == len(self.data)
+        )
+
+
+class _ArrayStrengthsItems(ItemsView):
+    """Items view of array strengths, iterating without key lookups."""
+
+    def __iter__(self) -> Iterator[Tuple[ConstructSymbol, float]]:
+
+        strengths = cast(ArrayStrengths, self._mapping)
+        return zip(strengths.index, strengths.data)
+
+
 class ActivationPacket(NamedTuple):
     """
     Represents node strengths.
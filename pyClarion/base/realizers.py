@@ -24,13 +24,18 @@ from typing import (
     Type, Dict, Tuple, Iterator, Hashable, List, Mapping, Sequence, cast
 )
 from operator import getitem, setitem, delitem
+from concurrent.futures import Executor, ProcessPoolExecutor
+from inspect import isawaitable
+import asyncio
+from itertools import chain
+from functools import partial
 from pyClarion.base.symbols import (
     ConstructSymbol, ConstructType, FlowType, FlowID, ResponseID, BehaviorID, 
-    BufferID
+    BufferID, LayerID
 )
 from pyClarion.base.packets import (
     ConstructSymbolMapping, ActivationPacket, DecisionPacket, 
-    ConstructSymbolCollection
+    ConstructSymbolCollection, ArrayStrengths
 )
 
 
@@ -57,7 +62,8 @@ Selector = Callable[
     [ConstructSymbolMapping], 
     Tuple[ConstructSymbolMapping, ConstructSymbolCollection]
 ]
-Effector = Callable[[DecisionPacket], None]
+Effector = Callable[[DecisionPacket], Any]
+DefaultStrength = Callable[[ConstructSymbol], Any]
 Source = Callable[[], ConstructSymbolMapping]
 
 # Types used by ContainerConstructRealizer instances
@@ -77,9 +83,40 @@ HasOutput = Union[
     'NodeRealizer', 'FlowRealizer', 'ResponseRealizer', 'BufferRealizer', 
 ]
 PropagationRule = Callable[['SubsystemRealizer'], None]
-Updater = Callable[[], None]
+PropagationStage = Callable[[ConstructSymbol], bool]
+PropagationStages = Tuple[PropagationStage, ...]
+PropagationPlan = Tuple[Tuple[Callable[[], None], ...], ...]
+LazyPlan = Tuple[
+    List[ConstructSymbol], 
+    List[List[Tuple[ConstructSymbol, Optional[int]]]], 
+    Dict[ConstructSymbol, int]
+]
+Updater = Callable[[], Any]
 UpdaterList = List[Updater]
 UpdaterIterable = Iterable[Callable[[], None]]
+BucketKey = Hashable
+BucketKeys = Iterable[BucketKey]
+
+
+# Basic flag values, used for bucketing container members
+
+_BASIC_CTYPES = (
+    ConstructType.Feature, ConstructType.Chunk, ConstructType.Flow, 
+    ConstructType.Response, ConstructType.Behavior, ConstructType.Buffer, 
+    ConstructType.Subsystem, ConstructType.Agent
+)
+_BASIC_FLOW_TYPES = (FlowType.TT, FlowType.BB, FlowType.TB, FlowType.BT)
+_NODE_CTYPES = (ConstructType.Feature, ConstructType.Chunk)
+
+
+def _node_ctype(ctype: ConstructType) -> ConstructType:
+    """Return construct type of layer nodes for layer types, else ctype."""
+
+    if ctype == ConstructType.FeatureLayer:
+        return ConstructType.Feature
+    elif ctype == ConstructType.ChunkLayer:
+        return ConstructType.Chunk
+    return ctype
 
 
 ######################
@@ -93,33 +130,84 @@ UpdaterIterable = Iterable[Callable[[], None]]
 
 
 class InputMonitor(object):
-    """Listens for basic construct realizer outputs."""
+    """
+    Listens for basic construct realizer outputs.
+
+    If self.keys is set, the client is assumed to only read strengths of the 
+    nodes in self.keys from input packets (e.g., node realizers). Change 
+    tracking then only considers those strengths.
+    """
+
+    tolerance: float = 0.
 
-    def __init__(self) -> None:
+    def __init__(
+        self, keys: Optional[Sequence[ConstructSymbol]] = None
+    ) -> None:
 
         self.input_links: InputMapping = {}
+        self.keys = keys
+        self._pulled: Dict[ConstructSymbol, Optional[Packet]] = {}
 
     def pull(self) -> PacketIterable:
         """Pull activations from input constructs."""
 
-        for view in self.input_links.values():
-            v = view()
+        pulled = self._pulled
+        for csym, view in self.input_links.items():
+            v = pulled[csym] = view()
             if v is not None: 
                 yield v
 
+    def changed(self) -> bool:
+        """
+        Return true iff an input strength changed since the last pull.
+        
+        Input strengths are compared with those of the packets last pulled, 
+        and count as changed if they differ by more than self.tolerance. Only 
+        strengths of nodes in self.keys are compared if it is set. Inputs that 
+        emitted no new packet are skipped without comparing strengths.
+        """
+
+        pulled = self._pulled
+        if len(pulled) != len(self.input_links):
+            return True
+        keys, tolerance = self.keys, self.tolerance
+        for csym, view in self.input_links.items():
+            if csym not in pulled:
+                return True
+            old, new = pulled[csym], view()
+            if new is old:
+                continue
+            if old is None or new is None:
+                return True
+            if _strengths_differ(
+                old.strengths, new.strengths, keys, tolerance
+            ):
+                return True
+        return False
+
     def watch(self, csym: ConstructSymbol, pull_method: PullMethod) -> None:
         """Connect given construct as input to client."""
 
         self.input_links[csym] = pull_method
+        self._pulled.pop(csym, None)
 
     def drop(self, csym: ConstructSymbol):
         """Disconnect given construct from client."""
 
         del self.input_links[csym]
+        self._pulled.pop(csym, None)
 
 
 class OutputView(object):
-    """Exposes outputs of basic construct realizers."""
+    """
+    Exposes outputs of basic construct realizers.
+    
+    If self.demand is set, it is called before each view, giving lazy 
+    subsystems a chance to bring the output up to date (see 
+    SubsystemRealizer.lazy).
+    """
+
+    demand: Optional[Callable[[], None]] = None
 
     def update(self, packet: Packet) -> None:
         """Update reported output of client construct."""
@@ -129,6 +217,8 @@ class OutputView(object):
     def view(self) -> Optional[Packet]:
         """Emit current output of client construct."""
         
+        if self.demand is not None:
+            self.demand()
         try:
             return self._buffer
         except AttributeError:
@@ -140,6 +230,90 @@ class OutputView(object):
         del self._buffer       
 
 
+def _set_output(realizer: Any, packet: Optional[Packet]) -> None:
+    """Set output of realizer to packet, clearing it if packet is None."""
+
+    if packet is not None:
+        realizer.output.update(packet)
+    elif realizer.output.view() is not None:
+        realizer.output.clear()
+
+
+def _strengths_differ(
+    old: ConstructSymbolMapping, 
+    new: ConstructSymbolMapping, 
+    keys: Optional[Sequence[ConstructSymbol]], 
+    tolerance: float
+) -> bool:
+    """
+    Return true iff a strength differs by more than tolerance between mappings.
+
+    If keys is given, only strengths of keys are compared. Otherwise, mappings 
+    with differing keys count as differing.
+    """
+
+    if keys is not None:
+        for key in keys:
+            a, b = old.get(key), new.get(key)
+            if a is b or a == b:
+                continue
+            if a is None or b is None or abs(b - a) > tolerance:
+                return True
+        return False
+    if isinstance(new, ArrayStrengths) and new.aligned(old):
+        a_data, b_data = cast(ArrayStrengths, old).data, new.data
+        if not tolerance:
+            return a_data != b_data
+        return any(abs(b - a) > tolerance for a, b in zip(a_data, b_data))
+    if not tolerance:
+        return old != new
+    if len(old) != len(new):
+        return True
+    for key, b in new.items():
+        a = old.get(key)
+        if a is None or abs(b - a) > tolerance:
+            return True
+    return False
+
+
+def _within_tolerance(
+    previous: Sequence[Optional[Packet]], 
+    current: Sequence[Optional[Packet]], 
+    tolerance: float
+) -> bool:
+    """
+    Return true iff no strength changed by tolerance or more between packets.
+    
+    Packets are compared pairwise. Identical packets are skipped, aligned array 
+    strengths are compared elementwise and other strength mappings are 
+    compared in iteration order; mappings with differing keys count as 
+    changed. Returns at the first change found.
+    """
+
+    for old, new in zip(previous, current):
+        if new is old:
+            continue
+        if old is None or new is None:
+            return False
+        old_s, new_s = old.strengths, new.strengths
+        if isinstance(new_s, ArrayStrengths) and new_s.aligned(old_s):
+            pairs: Iterable = zip(
+                cast(ArrayStrengths, old_s).data, new_s.data
+            )
+        elif len(old_s) == len(new_s):
+            pairs = []
+            for (k_old, a), (k_new, b) in zip(old_s.items(), new_s.items()):
+                if k_old != k_new:
+                    return False
+                pairs.append((a, b))
+        else:
+            return False
+        for a, b in pairs:
+            if abs(b - a) >= tolerance:
+                return False
+    return True
+
+
 class SubsystemInputMonitor(object):
     """Listens for buffer outputs."""
 
@@ -244,10 +418,25 @@ class ConstructRealizer(object):
     
     
 class BasicConstructRealizer(ConstructRealizer):
-    """Base class for basic construct realizers."""
+    """
+    Base class for basic construct realizers.
+
+    When self.incremental is true, realizers with both inputs and outputs skip 
+    propagation if no input strength they read changed since their last 
+    propagation (see InputMonitor.changed()). This assumes that realizer 
+    components are pure functions of their inputs; after modifying components 
+    (e.g., during learning), clear activations to force recomputation.
+
+    If self.default_strength is set (usually agent-wide, see 
+    ContainerConstructRealizer.default_strength), node junctions and response 
+    selectors are called with it as a `default_strength` keyword argument and 
+    resolve strengths missing from their inputs with it.
+    """
 
     itype: Optional[Type] = InputMonitor
     otype: Optional[Type] = OutputView
+    incremental: bool = False
+    default_strength: Optional[DefaultStrength] = None
 
     def __init__(self, csym: ConstructSymbol) -> None:
 
@@ -267,10 +456,28 @@ class BasicConstructRealizer(ConstructRealizer):
         except AttributeError:
             pass
 
+    def _is_current(self) -> bool:
+        """Return true iff incremental and output reflects current inputs."""
+
+        return (
+            self.incremental and 
+            self.output.view() is not None and 
+            not self.input.changed()
+        )
+
 
 class NodeRealizer(BasicConstructRealizer):
+    """
+    Realizer for node constructs.
+    
+    Also realizes node layers (see `Layer()`), in which case the junction 
+    outputs strengths of all layer nodes.
+
+    Junctions are assumed to only read input strengths of client nodes, so 
+    incremental node realizers only recompute when those strengths change.
+    """
 
-    ctype = ConstructType.Node
+    ctype = ConstructType.Node | ConstructType.Layer
     __slots__ = ('junction',)
 
     def __init__(
@@ -278,13 +485,24 @@ class NodeRealizer(BasicConstructRealizer):
     ) -> None:
 
         super().__init__(csym)
+        if csym.ctype in ConstructType.Layer:
+            self.input.keys = cast(LayerID, csym.cid).nodes
+        else:
+            self.input.keys = (csym,)
         if junction is not None: 
             self.junction = junction
 
     def propagate(self) -> None:
         """Output current strength of node."""
 
-        strengths = self.junction(self.input.pull())
+        if self._is_current():
+            return
+        if self.default_strength is None:
+            strengths = self.junction(self.input.pull())
+        else:
+            strengths = self.junction(
+                self.input.pull(), default_strength=self.default_strength
+            )
         packet = ActivationPacket(strengths=strengths, origin=self.csym)
         self.output.update(packet)
 
@@ -310,6 +528,8 @@ class FlowRealizer(BasicConstructRealizer):
     def propagate(self) -> None:
         """Compute new node activations."""
 
+        if self._is_current():
+            return
         combined = self.junction(self.input.pull())
         strengths = self.channel(combined)
         packet = ActivationPacket(strengths=strengths, origin=self.csym)
@@ -317,6 +537,13 @@ class FlowRealizer(BasicConstructRealizer):
 
 
 class ResponseRealizer(BasicConstructRealizer):
+    """
+    Realizer for response constructs.
+    
+    If self.default_strength is set, the selector is also given the nodes 
+    feeding the response as `choices`, so that choices missing from its input 
+    strengths may be filled in with their default strengths.
+    """
 
     ctype = ConstructType.Response
     __slots__ = ('junction', 'selector')
@@ -337,13 +564,33 @@ class ResponseRealizer(BasicConstructRealizer):
     def propagate(self) -> None:
         """Make and output a decision."""
 
+        if self._is_current():
+            return
         combined = self.junction(self.input.pull())
-        strengths, chosen = self.selector(combined)
+        if self.default_strength is None:
+            strengths, chosen = self.selector(combined)
+        else:
+            strengths, chosen = self.selector(
+                combined, 
+                choices=self.choices(), 
+                default_strength=self.default_strength
+            )
         decision_packet = DecisionPacket(
             strengths=strengths, chosen=chosen, origin=self.csym
         )
         self.output.update(decision_packet)
 
+    def choices(self) -> ConstructSymbolList:
+        """Return nodes feeding self, with node layers expanded."""
+
+        nodes: ConstructSymbolList = []
+        for csym in self.input.input_links:
+            if csym.ctype in ConstructType.Layer:
+                nodes.extend(cast(LayerID, csym.cid).nodes)
+            else:
+                nodes.append(csym)
+        return nodes
+
 
 class BehaviorRealizer(BasicConstructRealizer):
     
@@ -360,9 +607,30 @@ class BehaviorRealizer(BasicConstructRealizer):
             self.effector = effector
 
     def propagate(self) -> None:
-        """Execute selected callbacks."""
+        """
+        Execute selected callbacks.
+        
+        :raises TypeError: If the effector returns an awaitable (e.g., it 
+            runs coroutine callbacks); use self.apropagate() instead, as 
+            called by SubsystemRealizer.aexecute() and AgentRealizer.aexecute().
+        """
+
+        result = self.effector(*self.input.pull())
+        if isawaitable(result):
+            close = getattr(result, "close", None)
+            if close is not None:
+                close()
+            raise TypeError(
+                "Effector of {} returned an awaitable; use aexecute() to "
+                "run asynchronous callbacks.".format(self.csym)
+            )
 
-        self.effector(*self.input.pull())
+    async def apropagate(self) -> None:
+        """Execute selected callbacks, awaiting effector result if needed."""
+
+        result = self.effector(*self.input.pull())
+        if isawaitable(result):
+            await result
 
 
 class BufferRealizer(BasicConstructRealizer):
@@ -374,6 +642,7 @@ class BufferRealizer(BasicConstructRealizer):
     def __init__(self, csym: ConstructSymbol, source: Source = None) -> None:
 
         super().__init__(csym)
+        self._source_version: Any = None
         if source is not None: 
             self.source = source
 
@@ -386,9 +655,51 @@ class BufferRealizer(BasicConstructRealizer):
            self.source. If source output is mutated (e.g., as part of a buffer 
            update), it *will* be reflected in the output packet. Possible cause 
            of unexpected behavior.
+
+        If self.incremental is true and self.source exposes a `version` 
+        attribute, the output packet is only renewed when the source version 
+        changes.
+        """
+
+        if self._is_current():
+            return
+        self._emit(self.source())
+
+    async def apropagate(self) -> None:
+        """
+        Output stored activation pattern, awaiting source output if needed.
+
+        Sources may be coroutine functions or otherwise return awaitables 
+        (e.g., to wait on an event stream). See BufferRealizer.propagate().
         """
 
+        if self._is_current():
+            return
         strengths = self.source()
+        if isawaitable(strengths):
+            strengths = await strengths
+        self._emit(strengths)
+
+    def _is_current(self) -> bool:
+        """
+        Return true iff incremental and source version is unchanged.
+        
+        Records the current source version otherwise.
+        """
+
+        version = getattr(self.source, "version", None)
+        if (
+            self.incremental and 
+            version is not None and 
+            version == self._source_version and
+            self.output.view() is not None
+        ):
+            return True
+        self._source_version = version
+        return False
+
+    def _emit(self, strengths: ConstructSymbolMapping) -> None:
+
         packet = ActivationPacket(strengths=strengths, origin=self.csym)
         self.output.update(packet)
 
@@ -403,6 +714,9 @@ class ContainerConstructRealizer(MutableRealizerMapping, ConstructRealizer):
 
         super().__init__(csym)
         self._dict: Dict = dict()
+        self._buckets: Dict[BucketKey, Dict[ConstructSymbol, None]] = {}
+        self._incremental = False
+        self._default_strength: Optional[DefaultStrength] = None
 
     def __len__(self) -> int:
 
@@ -429,7 +743,7 @@ class ContainerConstructRealizer(MutableRealizerMapping, ConstructRealizer):
 
         if isinstance(key, ConstructSymbol):
             self._check_kv_pair(key, value)
-            self._dict[key] = value
+            self._add(key, value)
             self._connect(key, value)
         else:
             self._consume_multiindex(
@@ -440,6 +754,11 @@ class ContainerConstructRealizer(MutableRealizerMapping, ConstructRealizer):
 
         if isinstance(key, ConstructSymbol):
             del self._dict[key]
+            for bucket_key in self._bucket_keys(key):
+                bucket = self._buckets[bucket_key]
+                del bucket[key]
+                if not bucket:
+                    del self._buckets[bucket_key]
             self._disconnect(key)
         else:
             self._consume_multiindex(key[:-1], lambda a: delitem(a, key[-1]))
@@ -461,6 +780,46 @@ class ContainerConstructRealizer(MutableRealizerMapping, ConstructRealizer):
 
         raise NotImplementedError()
 
+    @property
+    def incremental(self) -> bool:
+        """
+        True iff members skip propagation when their inputs are unchanged.
+
+        Setting this property sets it for all current members recursively. 
+        Members inserted while it is true inherit it. See 
+        BasicConstructRealizer for details.
+        """
+
+        return self._incremental
+
+    @incremental.setter
+    def incremental(self, value: bool) -> None:
+
+        self._incremental = value
+        for realizer in self.values():
+            realizer.incremental = value
+
+    @property
+    def default_strength(self) -> Optional[DefaultStrength]:
+        """
+        Default strength of nodes missing from packets, or None.
+
+        A callable taking a single construct symbol and returning its default 
+        strength. It is meant to be declared once, on the agent: setting this 
+        property sets it for all current members recursively, and members 
+        inserted while it is set inherit it. See BasicConstructRealizer for 
+        how members use it.
+        """
+
+        return self._default_strength
+
+    @default_strength.setter
+    def default_strength(self, value: Optional[DefaultStrength]) -> None:
+
+        self._default_strength = value
+        for realizer in self.values():
+            realizer.default_strength = value
+
     def ready(self) -> bool:
         "Return true iff all necessary components defined for self and members."
 
@@ -487,10 +846,23 @@ class ContainerConstructRealizer(MutableRealizerMapping, ConstructRealizer):
         return missing
 
     def insert_realizers(self, *realizers: ConstructRealizer) -> None:
-        """Add pre-initialized realizers to self."""
+        """
+        Add pre-initialized realizers to self.
+        
+        All realizers are validated before any is added. Connections are 
+        computed in a single pass once all realizers are in place, which is 
+        much cheaper than inserting realizers one by one.
+
+        :raises ValueError: If self may not contain one of the realizers. In 
+            this case, no realizers are added.
+        """
 
-        for realizer in realizers:
-            self[realizer.csym] = realizer
+        members = {realizer.csym: realizer for realizer in realizers}
+        for key, value in members.items():
+            self._check_kv_pair(key, value)
+        for key, value in members.items():
+            self._add(key, value)
+        self._connect_many(members)
 
     def iter_ctype(self, ctype: ConstructType) -> ConstructSymbolIterable:
         """Return an iterator over all members matching ctype."""
@@ -531,24 +903,78 @@ class ContainerConstructRealizer(MutableRealizerMapping, ConstructRealizer):
             a = cast(ContainerConstructRealizer, a[csym])
         return func(a)
 
+    # Members are grouped into buckets to avoid testing every member for 
+    # connectivity upon insertion and deletion. Subclasses define bucket keys 
+    # for members and report which buckets may hold sources or targets of a 
+    # given member. Candidates are still confirmed using self.may_connect(). 
+    # By default, members are bucketed by construct type and every bucket is 
+    # searched.
+
+    def _bucket_keys(self, csym: ConstructSymbol) -> BucketKeys:
+        """Return keys of member buckets that should hold csym."""
+
+        return (csym.ctype,)
+
+    def _source_keys(self, target: ConstructSymbol) -> BucketKeys:
+        """Return keys of buckets holding all possible sources of target."""
+
+        return list(self._buckets)
+
+    def _target_keys(self, source: ConstructSymbol) -> BucketKeys:
+        """Return keys of buckets holding all possible targets of source."""
+
+        return list(self._buckets)
+
+    def _iter_buckets(self, keys: BucketKeys) -> ConstructSymbolIterable:
+        """Iterate over members of given buckets, without repetition."""
+
+        buckets = self._buckets
+        return iter(
+            dict.fromkeys(
+                chain.from_iterable(buckets.get(key, ()) for key in keys)
+            )
+        )
+
+    def _add(self, key: Any, value: Any) -> None:
+        """Store a new member without connecting it."""
+
+        if self._incremental:
+            value.incremental = True
+        if self._default_strength is not None:
+            value.default_strength = self._default_strength
+        self._dict[key] = value
+        for bucket_key in self._bucket_keys(key):
+            self._buckets.setdefault(bucket_key, {})[key] = None
+
     def _connect(self, key: Any, value: Any) -> None:
 
-        for csym, realizer in self.items():
-            if self.may_connect(csym, key):
-                # EXPLAIN!!!!!!
-                value = cast(HasInput, value)
-                realizer = cast(HasOutput, realizer)
-                value.input.watch(csym, realizer.output.view)
-            if self.may_connect(key, csym):
-                value = cast(HasOutput, value)
-                realizer = cast(HasInput, realizer)
-                realizer.input.watch(key, value.output.view)
+        self._connect_many({key: value})
+
+    def _connect_many(self, members: MutableRealizerMapping) -> None:
+        """Connect new members to each other and to existing members."""
+
+        # Sources of each new member are linked to its input monitor, so links 
+        # among new members are made here. New members are then linked to 
+        # input monitors of their pre-existing targets.
+        for key, value in members.items():
+            for csym in self._iter_buckets(self._source_keys(key)):
+                if self.may_connect(csym, key):
+                    realizer = cast(HasOutput, self._dict[csym])
+                    cast(HasInput, value).input.watch(
+                        csym, realizer.output.view
+                    )
+            for csym in self._iter_buckets(self._target_keys(key)):
+                if csym not in members and self.may_connect(key, csym):
+                    realizer = cast(HasInput, self._dict[csym])
+                    realizer.input.watch(
+                        key, cast(HasOutput, value).output.view
+                    )
 
     def _disconnect(self, key: Any) -> None:
 
-        for csym, realizer in self.items():
+        for csym in self._iter_buckets(self._target_keys(key)):
             if self.may_connect(key, csym):
-                cast(HasInput, realizer).input.drop(key)
+                cast(HasInput, self._dict[csym]).input.drop(key)
 
     def _make_compound_index(self, index: ConstructIndex) -> ConstructIndex:
         
@@ -579,13 +1005,171 @@ class SubsystemRealizer(ContainerConstructRealizer):
 
         super().__init__(csym)
         self.input = type(self).itype(self._watch, self._drop)
+        self._plans: Dict[PropagationStages, PropagationPlan] = {}
+        self._converged = False
+        self._settled_inputs: Optional[Tuple[Optional[Packet], ...]] = None
+        self._lazy = False
+        self.lazy_stages: Optional[PropagationStages] = None
+        self._lazy_plan: Optional[Tuple[Any, LazyPlan]] = None
+        self._lazy_running = False
+        self._clear_lazy_step()
         if propagation_rule is not None: 
             self.propagation_rule = propagation_rule
 
     def propagate(self) -> None:
-        """Propagate activations among realizers owned by self."""
+        """
+        Propagate activations among realizers owned by self.
+        
+        If self.lazy is true, only starts a new propagation step; members are 
+        evaluated when their outputs are viewed.
+        """
+
+        if self._lazy:
+            self._clear_lazy_step()
+        else:
+            self.propagation_rule(self)
+
+    @property
+    def lazy(self) -> bool:
+        """
+        True iff member outputs are evaluated on demand.
+
+        In lazy mode, viewing the output of a member (e.g., a response read 
+        by a behavior or by client code) evaluates it, along with only those 
+        members it depends on. Steps start on each call to self.propagate(); 
+        self.propagation_rule is not used.
+
+        Evaluation follows self.lazy_stages, which should be the stages run by 
+        the propagation rule (e.g., NACS_PROPAGATION_STAGES). A viewed member 
+        is evaluated at its last stage, and each of its inputs at its last 
+        stage before that, recursively; inputs not propagated at an earlier 
+        stage contribute their output from the previous step. Outputs are 
+        therefore those of the staged propagation rule, while members that 
+        viewed outputs do not depend on are skipped. Each staged propagation 
+        runs at most once per step, and members in no stage are never 
+        propagated.
+
+        If self.lazy_stages is None, members are evaluated in dependency 
+        order, which requires dependencies among members to be acyclic.
+
+        :raises ValueError: On enabling lazy mode without self.lazy_stages on 
+            a subsystem with cyclic dependencies.
+        """
+
+        return self._lazy
+
+    @lazy.setter
+    def lazy(self, value: bool) -> None:
+
+        if value:
+            self._compile_lazy_plan()
+        self._lazy = value
+        self._clear_lazy_step()
+        for csym, realizer in self.items():
+            self._set_demand(csym, realizer)
+
+    def compile_plan(self, stages: PropagationStages) -> PropagationPlan:
+        """
+        Return an execution plan for given propagation stages.
+
+        Each stage is a predicate on construct symbols; the corresponding plan 
+        stage holds bound propagate methods of all matching members, in 
+        membership order. Plans are cached and discarded whenever membership 
+        of self changes.
+
+        :param stages: A hashable sequence of construct symbol predicates. 
+            Should be defined once (e.g., as a module-level constant) so that 
+            cached plans may be reused.
+        """
+
+        try:
+            return self._plans[stages]
+        except KeyError:
+            plan = tuple(
+                tuple(
+                    realizer.propagate for csym, realizer in self.items() 
+                    if stage(csym)
+                )
+                for stage in stages
+            )
+            self._plans[stages] = plan
+            return plan
+
+    def clear_plans(self) -> None:
+        """
+        Discard cached propagation plans.
+        
+        Plans hold bound propagate methods of members. Call this method after 
+        replacing or wrapping member propagate methods in place.
+        """
+
+        self._plans.clear()
+
+    def run_plan(self, stages: PropagationStages) -> None:
+        """
+        Propagate members of self stage by stage.
+        
+        See SubsystemRealizer.compile_plan() for details.
+        """
+
+        for stage in self.compile_plan(stages):
+            for propagate in stage:
+                propagate()
+
+    def settle(self, tolerance: float = 1e-6, max_iter: int = 100) -> int:
+        """
+        Repeat self.propagate() until node activations settle.
+
+        After each sweep, node outputs are compared to those of the previous 
+        sweep (see _within_tolerance()); the loop stops once no node strength 
+        changes by tolerance or more, or after max_iter sweeps. Whether the 
+        last call converged is reported by self.converged.
+
+        If self.incremental is true and activations converged under the same 
+        input packets (compared by identity) on the last call, no sweep is 
+        run. As with incremental propagation, clear activations after 
+        modifying components to force recomputation.
+
+        :param tolerance: Largest change in node strength considered settled.
+        :param max_iter: Maximum number of sweeps.
+        :returns: Number of sweeps run.
+        """
+
+        inputs = tuple(pull() for pull in self.input.input_links.values())
+        settled = self._settled_inputs
+        if (
+            self.incremental and self._converged and settled is not None and 
+            len(settled) == len(inputs) and 
+            all(a is b for a, b in zip(settled, inputs))
+        ):
+            return 0
+
+        nodes = list(self._iter_node_realizers())
+        previous = [node.output.view() for node in nodes]
+        self._converged, self._settled_inputs = False, None
+        iteration = 0
+        while iteration < max_iter:
+            self.propagate()
+            iteration += 1
+            current = [node.output.view() for node in nodes]
+            if _within_tolerance(previous, current, tolerance):
+                self._converged, self._settled_inputs = True, inputs
+                break
+            previous = current
+        return iteration
 
-        self.propagation_rule(self)
+    @property
+    def converged(self) -> bool:
+        """True iff the last call to self.settle() converged."""
+
+        return self._converged
+
+    def clear_activations(self) -> None:
+        """Clear member activations, settling state and lazy step state."""
+
+        super().clear_activations()
+        self._converged, self._settled_inputs = False, None
+        self._clear_lazy_step()
 
     def execute(self) -> None:
         """Fire all selected actions."""
@@ -593,12 +1177,20 @@ class SubsystemRealizer(ContainerConstructRealizer):
         for behavior in self.behaviors:
             self[behavior].propagate()
 
+    async def aexecute(self) -> None:
+        """Fire all selected actions, awaiting behaviors concurrently."""
+
+        await asyncio.gather(
+            *(self[behavior].apropagate() for behavior in self.behaviors)
+        )
+
     def may_contain(self, csym: ConstructSymbol) -> bool:
         """Return true if subsystem realizer may contain construct symbol."""
 
         return bool(
             csym.ctype & (
                 ConstructType.Node |
+                ConstructType.Layer |
                 ConstructType.Flow |
                 ConstructType.Response |
                 ConstructType.Behavior
@@ -614,54 +1206,38 @@ class SubsystemRealizer(ContainerConstructRealizer):
         Connects chunk and feature nodes may connect to flows as inputs 
         or outputs according to flow direction. Connects of response and 
         behavior constructs according to contents of respective construct 
-        symbols.
+        symbols. Node layers connect as their nodes do.
         """
         
-        possibilities: List[bool] = [
-            (
-                target.ctype == ConstructType.Response and
-                bool(source.ctype & cast(ResponseID, target.cid).itype)
-            ),
-            (
-                target.ctype == ConstructType.Behavior and
-                source == cast(BehaviorID, target.cid).response
-            ),
-            (
-                source.ctype == ConstructType.Feature and
-                target.ctype == ConstructType.Flow and
-                bool(
-                    cast(FlowID, target.cid).ftype & (FlowType.BB | FlowType.BT)
-                )
-            ),
-            (
-                source.ctype == ConstructType.Chunk and
-                target.ctype == ConstructType.Flow and
-                bool(
-                    cast(FlowID, target.cid).ftype & (FlowType.TT | FlowType.TB)
-                )
-            ),
-            (
-                source.ctype == ConstructType.Flow and
-                target.ctype == ConstructType.Feature and
-                bool(
-                    cast(FlowID, source.cid).ftype & (FlowType.BB | FlowType.TB)
-                )
-            ),
-            (
-                source.ctype == ConstructType.Flow and
-                target.ctype == ConstructType.Chunk and
-                bool(
-                    cast(FlowID, source.cid).ftype & (FlowType.TT | FlowType.BT)
-                )
-            )
-        ]
-        return any(possibilities)
+        sctype, tctype = _node_ctype(source.ctype), _node_ctype(target.ctype)
+        if tctype == ConstructType.Response:
+            return bool(sctype & cast(ResponseID, target.cid).itype)
+        elif tctype == ConstructType.Behavior:
+            return source == cast(BehaviorID, target.cid).response
+        elif tctype == ConstructType.Flow:
+            ftype = cast(FlowID, target.cid).ftype
+            if sctype == ConstructType.Feature:
+                return bool(ftype & (FlowType.BB | FlowType.BT))
+            elif sctype == ConstructType.Chunk:
+                return bool(ftype & (FlowType.TT | FlowType.TB))
+        elif sctype == ConstructType.Flow:
+            ftype = cast(FlowID, source.cid).ftype
+            if tctype == ConstructType.Feature:
+                return bool(ftype & (FlowType.BB | FlowType.TB))
+            elif tctype == ConstructType.Chunk:
+                return bool(ftype & (FlowType.TT | FlowType.BT))
+        return False
 
     @property
     def nodes(self) -> ConstructSymbolList:
         
         return list(self.iter_ctype(ConstructType.Node))
 
+    @property
+    def layers(self) -> ConstructSymbolList:
+
+        return list(self.iter_ctype(ConstructType.Layer))
+
     @property
     def flows(self) -> ConstructSymbolList:
         
@@ -677,29 +1253,240 @@ class SubsystemRealizer(ContainerConstructRealizer):
         
         return list(self.iter_ctype(ConstructType.Behavior))
 
-    def _connect(self, key: Any, value: Any) -> None:
+    def _connect_many(self, members: MutableRealizerMapping) -> None:
+
+        super()._connect_many(members)
+        self._plans.clear()
+        self._converged, self._settled_inputs = False, None
+
+        buffer_links = self.input.input_links.items()
+        for key, value in members.items():
+            if key.ctype in ConstructType.Node | ConstructType.Layer:
+                for buffer, pull_method in buffer_links:
+                    value.input.watch(buffer, pull_method)
+            self._set_demand(key, value)
+        self._lazy_plan = None
+
+    def _disconnect(self, key: Any) -> None:
+
+        super()._disconnect(key)
+        self._plans.clear()
+        self._lazy_plan = None
+        self._converged, self._settled_inputs = False, None
 
-        super()._connect(key, value)
+    def _bucket_keys(self, csym: ConstructSymbol) -> BucketKeys:
+        """
+        Return keys of member buckets that should hold csym.
 
-        if key.ctype in ConstructType.Node:
-            for buffer, pull_method in self.input.input_links.items():
-                value.input.watch(buffer, pull_method)
+        In addition to construct type buckets, node layers are bucketed with 
+        their nodes, flows by each basic flow type they carry, responses by 
+        each basic construct type they take as input, and behaviors by their 
+        client response.
+        """
+
+        ctype = csym.ctype
+        keys: List[BucketKey] = [ctype]
+        if ctype in ConstructType.Layer:
+            keys.append(_node_ctype(ctype))
+        elif ctype == ConstructType.Flow:
+            ftype = cast(FlowID, csym.cid).ftype
+            keys.extend((ctype, ft) for ft in _BASIC_FLOW_TYPES if ft & ftype)
+        elif ctype == ConstructType.Response:
+            itype = cast(ResponseID, csym.cid).itype
+            keys.extend((ctype, ct) for ct in _BASIC_CTYPES if ct & itype)
+        elif ctype == ConstructType.Behavior:
+            keys.append((ctype, cast(BehaviorID, csym.cid).response))
+        return keys
+
+    def _source_keys(self, target: ConstructSymbol) -> BucketKeys:
+
+        ctype, Flow = _node_ctype(target.ctype), ConstructType.Flow
+        if ctype == ConstructType.Feature:
+            return ((Flow, FlowType.BB), (Flow, FlowType.TB))
+        elif ctype == ConstructType.Chunk:
+            return ((Flow, FlowType.TT), (Flow, FlowType.BT))
+        elif ctype == Flow:
+            ftype = cast(FlowID, target.cid).ftype
+            keys = []
+            if ftype & (FlowType.BB | FlowType.BT):
+                keys.append(ConstructType.Feature)
+            if ftype & (FlowType.TT | FlowType.TB):
+                keys.append(ConstructType.Chunk)
+            return keys
+        elif ctype == ConstructType.Response:
+            itype = cast(ResponseID, target.cid).itype
+            return [ct for ct in _BASIC_CTYPES if ct & itype]
+        elif ctype == ConstructType.Behavior:
+            return (ConstructType.Response,)
+        return ()
+
+    def _target_keys(self, source: ConstructSymbol) -> BucketKeys:
+
+        ctype, Flow = _node_ctype(source.ctype), ConstructType.Flow
+        keys: List[BucketKey] = [(ConstructType.Response, ctype)]
+        if ctype == ConstructType.Feature:
+            keys.extend(((Flow, FlowType.BB), (Flow, FlowType.BT)))
+        elif ctype == ConstructType.Chunk:
+            keys.extend(((Flow, FlowType.TT), (Flow, FlowType.TB)))
+        elif ctype == Flow:
+            ftype = cast(FlowID, source.cid).ftype
+            if ftype & (FlowType.BB | FlowType.TB):
+                keys.append(ConstructType.Feature)
+            if ftype & (FlowType.TT | FlowType.BT):
+                keys.append(ConstructType.Chunk)
+        elif ctype == ConstructType.Response:
+            keys.append((ConstructType.Behavior, source))
+        return keys
+
+    def _set_demand(self, csym: ConstructSymbol, realizer: Any) -> None:
+        """Install or remove demand hook on output of member realizer."""
+
+        output = getattr(realizer, "output", None)
+        if output is not None:
+            output.demand = (
+                partial(self._demand, csym, realizer) if self._lazy else None
+            )
+
+    def _demand(self, csym: ConstructSymbol, realizer: Any) -> None:
+        """Evaluate member for current lazy step (see self.lazy)."""
+
+        if self._lazy_running or self._dict.get(csym) is not realizer:
+            return
+        steps, deps, last = self._compile_lazy_plan()
+        k = last.get(csym)
+        if k is None or k in self._lazy_done:
+            return
+
+        # Find staged propagations needed, then run them in stage order.
+        needed, stack = set(), [k]
+        while stack:
+            j = stack.pop()
+            if j not in needed and j not in self._lazy_done:
+                needed.add(j)
+                stack.extend(i for _, i in deps[j] if i is not None)
+        self._lazy_running = True
+        try:
+            for j in sorted(needed):
+                self._run_lazy_step(steps[j], j, deps[j])
+        finally:
+            # Members expose their output at their latest stage run.
+            for member, j in self._lazy_latest.items():
+                _set_output(self._dict[member], self._lazy_done[j])
+            self._lazy_running = False
+
+    def _run_lazy_step(
+        self, 
+        csym: ConstructSymbol, 
+        k: int, 
+        deps: List[Tuple[ConstructSymbol, Optional[int]]]
+    ) -> None:
+        """Propagate member at stage position k, given outputs of deps."""
+
+        done, latest = self._lazy_done, self._lazy_latest
+        for source, j in deps:
+            if source in latest:
+                _set_output(
+                    self._dict[source], 
+                    done[j] if j is not None else self._lazy_previous[source]
+                )
+        realizer = self._dict[csym]
+        if csym not in latest:
+            self._lazy_previous[csym] = realizer.output.view()
+        realizer.propagate()
+        done[k] = realizer.output.view()
+        latest[csym] = k
+
+    def _clear_lazy_step(self) -> None:
+
+        # Outputs of staged propagations run in the current step, by stage 
+        # position; latest stage position run for each member; and member 
+        # outputs from the previous step, for members run in this one.
+        self._lazy_done: Dict[int, Optional[Packet]] = {}
+        self._lazy_latest: Dict[ConstructSymbol, int] = {}
+        self._lazy_previous: Dict[ConstructSymbol, Optional[Packet]] = {}
+
+    def _compile_lazy_plan(self) -> LazyPlan:
+        """
+        Return staged members, their stage dependencies and last positions.
+
+        Dependencies of the member at position k pair each of its inputs 
+        among members with the last position of that input before k, or None.
+        """
+
+        stages = self.lazy_stages
+        if self._lazy_plan is not None and self._lazy_plan[0] is stages:
+            return self._lazy_plan[1]
+        if stages is None:
+            steps = self._dependency_order()
+        else:
+            steps = [csym for stage in stages for csym in self if stage(csym)]
+        deps: List[List[Tuple[ConstructSymbol, Optional[int]]]] = []
+        last: Dict[ConstructSymbol, int] = {}
+        for k, csym in enumerate(steps):
+            deps.append([
+                (source, last.get(source)) 
+                for source in self._member_sources(csym)
+            ])
+            last[csym] = k
+        plan = (steps, deps, last)
+        self._lazy_plan = (stages, plan)
+        return plan
+
+    def _member_sources(self, csym: ConstructSymbol) -> List[ConstructSymbol]:
+
+        monitor = getattr(self._dict[csym], "input", None)
+        if monitor is None:
+            return []
+        return [source for source in monitor.input_links if source in self]
+
+    def _dependency_order(self) -> List[ConstructSymbol]:
+        """Return members with outputs, each after all of its sources."""
+
+        order: List[ConstructSymbol] = []
+        state: Dict[ConstructSymbol, bool] = {}
+        for root, realizer in self.items():
+            if getattr(realizer, "output", None) is None or root in state:
+                continue
+            state[root] = False
+            stack = [(root, iter(self._member_sources(root)))]
+            while stack:
+                csym, sources = stack[-1]
+                for source in sources:
+                    if source not in state:
+                        state[source] = False
+                        stack.append(
+                            (source, iter(self._member_sources(source)))
+                        )
+                        break
+                    elif not state[source]:
+                        raise ValueError(
+                            "Members of {} have cyclic dependencies; set "
+                            "lazy_stages.".format(self.csym)
+                        )
+                else:
+                    stack.pop()
+                    state[csym] = True
+                    order.append(csym)
+        return order
+
+    def _iter_node_realizers(self) -> Iterator[BasicConstructRealizer]:
+
+        for csym in self._iter_buckets(_NODE_CTYPES):
+            yield cast(BasicConstructRealizer, self._dict[csym])
 
     def _watch(
         self, identifier: ConstructSymbol, pull_method: PullMethod
     ) -> None:
         """Informs members of a new input to self."""
 
-        for _, realizer in self.items_ctype(ConstructType.Node):
-            cast(BasicConstructRealizer, realizer).input.watch(
-                identifier, pull_method
-            )
+        for realizer in self._iter_node_realizers():
+            realizer.input.watch(identifier, pull_method)
 
     def _drop(self, identifier: ConstructSymbol) -> None:
         """Informs members of a dropped input to self."""
 
-        for _, realizer in self.items_ctype(ConstructType.Node):
-            cast(BasicConstructRealizer, realizer).input.drop(identifier)
+        for realizer in self._iter_node_realizers():
+            realizer.input.drop(identifier)
 
 
 class AgentRealizer(ContainerConstructRealizer):
@@ -707,23 +1494,100 @@ class AgentRealizer(ContainerConstructRealizer):
 
     ctype = ConstructType.Agent
 
-    def __init__(self, csym: ConstructSymbol) -> None:
+    def __init__(
+        self, csym: ConstructSymbol, executor: Optional[Executor] = None
+    ) -> None:
         """
         Initialize a new agent realizer.
         
         :param construct: Client agent.
+        :param executor: Optional executor for propagating subsystems 
+            concurrently. See AgentRealizer.propagate() for details.
+        :raises TypeError: If executor runs calls in other processes.
         """
 
         super().__init__(csym)
         self._updaters: UpdaterList = []
+        self.executor = executor
+
+    @property
+    def executor(self) -> Optional[Executor]:
+        """
+        Executor for propagating subsystems concurrently, or None.
+        
+        Must run calls in the current process (e.g., a ThreadPoolExecutor). 
+        Process pools are rejected with a TypeError: they would propagate 
+        pickled copies of subsystems and discard the results. To use several 
+        cores, run independent trials with TrialRunner instead.
+        """
+
+        return self._executor
+
+    @executor.setter
+    def executor(self, executor: Optional[Executor]) -> None:
+
+        if isinstance(executor, ProcessPoolExecutor):
+            raise TypeError(
+                "Subsystems propagate in place; process-based executors are "
+                "not supported."
+            )
+        self._executor = executor
 
     def propagate(self) -> None:
-        """Propagate activations among realizers owned by self."""
+        """
+        Propagate activations among realizers owned by self.
+
+        Buffers are propagated first. Subsystems, which only depend on buffer 
+        outputs, are then propagated. If self.executor is set, subsystem 
+        propagation calls are submitted to it and awaited before returning; 
+        any exception raised by a subsystem is re-raised here.
+
+        .. warning:
+           Subsystems propagate in place, so the executor must run calls in 
+           the current process (see AgentRealizer.executor). Components shared 
+           across subsystems must be safe to call concurrently.
+        """
         
         for buffer in self.buffers:
             self[buffer].propagate()
-        for subsystem in self.subsystems:
-            self[subsystem].propagate()
+        if self.executor is None:
+            for subsystem in self.subsystems:
+                self[subsystem].propagate()
+        else:
+            futures = [
+                self.executor.submit(self[subsystem].propagate) 
+                for subsystem in self.subsystems
+            ]
+            for future in futures:
+                future.result()
+
+    async def apropagate(self) -> None:
+        """
+        Propagate activations among realizers owned by self asynchronously.
+
+        Buffers are propagated concurrently, awaiting sources that return 
+        awaitables (see BufferRealizer.apropagate()). Subsystems are then 
+        propagated as in AgentRealizer.propagate(); if self.executor is set, 
+        calls are run in it through the running event loop, otherwise they 
+        run in the event loop thread.
+        """
+
+        await asyncio.gather(
+            *(self[buffer].apropagate() for buffer in self.buffers)
+        )
+        if self.executor is None:
+            for subsystem in self.subsystems:
+                self[subsystem].propagate()
+        else:
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(
+                *(
+                    loop.run_in_executor(
+                        self.executor, self[subsystem].propagate
+                    ) 
+                    for subsystem in self.subsystems
+                )
+            )
 
     def execute(self) -> None:
         """Execute all selected actions in all subsystems."""
@@ -731,6 +1595,21 @@ class AgentRealizer(ContainerConstructRealizer):
         for subsystem in self.subsystems:
             cast(SubsystemRealizer, self[subsystem]).execute()
 
+    async def aexecute(self) -> None:
+        """
+        Execute all selected actions in all subsystems asynchronously.
+        
+        Behaviors of all subsystems are awaited concurrently, so a slow 
+        effector does not delay the others.
+        """
+
+        await asyncio.gather(
+            *(
+                cast(SubsystemRealizer, self[subsystem]).aexecute() 
+                for subsystem in self.subsystems
+            )
+        )
+
     def may_contain(self, csym: ConstructSymbol) -> bool:
         """Return true if agent realizer may contain csym."""
 
@@ -746,15 +1625,39 @@ class AgentRealizer(ContainerConstructRealizer):
         construct symbols.
         """
         
-        possibilities = [
-            (
-                source.ctype == ConstructType.Buffer and
-                target.ctype == ConstructType.Subsystem and
-                target in cast(BufferID, source.cid).outputs
+        return (
+            source.ctype == ConstructType.Buffer and
+            target.ctype == ConstructType.Subsystem and
+            target in cast(BufferID, source.cid).outputs
+        )
+
+    def _bucket_keys(self, csym: ConstructSymbol) -> BucketKeys:
+        """
+        Return keys of member buckets that should hold csym.
+
+        In addition to construct type buckets, buffers are bucketed by each of 
+        their output constructs.
+        """
+
+        keys: List[BucketKey] = [csym.ctype]
+        if csym.ctype == ConstructType.Buffer:
+            keys.extend(
+                (csym.ctype, output) 
+                for output in cast(BufferID, csym.cid).outputs
             )
-        ]
+        return keys
+
+    def _source_keys(self, target: ConstructSymbol) -> BucketKeys:
+
+        if target.ctype == ConstructType.Subsystem:
+            return ((ConstructType.Buffer, target),)
+        return ()
+
+    def _target_keys(self, source: ConstructSymbol) -> BucketKeys:
 
-        return any(possibilities)
+        if source.ctype == ConstructType.Buffer:
+            return (ConstructType.Subsystem,)
+        return ()
 
     def learn(self) -> None:
         """
@@ -766,12 +1669,26 @@ class AgentRealizer(ContainerConstructRealizer):
         for updater in self.updaters:
             updater()
 
+    async def alearn(self) -> None:
+        """
+        Update knowledge in all subsystems and all buffers asynchronously.
+
+        Updaters are called in order, as in AgentRealizer.learn(); results 
+        that are awaitable are awaited before the next updater is called.
+        """
+
+        for updater in self.updaters:
+            result = updater()
+            if isawaitable(result):
+                await result
+
     def attach(self, *updaters: Updater) -> None:
         """
         Add update managers to self.
         
         :param update_managers: Callables that manage updates to dynamic 
-            knowledge components. Should take no arguments and return nothing.
+            knowledge components. Should take no arguments and return nothing 
+            (or an awaitable, if used with AgentRealizer.alearn()).
         """
 
         for updater in updaters:
@@ -801,7 +1718,7 @@ class AgentRealizer(ContainerConstructRealizer):
 def make_realizer(csym: ConstructSymbol) -> ConstructRealizer:
     """Initialize empty construct realizer for given construct symbol."""
 
-    if csym.ctype in ConstructType.Node:
+    if csym.ctype in ConstructType.Node | ConstructType.Layer:
         return NodeRealizer(csym)
     elif csym.ctype == ConstructType.Flow:
         return FlowRealizer(csym)
@@ -841,7 +1758,7 @@ def make_agent(
         *(
             make_subsystem(subsystem, members) 
             for subsystem, members in subsystems.items()
-        )
+        ),
+        *(make_realizer(buffer) for buffer in buffers)
     )
-    agent.insert_realizers(*(make_realizer(buffer) for buffer in buffers))
     return agent
@@ -10,12 +10,17 @@
 
 __all__ = [
     "ConstructSymbol", "ConstructType", "FlowType", "DVPair", "FlowID", 
-    "ResponseID", "BehaviorID", "BufferID", "Feature", "Chunk", "Flow",
-    "Response", "Behavior", "Buffer", "Subsystem", "Agent"
+    "ResponseID", "BehaviorID", "BufferID", "LayerID", "Feature", "Chunk", 
+    "Layer", "Flow", "Response", "Behavior", "Buffer", "Subsystem", "Agent", 
+    "SymbolIndex"
 ]
 
 
-from typing import NamedTuple, Hashable, Sequence
+from typing import (
+    NamedTuple, Hashable, Sequence, Iterable, Iterator, List, Dict, Optional, 
+    ClassVar, Tuple
+)
+from threading import Lock
 from enum import Flag, auto
 
 
@@ -40,12 +45,15 @@ class ConstructType(Flag):
         Buffer: Temporary store of activations.
         Subsystem: A Clarion subsystem.
         Agent: A full Clarion agent.
+        FeatureLayer: Layer of feature nodes, realized jointly.
+        ChunkLayer: Layer of chunk nodes, realized jointly.
 
     Other members:
         NullConstruct: Empty construct type (corresponds to flag null). 
         Node: A chunk or microfeature.
+        Layer: A feature or chunk layer.
         BasicConstruct: Feature or chunk or flow or response or behavior or 
-            buffer. 
+            buffer or layer. 
         ContainerConstruct: Subsystem or agent.
     """
 
@@ -57,11 +65,15 @@ class ConstructType(Flag):
     Buffer = auto()
     Subsystem = auto()
     Agent = auto()
+    FeatureLayer = auto()
+    ChunkLayer = auto()
 
     NullConstruct = 0
     Node = Feature | Chunk
+    Layer = FeatureLayer | ChunkLayer
     BasicConstruct = (
-        Feature | Chunk | Flow | Response | Behavior | Buffer
+        Feature | Chunk | Flow | Response | Behavior | Buffer | FeatureLayer | 
+        ChunkLayer
     )
     ContainerConstruct = Subsystem | Agent
 
@@ -83,19 +95,72 @@ class FlowType(Flag):
     BT = auto()
 
 
-class ConstructSymbol(NamedTuple):
+class _ConstructSymbolFields(NamedTuple):
+    
+    ctype: ConstructType
+    cid: Hashable
+
+
+class ConstructSymbol(_ConstructSymbolFields):
     """
     Symbolically represents simulation constructs.
     
     Construct symbols identify and carry essential information about simulated 
     constructs.
 
+    Construct symbols are interned: constructing a symbol equal to an existing 
+    one returns the existing (canonical) instance. Canonical symbols cache 
+    their hash and carry a dense integer symbol id (see ConstructSymbol.sid), 
+    which allows fast hashing and identity-based comparison. Symbols with 
+    unhashable fields are not interned. Interned symbols are kept alive for 
+    the lifetime of the process.
+
     :param ctype: Construct type.
     :param cid: Construct ID.
     """
-    
-    ctype: ConstructType
-    cid: Hashable
+
+    _registry: ClassVar[Dict[Tuple, 'ConstructSymbol']] = {}
+    _symbols: ClassVar[List['ConstructSymbol']] = []
+    _lock: ClassVar[Lock] = Lock()
+
+    def __new__(cls, ctype: ConstructType, cid: Hashable) -> 'ConstructSymbol':
+
+        key = (cls, ctype, cid)
+        try:
+            return cls._registry[key]
+        except KeyError:
+            pass
+        except TypeError: # Unhashable fields, do not intern.
+            return super().__new__(cls, ctype, cid)
+        with cls._lock:
+            if key not in cls._registry:
+                csym = super().__new__(cls, ctype, cid)
+                csym._hash = tuple.__hash__(csym)
+                csym._sid = len(cls._symbols)
+                cls._symbols.append(csym)
+                cls._registry[key] = csym
+            return cls._registry[key]
+
+    def __hash__(self) -> int:
+
+        try:
+            return self._hash
+        except AttributeError:
+            return tuple.__hash__(self)
+
+    def __eq__(self, other: object) -> bool:
+
+        if self is other:
+            return True
+        # Distinct canonical symbols are never equal.
+        interned = "_sid" in self.__dict__
+        if interned and "_sid" in getattr(other, "__dict__", ()):
+            return False
+        return tuple.__eq__(self, other)
+
+    def __reduce__(self):
+
+        return (type(self), tuple(self))
 
     def __repr__(self):
 
@@ -116,6 +181,28 @@ class ConstructSymbol(NamedTuple):
             [self.ctype.name or str(self.ctype), "(", cdata, ")"]
         )
 
+    @classmethod
+    def _make(cls, iterable: Iterable) -> 'ConstructSymbol':
+
+        return cls(*iterable)
+
+    @property
+    def sid(self) -> Optional[int]:
+        """
+        Dense integer id of self, or None if self is not interned.
+        
+        Symbol ids are assigned in order of first construction and are only 
+        meaningful within the current process.
+        """
+
+        return self.__dict__.get("_sid")
+
+    @classmethod
+    def from_sid(cls, sid: int) -> 'ConstructSymbol':
+        """Return the interned construct symbol with given symbol id."""
+
+        return cls._symbols[sid]
+
 
 class DVPair(NamedTuple):
     """Represents a microfeature dimension-value pair."""
@@ -180,6 +267,82 @@ class BufferID(NamedTuple):
         )
 
 
+class LayerID(NamedTuple):
+    """Represents the name and member nodes of a node layer."""
+
+    name: Hashable
+    nodes: ConstructSymbolSequence
+
+    def _repr_data(self):
+
+        return '{}, {} nodes'.format(repr(self.name), len(self.nodes))
+
+
+class SymbolIndex(object):
+    """
+    Assigns stable, dense integer positions to construct symbols.
+
+    Positions are assigned in order of first insertion and never change, so 
+    arrays indexed by position remain valid as the index grows.
+    """
+
+    def __init__(self, csyms: Iterable[ConstructSymbol] = ()) -> None:
+        """
+        Initialize a new symbol index.
+
+        :param csyms: Construct symbols to be indexed, in order.
+        """
+
+        self._symbols: List[ConstructSymbol] = []
+        self._positions: Dict[ConstructSymbol, int] = {}
+        self.extend(csyms)
+
+    def __len__(self) -> int:
+
+        return len(self._symbols)
+
+    def __iter__(self) -> Iterator[ConstructSymbol]:
+
+        return iter(self._symbols)
+
+    def __contains__(self, csym: object) -> bool:
+
+        return csym in self._positions
+
+    def __getitem__(self, csym: ConstructSymbol) -> int:
+        """Return position of csym."""
+
+        return self._positions[csym]
+
+    def get(
+        self, csym: ConstructSymbol, default: Optional[int] = None
+    ) -> Optional[int]:
+        """Return position of csym if indexed, else default."""
+
+        return self._positions.get(csym, default)
+
+    def symbol(self, position: int) -> ConstructSymbol:
+        """Return construct symbol at given position."""
+
+        return self._symbols[position]
+
+    def add(self, csym: ConstructSymbol) -> int:
+        """Index csym if necessary and return its position."""
+
+        try:
+            return self._positions[csym]
+        except KeyError:
+            position = self._positions[csym] = len(self._symbols)
+            self._symbols.append(csym)
+            return position
+
+    def extend(self, csyms: Iterable[ConstructSymbol]) -> None:
+        """Index each construct symbol in csyms."""
+
+        for csym in csyms:
+            self.add(csym)
+
+
 ##################################
 ### Construct Symbol Factories ###
 ##################################
@@ -213,6 +376,36 @@ def Chunk(cid: Hashable) -> ConstructSymbol:
     return ConstructSymbol(ConstructType.Chunk, cid)
 
 
+def Layer(
+    name: Hashable, nodes: Iterable[ConstructSymbol]
+) -> ConstructSymbol:
+    """
+    Return a new node layer symbol.
+
+    A node layer stands in for a collection of feature or chunk nodes, whose 
+    strengths it computes and emits jointly in one packet. Layers of feature 
+    (chunk) nodes have construct type FeatureLayer (ChunkLayer) and are 
+    connected exactly as their nodes would be.
+
+    :param name: Name of layer.
+    :param nodes: Member nodes of layer; either all features or all chunks.
+    :raises ValueError: If nodes is empty or holds other constructs.
+    """
+
+    nodes = tuple(nodes)
+    ctypes = {node.ctype for node in nodes}
+    if ctypes == {ConstructType.Feature}:
+        ctype = ConstructType.FeatureLayer
+    elif ctypes == {ConstructType.Chunk}:
+        ctype = ConstructType.ChunkLayer
+    else:
+        raise ValueError(
+            "Layer expects one or more nodes, either all features or all "
+            "chunks."
+        )
+    return ConstructSymbol(ctype, LayerID(name, nodes))
+
+
 def Flow(name: Hashable, ftype: FlowType) -> ConstructSymbol:
     """
     Return a new flow symbol.
@@ -1,4 +1,9 @@
 """Non-basic components for building Clarion agents."""
 
 from pyClarion.components.nacs import *
-from pyClarion.components.general import *
\ No newline at end of file
+from pyClarion.components.general import *
+from pyClarion.components.compiled import *
+from pyClarion.components.simulation import *
+from pyClarion.components.profiling import *
+from pyClarion.components.persistence import *
+from pyClarion.components.stores import *
@@ -0,0 +1,309 @@
+"""
+Array-backed NACS flow channels.
+
+Channels defined here compile the dict-based knowledge of NACS flows (see
+`pyClarion.components.nacs`) into sparse weight matrices over a stable node
+ordering and propagate activations as sparse matrix-vector products.
+
+Compiled channels are drop-in replacements for their dict-based counterparts:
+they take the same `assoc` and `default_strength` arguments and map node
+strengths to node strengths. They assume that default strengths are fixed for
+each node, and they must be recompiled (via `compile()`) when `assoc` is
+mutated.
+
+Compiled channels read ArrayStrengths over their own index without per-key
+lookups and, if initialized with `packed=True`, emit ArrayStrengths over their
+index. Channels sharing an index thus exchange packed strengths directly.
+Unpacked channels initialized with `sparse=True` omit nodes left at their
+default strength from their outputs.
+"""
+
+
+__all__ = [
+    "SparseMatrix", "CompiledAssociativeRules", "CompiledTopDownLinks",
+    "CompiledBottomUpLinks"
+]
+
+
+import typing as typ
+from array import array
+from operator import mul
+from itertools import islice
+from pyClarion.base import *
+
+
+class SparseMatrix(object):
+    """
+    A compressed sparse row (CSR) matrix backed by stdlib arrays.
+
+    Row r holds entries data[k] at columns indices[k] for k in
+    range(indptr[r], indptr[r + 1]).
+    """
+
+    def __init__(self, indptr = None, indices = None, data = None):
+        """
+        Initialize a new sparse matrix.
+
+        :param indptr: Row boundaries into indices and data.
+        :param indices: Column index of each entry.
+        :param data: Value of each entry.
+        """
+
+        self.indptr = indptr if indptr is not None else array('q', [0])
+        self.indices = indices if indices is not None else array('q')
+        self.data = data if data is not None else array('d')
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Build a sparse matrix from an iterable of rows.
+
+        :param rows: Iterable of rows, each an iterable of (column, value)
+            pairs.
+        """
+
+        matrix = cls()
+        for row in rows:
+            matrix.append_row(row)
+        return matrix
+
+    @property
+    def n_rows(self):
+
+        return len(self.indptr) - 1
+
+    def append_row(self, row):
+        """Append a row of (column, value) pairs."""
+
+        for col, val in row:
+            self.indices.append(col)
+            self.data.append(val)
+        self.indptr.append(len(self.indices))
+
+    def products(self, x):
+        """Return entry-wise products data[k] * x[indices[k]] as a list."""
+
+        return list(map(mul, self.data, map(x.__getitem__, self.indices)))
+
+    def dot(self, x):
+        """Return the row-wise sum of products with vector x."""
+
+        p, indptr = self.products(x), self.indptr
+        return [sum(p[a:b]) for a, b in zip(indptr, indptr[1:])]
+
+    def max_dot(self, x, lower):
+        """
+        Return the row-wise max of products with vector x.
+
+        :param x: Input vector.
+        :param lower: Sequence giving a lower bound for each row max.
+        """
+
+        p, indptr = self.products(x), self.indptr
+        return [
+            max(m, max(p[a:b], default=m))
+            for a, b, m in zip(indptr, indptr[1:], lower)
+        ]
+
+
+class _CompiledChannel(object):
+    """Base class for array-backed channels."""
+
+    def __init__(
+        self, assoc = None, default_strength = None, index = None, 
+        packed = False, sparse = False
+    ):
+        """
+        Initialize a new compiled channel.
+
+        :param assoc: Dict-based knowledge, as expected by dict-based
+            counterpart.
+        :param default_strength: Callable taking a single construct symbol.
+            Returns default strength of given construct.
+        :param index: Optional SymbolIndex giving the node ordering. May be
+            shared among channels.
+        :param packed: If true, output ArrayStrengths covering all indexed
+            nodes, where nodes without output take their default strength.
+        :param sparse: If true and not packed, omit nodes whose output
+            strength equals their default strength.
+        """
+
+        self.assoc = assoc if assoc is not None else {}
+        self.default_strength = default_strength
+        self.index = index if index is not None else SymbolIndex()
+        self.packed = packed
+        self.sparse = sparse
+        self.compile()
+
+    def compile(self):
+        """Compile self.assoc into sparse matrices."""
+
+        raise NotImplementedError()
+
+    def _compile_defaults(self):
+        """Record default strengths of all indexed nodes."""
+
+        self._defaults = array('d')
+        self._sync_defaults()
+
+    def _sync_defaults(self):
+        """Record default strengths of nodes indexed since last call."""
+
+        symbols = islice(self.index, len(self._defaults), None)
+        self._defaults.extend(self.default_strength(csym) for csym in symbols)
+
+    def _gather(self, strengths):
+        """Return dense input vector for given strengths."""
+
+        self._sync_defaults()
+        x = self._defaults[:]
+        packed = isinstance(strengths, ArrayStrengths)
+        if packed and strengths.index is self.index:
+            data = strengths.data
+            if not isinstance(data, array):
+                data = array('d', data)
+            x[:len(data)] = data
+            return x
+        get = self.index.get
+        for csym, s in strengths.items():
+            i = get(csym)
+            if i is not None:
+                x[i] = s
+        return x
+
+    def _emit(self, positions, strengths):
+        """Return output strengths for given node positions."""
+
+        if self.packed:
+            data = self._defaults[:]
+            for i, s in zip(positions, strengths):
+                data[i] = s
+            return ArrayStrengths(self.index, data)
+        symbol = self.index.symbol
+        if self.sparse:
+            defaults = self._defaults
+            return {
+                symbol(i): s for i, s in zip(positions, strengths)
+                if s != defaults[i]
+            }
+        return {symbol(i): s for i, s in zip(positions, strengths)}
+
+
+class CompiledAssociativeRules(_CompiledChannel):
+    """
+    Propagates activations among chunks using compiled associative rules.
+
+    Array-backed counterpart of AssociativeRuleCollection.
+    """
+
+    def __call__(self, strengths):
+
+        x = self._gather(strengths)
+        rule_strengths = self._rules.dot(x)
+        conc_strengths = self._conclusions.max_dot(
+            rule_strengths, self._conc_defaults
+        )
+        fired = [
+            (i, s) for i, s, s0 in zip(
+                self._conc_positions, conc_strengths, self._conc_defaults
+            )
+            if s0 < s
+        ]
+        return self._emit(*(zip(*fired) if fired else ((), ())))
+
+    def compile(self):
+        """Compile associative rules into sparse matrices."""
+
+        add = self.index.add
+        rules, conclusions = SparseMatrix(), SparseMatrix()
+        self._conc_positions = array('q')
+        for conc, cond_list in self.assoc.items():
+            self._conc_positions.append(add(conc))
+            conclusions.append_row(
+                (rules.n_rows + j, 1.) for j in range(len(cond_list))
+            )
+            for conds in cond_list:
+                rules.append_row((add(c), w) for c, w in conds.items())
+        self._rules, self._conclusions = rules, conclusions
+        self._compile_defaults()
+        self._conc_defaults = array(
+            'd', (self._defaults[i] for i in self._conc_positions)
+        )
+
+
+class CompiledTopDownLinks(_CompiledChannel):
+    """
+    Propagates activations in a top-down manner using compiled links.
+
+    Array-backed counterpart of TopDownLinks.
+    """
+
+    def __call__(self, strengths):
+
+        x = self._gather(strengths)
+        feature_strengths = self._links.max_dot(x, self._feature_defaults)
+        return self._emit(self._feature_positions, feature_strengths)
+
+    def compile(self):
+        """Compile interlevel links into a feature-by-chunk matrix."""
+
+        add = self.index.add
+        edges: typ.Dict[int, typ.List[typ.Tuple[int, typ.Any]]] = {}
+        for chunk, dim_dict in self.assoc.items():
+            c = add(chunk)
+            for dim, (weight, mfs) in dim_dict.items():
+                for mf in mfs:
+                    edges.setdefault(add(mf), []).append((c, weight))
+        self._feature_positions = array('q', edges)
+        self._links = SparseMatrix.from_rows(edges.values())
+        self._compile_defaults()
+        self._feature_defaults = array(
+            'd', (self._defaults[i] for i in self._feature_positions)
+        )
+
+
+class CompiledBottomUpLinks(_CompiledChannel):
+    """
+    Propagates activations in a bottom-up manner using compiled links.
+
+    Array-backed counterpart of BottomUpLinks. Dimensional weights are divided
+    by n_dim ** 1.1 at compile time.
+    """
+
+    def __call__(self, strengths):
+
+        x = self._gather(strengths)
+        dim_strengths = self._groups.max_dot(x, self._group_floor)
+        chunk_strengths = self._chunks.dot(dim_strengths)
+        defaults = self._defaults
+        return self._emit(
+            self._chunk_positions,
+            [
+                defaults[i] + s
+                for i, s in zip(self._chunk_positions, chunk_strengths)
+            ]
+        )
+
+    def compile(self):
+        """Compile interlevel links into dimension and chunk matrices."""
+
+        add = self.index.add
+        groups, chunks = SparseMatrix(), SparseMatrix()
+        self._chunk_positions = array('q')
+        for chunk, dim_dict in self.assoc.items():
+            self._chunk_positions.append(add(chunk))
+            n_dim = len(dim_dict)
+            row = []
+            for dim, (weight, mfs) in dim_dict.items():
+                if not mfs:
+                    raise ValueError(
+                        "Dimension {} of {} has no features.".format(
+                            repr(dim), str(chunk)
+                        )
+                    )
+                row.append((groups.n_rows, weight / (n_dim ** 1.1)))
+                groups.append_row((add(mf), 1.) for mf in mfs)
+            chunks.append_row(row)
+        self._groups, self._chunks = groups, chunks
+        self._group_floor = [float('-inf')] * groups.n_rows
+        self._compile_defaults()
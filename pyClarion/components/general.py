@@ -1,15 +1,61 @@
 """Generally useful non-basic pyClarion components."""
 
 from pyClarion.base import *
+from array import array
+from inspect import isawaitable
+import asyncio
 import math
 import random
+import heapq
+
+
+def _aligned_strengths(packets):
+    """
+    Return list of packet strengths if all are aligned ArrayStrengths.
+
+    Returns None if packets is empty or if any packet strengths are not 
+    ArrayStrengths aligned with those of the first packet.
+    """
+
+    strengths = [packet.strengths for packet in packets]
+    if (
+        strengths and 
+        isinstance(strengths[0], ArrayStrengths) and 
+        all(strengths[0].aligned(s) for s in strengths)
+    ):
+        return strengths
+    return None
+
+
+def _resolve_default(component, default_strength):
+    """
+    Return default strength callable of component, else default_strength.
+
+    :raises ValueError: If neither is given.
+    """
+
+    if component.default_strength is not None:
+        return component.default_strength
+    if default_strength is None:
+        raise ValueError(
+            "No default strength given to {}.".format(type(component).__name__)
+        )
+    return default_strength
 
 
 class SimpleJunction(object):
-    """Merges node strengths from multiple packets using pure dict update."""
+    """
+    Merges node strengths from multiple packets using pure dict update.
+    
+    If all packets carry aligned ArrayStrengths, the strengths of the last 
+    packet are returned as is.
+    """
 
     def __call__(self, packets):
 
+        packets = list(packets)
+        if _aligned_strengths(packets) is not None:
+            return packets[-1].strengths
         d = {}
         for packet in packets:
             d.update(packet.strengths)
@@ -23,11 +69,21 @@ class MaxJunction(object):
         """
         Process packets.
 
-        Assumes activations >= 0.
+        Assumes activations >= 0; maxima are floored at 0, so nodes with no 
+        positive strength are omitted. If all packets carry aligned 
+        ArrayStrengths, they are merged elementwise into a new ArrayStrengths 
+        instance, where such nodes take strength 0.
 
         :param packets: An iterable of activation packets.
         """
 
+        packets = list(packets)
+        aligned = _aligned_strengths(packets)
+        if aligned is not None:
+            data = array('d', bytes(8 * len(aligned[0].data)))
+            for strengths in aligned:
+                data = array('d', map(max, data, strengths.data))
+            return ArrayStrengths(aligned[0].index, data)
         d = {}
         for packet in packets:
             for n, s in packet.strengths.items():
@@ -40,30 +96,86 @@ class MaxJunction(object):
 class SimpleNodeJunction(object):
     """Determines node output based on given recommendations."""
 
-    def __init__(self, csym, default_strength):
+    def __init__(self, csym, default_strength = None):
         """
         Initialize a SimpleNodeJunction instance.
 
         :param csym: Client node.
         :param default_strength: Callable taking a single construct symbol. 
-            Returns default strength of given construct.
+            Returns default strength of given construct. If None, the default 
+            passed in on each call (e.g., the agent default) is used.
         """
 
         self.csym = csym
         self.default_strength = default_strength
 
-    def __call__(self, packets):
+    def __call__(self, packets, default_strength = None):
         """
         Output maximum recommended strength for client node.
         
+        Packets lacking the client node (e.g., sparse packets) are treated as 
+        recommending its default strength.
+
         :param packets: An iterable of activation packets.
+        :param default_strength: Fallback for self.default_strength.
         """
 
-        strengths = (
-            packet.strengths.get(self.csym, self.default_strength(self.csym)) 
-            for packet in packets
-        )
-        return {self.csym: max(strengths)}
+        csym = self.csym
+        default = _resolve_default(self, default_strength)(csym)
+        strengths = (packet.strengths.get(csym, default) for packet in packets)
+        return {csym: max(strengths)}
+
+
+class NodeLayerJunction(object):
+    """
+    Determines outputs of a whole node layer based on given recommendations.
+
+    Fused counterpart of SimpleNodeJunction: each layer node receives the 
+    maximum strength recommended for it, where packets lacking the node 
+    recommend its default strength. All node strengths are computed in a 
+    single pass over input packets and returned in one mapping.
+    """
+
+    def __init__(self, nodes, default_strength = None):
+        """
+        Initialize a NodeLayerJunction instance.
+
+        :param nodes: Iterable of client nodes.
+        :param default_strength: Callable taking a single construct symbol. 
+            Returns default strength of given construct. If None, the default 
+            passed in on each call (e.g., the agent default) is used.
+        """
+
+        self.nodes = tuple(nodes)
+        self.default_strength = default_strength
+
+    def __call__(self, packets, default_strength = None):
+        """
+        Output maximum recommended strength for each client node.
+        
+        :param packets: An iterable of activation packets.
+        :param default_strength: Fallback for self.default_strength.
+        """
+
+        default = _resolve_default(self, default_strength)
+
+        best = dict.fromkeys(self.nodes)
+        counts = dict.fromkeys(self.nodes, 0)
+        n_packets = 0
+        for packet in packets:
+            n_packets += 1
+            for node, s in packet.strengths.items():
+                if node in best:
+                    s0 = best[node]
+                    if s0 is None or s0 < s:
+                        best[node] = s
+                    counts[node] += 1
+        for node, s in best.items():
+            if s is None:
+                best[node] = default(node)
+            elif counts[node] < n_packets:
+                best[node] = max(s, default(node))
+        return best
 
 
 class FilteredSimpleJunction(SimpleJunction):
@@ -84,108 +196,265 @@ class FilteredSimpleJunction(SimpleJunction):
         """
 
         d = super().__call__(packets)
+        if isinstance(d, ArrayStrengths):
+            data = array('d', d.data)
+            for node, factor in self.fdict.items():
+                i = d.index.get(node)
+                if i is not None and i < len(data): data[i] *= factor
+            return ArrayStrengths(d.index, data)
         for node, factor in self.fdict.items():
             if node in d: d[node] *= factor
         return d
 
 
-class BoltzmannSelector(object):
-    """Selects a chunk according to a Boltzmann distribution."""
-
-    def __init__(self, temperature):
-        """Initialize a ``BoltzmannSelector`` instance.
+class _ChunkSelector(object):
+    """
+    Base class for selectors sampling chunks from a strength distribution.
+
+    Chunk strengths are gathered into flat sequences (directly from the data 
+    of ArrayStrengths where possible), turned into selection weights in a 
+    single pass and normalized. Samples are drawn from precomputed cumulative 
+    weights, so drawing many samples costs one bisection each.
+
+    Candidates may be pruned before normalization, keeping only the top_k 
+    strongest chunks and/or chunks with strength at least threshold. The 
+    distribution is then normalized over, and only holds, surviving chunks. 
+    If no chunk survives (or none is given), nothing is selected.
+
+    Input strengths may be sparse. If given choices and a default strength 
+    (as response realizers do when an agent default is set), chunks among 
+    choices but missing from input strengths are candidates at their default 
+    strengths; otherwise, missing chunks are not candidates.
+    """
 
-        :param temperature: Temperature of the Boltzmann distribution.
-        """
+    def __init__(self, temperature = 1., top_k = None, threshold = None):
 
         self.temperature = temperature
+        self.top_k = top_k
+        self.threshold = threshold
+        self._layout = None
 
-    def __call__(self, strengths):
-        """Select actionable chunks for execution. 
+    def __call__(self, strengths, choices = (), default_strength = None):
+        """
+        Select actionable chunks for execution.
         
-        Selection probabilities vary with chunk strengths according to a 
-        Boltzmann distribution.
+        Returns the selection distribution over chunks and a tuple holding the 
+        chosen chunk. If there are no candidate chunks, returns ({}, ()).
 
         :param strengths: Mapping of node strengths.
+        :param choices: Nodes to fill in if missing from strengths.
+        :param default_strength: Callable taking a single construct symbol. 
+            Returns default strength of missing choices.
         """
 
-        choices = ()
-        bd = self.get_boltzmann_distribution(strengths)
-        chunks, probabilities = tuple(zip(*bd.items())) or ((), ())
+        chunks, probabilities = self._distribution(
+            strengths, choices, default_strength
+        )
+        if not chunks:
+            return {}, ()
         chosen = tuple(random.choices(chunks, weights=probabilities))
-        return bd, chosen
+        return dict(zip(chunks, probabilities)), chosen
+
+    def sample(self, strengths, k = 1, rng = None):
+        """
+        Draw k chunks, with replacement, from the selection distribution.
+
+        :param strengths: Mapping of node strengths.
+        :param k: Number of samples.
+        :param rng: Optional random.Random instance; defaults to the global 
+            random number generator.
+        """
+
+        chunks, probabilities = self._distribution(strengths)
+        if not chunks:
+            return ()
+        choices = (rng or random).choices
+        return tuple(choices(chunks, cum_weights=_cumsum(probabilities), k=k))
+
+    def select_many(self, strengths_seq):
+        """
+        Select chunks for many agents in one call.
+
+        Returns one (distribution, chosen) pair per strength mapping, as 
+        returned by self.__call__(). Inputs sharing an ArrayStrengths index 
+        share a single chunk layout.
+
+        :param strengths_seq: Iterable of strength mappings, one per agent.
+        """
+
+        return [self(strengths) for strengths in strengths_seq]
+
+    def _distribution(self, strengths, choices = (), default_strength = None):
+        """Return chunks and their normalized selection probabilities."""
+
+        chunks, values = self._chunk_strengths(strengths)
+        if default_strength is not None:
+            chunks, values = self._fill(
+                chunks, values, strengths, choices, default_strength
+            )
+        if self.top_k is not None or self.threshold is not None:
+            chunks, values = self._prune(chunks, values)
+        if not chunks:
+            return (), []
+        weights = self._weights(values)
+        total = math.fsum(weights)
+        return chunks, [w / total for w in weights]
+
+    def _weights(self, values):
+        """Return unnormalized selection weights for chunk strengths."""
+
+        raise NotImplementedError()
+
+    def _prune(self, chunks, values):
+        """Return surviving chunks and strengths, in input order."""
+
+        positions = range(len(values))
+        if self.threshold is not None:
+            threshold = self.threshold
+            positions = [i for i in positions if values[i] >= threshold]
+        if self.top_k is not None and self.top_k < len(positions):
+            positions = sorted(
+                heapq.nlargest(self.top_k, positions, key=values.__getitem__)
+            )
+        return (
+            tuple(chunks[i] for i in positions), [values[i] for i in positions]
+        )
+
+    @staticmethod
+    def _fill(chunks, values, strengths, choices, default_strength):
+        """Append chunks among choices missing from strengths."""
+
+        missing = [
+            csym for csym in choices 
+            if csym.ctype == ConstructType.Chunk and csym not in strengths
+        ]
+        if not missing:
+            return chunks, values
+        return (
+            tuple(chunks) + tuple(missing), 
+            list(values) + [default_strength(csym) for csym in missing]
+        )
+
+    def _chunk_strengths(self, strengths):
+        """Return chunks and their strengths as parallel sequences."""
+
+        if isinstance(strengths, ArrayStrengths):
+            index, data = strengths.index, strengths.data
+            layout = self._layout
+            if (
+                layout is None or layout[0] is not index or 
+                layout[1] != len(data)
+            ):
+                positions = [
+                    i for i, csym in zip(range(len(data)), index)
+                    if csym.ctype == ConstructType.Chunk
+                ]
+                chunks = tuple(index.symbol(i) for i in positions)
+                if len(positions) == len(data):
+                    positions = None
+                layout = self._layout = (index, len(data), positions, chunks)
+            positions, chunks = layout[2], layout[3]
+            if positions is None:
+                return chunks, data
+            return chunks, [data[i] for i in positions]
+        items = [
+            (csym, s) for csym, s in strengths.items() 
+            if csym.ctype == ConstructType.Chunk
+        ]
+        chunks, values = tuple(zip(*items)) or ((), ())
+        return chunks, values
+
+
+def _cumsum(values):
+
+    total, sums = 0., []
+    for v in values:
+        total += v
+        sums.append(total)
+    return sums
+
+
+class BoltzmannSelector(_ChunkSelector):
+    """
+    Selects a chunk according to a Boltzmann distribution.
+    
+    The distribution is computed stably, by subtracting the maximum strength 
+    before exponentiation (i.e., with the log-sum-exp trick).
+    """
+
+    def __init__(self, temperature, top_k = None, threshold = None):
+        """Initialize a ``BoltzmannSelector`` instance.
+
+        :param temperature: Temperature of the Boltzmann distribution.
+        :param top_k: If given, only the top_k strongest chunks are candidates.
+        :param threshold: If given, only chunks with strength at least 
+            threshold are candidates.
+        """
+
+        super().__init__(temperature, top_k, threshold)
 
     def get_boltzmann_distribution(self, strengths):
         """Construct and return a boltzmann distribution."""
 
-        terms, divisor = {}, 0
-        for ck, s in self._iter_chunk_strengths(strengths):
-            terms[ck] = math.exp(s / self.temperature)
-            divisor += terms[ck]
-        probabilities = {ck: s / divisor for ck, s in terms.items()}
-        return probabilities
+        return dict(zip(*self._distribution(strengths)))
 
-    @staticmethod
-    def _iter_chunk_strengths(strengths):
+    def _weights(self, values):
 
-        for csym, s in strengths.items():
-            if csym.ctype == ConstructType.Chunk:
-                yield (csym, s)            
+        if not values:
+            return []
+        m, t, exp = max(values), self.temperature, math.exp
+        return [exp((s - m) / t) for s in values]
 
 
-class CategoricalSelector(object):
+class CategoricalSelector(_ChunkSelector):
     """
     Selects a chunk according to a categorical distribution.
     
     May be interpreted as a Boltzmann distribution applied to the log of chunk 
-    strengths.
+    strengths. Selection probabilities vary with chunk strengths according to 
+    a categorical distribution:
+        p(ch) = strength(ch) ** - temp / (sum_i strength(i) ** - temp)
+
+    Strengths are scaled by their maximum before exponentiation to avoid 
+    overflow at low temperatures.
     """
 
-    def __init__(self, temperature = 1.):
+    def __init__(self, temperature = 1., top_k = None, threshold = None):
         """Initialize a ``CategoricalSelector`` instance.
 
         :param temperature: Temperature of the categorical distribution. Behaves 
             similarly to temperature parameter in boltzmann distribution. 
+        :param top_k: If given, only the top_k strongest chunks are candidates.
+        :param threshold: If given, only chunks with strength at least 
+            threshold are candidates.
         """
 
-        self.temperature = temperature
-
-    def __call__(self, strengths):
-        """Select actionable chunks for execution. 
-        
-        Selection probabilities vary with chunk strengths according to a 
-        categorical distribution:
-            p(ch) = strength(ch) ** - temp / (sum_i strength(i) ** - temp)
-
-        :param strengths: Mapping of node strengths.
-        """
-
-        choices = ()
-        bd = self.get_categorical_distribution(strengths)
-        chunks, probabilities = tuple(zip(*bd.items())) or ((), ())
-        chosen = tuple(random.choices(chunks, weights=probabilities))
-        return bd, chosen
+        super().__init__(temperature, top_k, threshold)
 
     def get_categorical_distribution(self, strengths):
         """Construct and return a chunk selection distribution."""
 
-        terms, divisor = {}, 0
-        for ck, s in self._iter_chunk_strengths(strengths):
-            terms[ck] = pow(s, 1 / self.temperature)
-            divisor += terms[ck]
-        probabilities = {ck: s / divisor for ck, s in terms.items()}
-        return probabilities
+        return dict(zip(*self._distribution(strengths)))
 
-    @staticmethod
-    def _iter_chunk_strengths(strengths):
+    def _weights(self, values):
 
-        for csym, s in strengths.items():
-            if csym.ctype == ConstructType.Chunk:
-                yield (csym, s)            
+        if not values:
+            return []
+        m, e = max(values), 1 / self.temperature
+        if m > 0:
+            return [pow(s / m, e) for s in values]
+        return [pow(s, e) for s in values]
 
 
 class MappingEffector(object):
-    """Links actionable chunks to callbacks."""
+    """
+    Links actionable chunks to callbacks.
+
+    Callbacks may be coroutine functions. If any callback returns an 
+    awaitable, the effector returns an awaitable running them concurrently, 
+    which BehaviorRealizer.apropagate() awaits. Such effectors must be run 
+    through aexecute(); BehaviorRealizer.propagate() rejects awaitables.
+    """
 
     def __init__(self, chunk2callback) -> None:
         """
@@ -196,36 +465,150 @@ class MappingEffector(object):
 
         self.chunk2callback = chunk2callback
 
-    def __call__(self, dpacket) -> None:
+    def __call__(self, dpacket):
         """
         Execute callbacks associated with each chosen chunk.
 
         :param dpacket: A decision packet.
         """
         
+        awaitables = []
         for chunk in dpacket.chosen:
-            self.chunk2callback[chunk]()
+            result = self.chunk2callback[chunk]()
+            if isawaitable(result):
+                awaitables.append(result)
+        if awaitables:
+            return _gather(awaitables)
+        return None
+
+
+async def _gather(awaitables):
+
+    await asyncio.gather(*awaitables)
 
 
 class ConstantSource(object):
-    """Outputs a stored activation packet."""
+    """
+    Outputs a stored activation packet.
+    
+    Exposes a version counter that is incremented whenever stored strengths 
+    are replaced, updated or cleared. Incremental buffer realizers use it to 
+    detect changes.
+    """
 
     def __init__(self, strengths = None) -> None:
 
+        self.version = 0
         self.strengths = strengths or dict()
 
     def __call__(self):
         """Return stored strengths."""
 
-        return self.strengths
+        return self._strengths
+
+    @property
+    def strengths(self):
+        """Stored node strengths."""
+
+        return self._strengths
+
+    @strengths.setter
+    def strengths(self, strengths):
+
+        self._strengths = strengths
+        self.version += 1
 
     def update(self, strengths):
         """Update self with contents of dict-like strengths."""
 
-        self.strengths = self.strengths.copy()
-        self.strengths.update(strengths)
+        new_strengths = self.strengths.copy()
+        new_strengths.update(strengths)
+        self.strengths = new_strengths
 
     def clear(self) -> None:
         """Clear stored node strengths."""
 
         self.strengths = {}
+
+
+class StreamingSource(object):
+    """
+    Outputs activations driven by a stream of stimulus deltas.
+
+    Each call to advance() consumes one delta from the stream, a mapping from 
+    nodes to new strengths where a strength of None removes the node. Deltas 
+    are applied to stored strengths in place, unless stored strengths have 
+    been handed out (by a call or through self.strengths) and not released 
+    since, in which case they are copied first, so emitted packets are never 
+    mutated. Call release() once handed out strengths are no longer 
+    referenced (e.g., after clearing agent activations) to avoid copying.
+
+    Like ConstantSource, exposes a version counter that is incremented 
+    whenever stored strengths change. See `stream_trials()` for advancing 
+    streaming sources in lockstep with an agent.
+    """
+
+    def __init__(self, deltas = (), strengths = None) -> None:
+        """
+        Initialize a new streaming source.
+
+        :param deltas: Iterable of stimulus deltas. Consumed lazily, so it may 
+            be a generator reading from a file or a queue.
+        :param strengths: Initial strengths.
+        """
+
+        self.version = 0
+        self.deltas = iter(deltas)
+        self._strengths = strengths if strengths is not None else {}
+        self._shared = strengths is not None
+
+    def __call__(self):
+        """Return stored strengths."""
+
+        self._shared = True
+        return self._strengths
+
+    @property
+    def strengths(self):
+        """Stored node strengths."""
+
+        self._shared = True
+        return self._strengths
+
+    def release(self) -> None:
+        """
+        Declare that no handed out strengths are referenced any longer.
+
+        The next delta is then applied in place.
+        """
+
+        self._shared = False
+
+    def advance(self) -> bool:
+        """
+        Apply next delta in stream to stored strengths.
+        
+        Returns false, leaving stored strengths unchanged, if the stream is 
+        exhausted.
+        """
+
+        try:
+            delta = next(self.deltas)
+        except StopIteration:
+            return False
+        self.apply(delta)
+        return True
+
+    def apply(self, delta) -> None:
+        """Apply a single delta to stored strengths."""
+
+        strengths = self._strengths
+        if self._shared:
+            strengths = self._strengths = strengths.copy()
+            self._shared = False
+        for node, s in delta.items():
+            if s is None:
+                strengths.pop(node, None)
+            else:
+                strengths[node] = s
+        self.version += 1
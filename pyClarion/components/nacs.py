@@ -4,6 +4,10 @@ Implementation of the non-action-centered subsystem in standard Clarion.
 
 
 import typing as typ
+import weakref
+from operator import is_
+from itertools import chain, islice
+from functools import partial
 from pyClarion.base import *
 
 
@@ -31,114 +35,822 @@ InterlevelAssociation = (
 
 
 class AssociativeRuleCollection(object):
-    """Propagates activations among chunks."""
+    """
+    Propagates activations among chunks.
 
-    def __init__(self, assoc = None, default_strength = None):
+    Rules are indexed by their condition chunks, so that only rules with at 
+    least one condition away from its default strength are evaluated on each 
+    call. Rules firing when all of their conditions are at default strength 
+    are found at indexing time and always evaluated. Results are identical to 
+    evaluating every rule, provided that default strengths are fixed.
+
+    The index is kept up to date with self.assoc. Rules added with 
+    AssociativeRuleCollection.add_rule() are indexed immediately. Other 
+    changes made to self.assoc directly are found on the next call, by 
+    comparing conclusions, rule list lengths and rule identities with a 
+    snapshot taken at indexing time: rules appended to existing or new 
+    conclusions are indexed, while any other change (e.g., removing or 
+    replacing rules) triggers a full reindex. This check costs time linear in 
+    the number of rules on every call, but runs without Python-level loops; 
+    rule evaluation itself is restricted as described above. After mutating 
+    the conditions of existing rules in place, call reindex().
+
+    If a RuleStore is given, its rules are evaluated alongside those of 
+    self.assoc, which then serves as an in-memory overlay for new rules. 
+    Resting rules of the store are found on first call.
+    """
+
+    def __init__(self, assoc = None, default_strength = None, store = None):
 
         self.assoc: AssociativeRuleDict = assoc or dict()
         self.default_strength = default_strength
+        self.store = store
+        self._store_resting: typ.Optional[typ.List[int]] = None
+        self.reindex()
 
     def __call__(self, strengths):
         
+        self._refresh()
+        default, index = self.default_strength, self._index
+        selected = set(self._resting)
+        for c, s in strengths.items():
+            rules = index.get(c)
+            if rules is not None and s != default(c):
+                selected.update(rules)
+
         d = dict()
-        for conc, conds in self._iter_assoc():
-            s = sum(
-                w * strengths.get(c, self.default_strength(c)) 
-                for c, w in conds.items()
-            )
-            if d.get(conc, self.default_strength(conc)) < s:
+        for i in selected:
+            conc, conds = self._rules[i]
+            s = sum(w * strengths.get(c, default(c)) for c, w in conds.items())
+            if d.get(conc, default(conc)) < s:
                 d[conc] = s
+        if self.store is not None:
+            self._call_store(strengths, d)
         return d
 
-    def _iter_assoc(self):
+    def add_rule(self, conc, conds):
+        """
+        Add a new rule to self.assoc and index it.
+
+        :param conc: Conclusion chunk.
+        :param conds: Mapping from condition chunks to weights.
+        """
 
+        self._refresh()
+        cond_list = self.assoc.get(conc)
+        if cond_list is None:
+            self.assoc[conc] = [conds]
+            self._concs.append(conc)
+            self._lengths.append(1)
+            self._flat.append(conds)
+        else:
+            cond_list.append(conds)
+            k = self._concs.index(conc)
+            self._flat.insert(sum(self._lengths[:k + 1]), conds)
+            self._lengths[k] += 1
+        self._index_rule(conc, conds)
+
+    def reindex(self):
+        """Rebuild the condition index from self.assoc."""
+
+        self._rules: typ.List[typ.Tuple[ConstructSymbol, typ.Any]] = []
+        self._index: typ.Dict[ConstructSymbol, typ.List[int]] = {}
+        self._resting: typ.List[int] = []
         for conc, cond_list in self.assoc.items():
             for conds in cond_list:
-                yield conc, conds
+                self._index_rule(conc, conds)
+        self._snapshot()
+
+    def _snapshot(self):
+        """Record conclusions, rule list lengths and rules of self.assoc."""
+
+        assoc = self.assoc
+        self._concs: typ.List[ConstructSymbol] = list(assoc)
+        self._lengths: typ.List[int] = list(map(len, assoc.values()))
+        self._flat: typ.List[typ.Any] = list(
+            chain.from_iterable(assoc.values())
+        )
+
+    def _refresh(self):
+        """Index rules appended to self.assoc, or reindex on other changes."""
+
+        # Fast check, without Python-level loops: same conclusions, with rule 
+        # lists of the same lengths, holding the same rules (list comparison 
+        # tests identity first, so unchanged rules are not compared by value).
+        assoc = self.assoc
+        if (
+            list(map(len, assoc.values())) == self._lengths and 
+            list(assoc) == self._concs and
+            list(chain.from_iterable(assoc.values())) == self._flat
+        ):
+            return
+
+        flat = iter(self._flat)
+        previous = {
+            conc: list(islice(flat, n)) 
+            for conc, n in zip(self._concs, self._lengths)
+        }
+        appended = []
+        for conc, cond_list in assoc.items():
+            old = previous.pop(conc, ())
+            if len(cond_list) < len(old) or not all(map(is_, cond_list, old)):
+                self.reindex()
+                return
+            appended.extend((conc, conds) for conds in cond_list[len(old):])
+        if any(previous.values()):
+            self.reindex()
+            return
+        for conc, conds in appended:
+            self._index_rule(conc, conds)
+        self._snapshot()
+
+    def _index_rule(self, conc, conds):
+
+        i = len(self._rules)
+        self._rules.append((conc, conds))
+        for c in conds:
+            self._index.setdefault(c, []).append(i)
+        default = self.default_strength
+        if default is not None:
+            s = sum(w * default(c) for c, w in conds.items())
+            if default(conc) < s:
+                self._resting.append(i)
+
+    def _call_store(self, strengths, d):
+
+        store, default = self.store, self.default_strength
+        symbols, concs = store.symbols, store.concs
+        if self._store_resting is None:
+            self._store_resting = [
+                r for r in range(len(store)) 
+                if default(symbols[concs[r]]) < self._evaluate(r, {})
+            ]
+        selected = set(self._store_resting)
+        for c, s in strengths.items():
+            if s != default(c):
+                selected.update(store.rules_with(c))
+
+        for r in selected:
+            s = self._evaluate(r, strengths)
+            conc = symbols[concs[r]]
+            if d.get(conc, default(conc)) < s:
+                d[conc] = s
+
+    def _evaluate(self, r, strengths):
+
+        store, default, get = self.store, self.default_strength, strengths.get
+        symbols, conds, weights = store.symbols, store.conds, store.weights
+        s = 0
+        for k in range(store.indptr[r], store.indptr[r + 1]):
+            c = symbols[conds[k]]
+            s += weights[k] * get(c, default(c))
+        return s
+
+
+class InterlevelLinks(typ.MutableMapping):
+    """
+    An interlevel association that records which chunks have been relinked.
+
+    Wraps (without copying) a dict of the form InterlevelAssociation. 
+    TopDownLinks and BottomUpLinks channels sharing an InterlevelLinks 
+    instance precompute their adjacency once and, whenever links change, patch 
+    it for the affected chunks only.
+
+    Each channel using the wrapper holds a set of chunks relinked since it 
+    last synchronized, so memory used for tracking changes is bounded by the 
+    number of chunks. Replacing or deleting the links of a chunk, through the 
+    wrapper or in the wrapped dict directly, is tracked: direct changes are 
+    found when channels synchronize, by comparing the wrapped dict with a 
+    shallow snapshot. After mutating the links of a chunk in place, report 
+    the change with touch().
+
+    Channels given a plain dict wrap it with InterlevelLinks.wrap(), so 
+    channels given the same dict share one wrapper.
+    """
+
+    # Live wrappers, keyed by id of wrapped dict.
+    _wrappers: typ.ClassVar[typ.MutableMapping] = (
+        weakref.WeakValueDictionary()
+    )
+
+    def __init__(self, data: InterlevelAssociation = None) -> None:
+
+        self.data: InterlevelAssociation = data if data is not None else {}
+        self._seen: InterlevelAssociation = dict(self.data)
+        self._pending: typ.MutableMapping[
+            typ.Any, typ.Set[ConstructSymbol]
+        ] = weakref.WeakKeyDictionary()
+        self._wrappers[id(self.data)] = self
+
+    @classmethod
+    def wrap(cls, data: InterlevelAssociation = None) -> "InterlevelLinks":
+        """Return the live wrapper of data, creating one if necessary."""
+
+        if data is not None:
+            links = cls._wrappers.get(id(data))
+            if links is not None and links.data is data:
+                return links
+        return cls(data)
+
+    def __getitem__(self, chunk):
+
+        return self.data[chunk]
+
+    def __setitem__(self, chunk, dim_dict):
+
+        self.data[chunk] = self._seen[chunk] = dim_dict
+        self.touch(chunk)
+
+    def __delitem__(self, chunk):
+
+        del self.data[chunk]
+        self._seen.pop(chunk, None)
+        self.touch(chunk)
+
+    def __iter__(self):
+
+        return iter(self.data)
+
+    def __len__(self):
+
+        return len(self.data)
 
+    def touch(self, chunk: ConstructSymbol) -> None:
+        """Record that links of chunk have changed."""
 
-class TopDownLinks(object):
-    """Propagates activations in a top-down manner."""
+        for pending in self._pending.values():
+            pending.add(chunk)
 
-    def __init__(self, assoc = None, default_strength = None):
+    def changes(
+        self, channel: typ.Any
+    ) -> typ.Optional[typ.Set[ConstructSymbol]]:
+        """
+        Return chunks relinked since channel last called this method.
 
-        self.assoc: InterlevelAssociation = assoc or {}
+        Channels are registered on their first call, which returns None (the 
+        channel should then read all links), and unregistered once garbage 
+        collected.
+        """
+
+        self._detect()
+        pending = self._pending.get(channel)
+        self._pending[channel] = set()
+        return pending
+
+    def _detect(self) -> None:
+        """Touch chunks relinked in self.data directly."""
+
+        # Fast check, without Python-level loops: same chunks, in the same 
+        # order, with the same link dicts.
+        data, seen = self.data, self._seen
+        if (
+            len(data) == len(seen) and 
+            all(map(is_, data.values(), seen.values())) and
+            list(data) == list(seen)
+        ):
+            return
+        for chunk in seen.keys() - data.keys():
+            self.touch(chunk)
+        for chunk, dim_dict in data.items():
+            if seen.get(chunk) is not dim_dict:
+                self.touch(chunk)
+        self._seen = dict(data)
+
+
+class _StoreStrengths(typ.Mapping):
+    """
+    Dense channel output over a knowledge store.
+
+    Holds strengths computed on a call; strengths of other store nodes are 
+    their resting strengths, found by rest() (which returns None for nodes 
+    without store links) when first read. Reading single nodes (e.g., with 
+    node junctions) thus only touches store entries of those nodes. Iterating 
+    visits every store node given by nodes().
+    """
+
+    def __init__(self, strengths, rest, nodes):
+
+        self._strengths = strengths
+        self._rest = rest
+        self._nodes = nodes
+
+    def __getitem__(self, csym):
+
+        s = self.get(csym)
+        if s is None:
+            raise KeyError(csym)
+        return s
+
+    def get(self, csym, default = None):
+
+        s = self._strengths.get(csym)
+        if s is None:
+            s = self._rest(csym)
+            if s is None:
+                return default
+        return s
+
+    def __contains__(self, csym):
+
+        return csym in self._strengths or self._rest(csym) is not None
+
+    def __iter__(self):
+
+        strengths, rest = self._strengths, self._rest
+        yield from strengths
+        for csym in self._nodes():
+            if csym not in strengths and rest(csym) is not None:
+                yield csym
+
+    def __len__(self):
+
+        return sum(1 for csym in self)
+
+
+class _InterlevelChannel(object):
+    """
+    Base class for channels over precomputed interlevel adjacency.
+
+    If a LinkStore is given, its links are used alongside those of self.assoc, 
+    which then serves as an in-memory overlay: links of a chunk in self.assoc 
+    replace its store links (an empty dict removes them). Store links are read 
+    from the mapped arrays of the store as needed: calls only visit entries 
+    of store nodes whose strength they may change, and dense outputs look up 
+    resting strengths of other store nodes on demand (see _StoreStrengths).
+    """
+
+    def __init__(
+        self, assoc = None, default_strength = None, sparse = False, 
+        store = None
+    ):
+
+        if not isinstance(assoc, InterlevelLinks):
+            assoc = InterlevelLinks.wrap(assoc)
+        self.assoc: InterlevelLinks = assoc
         self.default_strength = default_strength
+        self.sparse = sparse
+        self.store = store
+        self.reindex()
+
+    def reindex(self):
+        """Rebuild precomputed adjacency from self.assoc."""
+
+        self.assoc.changes(self)
+        self._relink()
+
+    def _relink(self):
+
+        self._clear()
+        for chunk, dim_dict in self.assoc.items():
+            self._link(chunk, dim_dict)
+        self._overlay: typ.FrozenSet[ConstructSymbol] = frozenset(self.assoc)
+
+    def _sync(self):
+        """Patch adjacency for chunks relinked since last sync."""
+
+        assoc = self.assoc
+        changes = assoc.changes(self)
+        if changes is None: # New links, e.g., after assigning self.assoc.
+            self._relink()
+            return
+        for chunk in changes:
+            self._unlink(chunk)
+            if chunk in assoc:
+                self._link(chunk, assoc[chunk])
+        if changes:
+            # Replaced rather than updated, so that earlier outputs keep 
+            # reading store links as they were when computed.
+            self._overlay = frozenset(assoc)
+            if self.store is not None:
+                self._relink_store(changes)
+
+    def _relink_store(self, chunks):
+        """Forget cached store data depending on overlay links of chunks."""
+
+        pass
+
+    def _clear(self):
+
+        raise NotImplementedError()
+
+    def _link(self, chunk, dim_dict):
+
+        raise NotImplementedError()
+
+    def _unlink(self, chunk):
+
+        raise NotImplementedError()
+
+
+class TopDownLinks(_InterlevelChannel):
+    """
+    Propagates activations in a top-down manner.
+    
+    Links are precomputed as feature-to-chunk edges, which are patched when 
+    self.assoc changes (see InterlevelLinks).
+
+    In sparse mode, only features whose strength differs from their default 
+    strength are output, and only chunks present in input strengths are 
+    visited. Sparse mode assumes that chunks at default strength do not raise 
+    linked features above their default strengths (e.g., all defaults are 
+    zero and weights are non-negative).
+    """
 
     def __call__(self, strengths):
 
+        self._sync()
+        if self.sparse:
+            return self._call_sparse(strengths)
         d = {}
-        for chunk, weight, mf in self._iter_assoc():
-            s = weight * strengths.get(chunk, self.default_strength(chunk))
-            d[mf] = max(s, d.get(mf, self.default_strength(mf)))
+        get, default = strengths.get, self.default_strength
+        for mf, edges in self._feature_edges.items():
+            s = default(mf)
+            for (chunk, dim), weight in edges.items():
+                s = max(weight * get(chunk, default(chunk)), s)
+            d[mf] = s
+        if self.store is not None:
+            return self._call_store(strengths, d)
         return d
 
-    def _iter_assoc(self):
+    def _call_store(self, strengths, d):
+        """
+        Add store links to dense output d.
+        
+        Only store features linked to input chunks away from their default 
+        strength, or also linked in self.assoc, are computed; other store 
+        features take their resting strength when read.
+        """
 
-        for chunk, dim_dict in self.assoc.items():
-            for dim, (weight, mfs) in dim_dict.items():
-                for mf in mfs:
-                    yield chunk, weight, mf
+        store, overlay = self.store, self._overlay
+        default = self.default_strength
+        mfs, indptr = store.mfs, store.group_indptr
+        affected = set()
+        for chunk, s in strengths.items():
+            if chunk in overlay or s == default(chunk):
+                continue
+            c = store.position(chunk)
+            if c is not None:
+                for g in store.groups(c):
+                    affected.update(mfs[indptr[g]:indptr[g + 1]])
+        ids = store.ids
+        affected.update(ids[mf] for mf in d if mf in ids)
+        symbols = store.symbols
+        for i in affected:
+            mf = symbols[i]
+            s = self._evaluate(i, strengths, d.get(mf, default(mf)), overlay)
+            if s is not None:
+                d[mf] = s
+        return _StoreStrengths(
+            d, partial(self._rest, self._store_resting, overlay), 
+            self._store_features
+        )
 
+    def _evaluate(self, i, strengths, s, overlay):
+        """
+        Return max of s and store link inputs to feature with symbol id i.
 
-class BottomUpLinks(object):
-    """Propagates activations in a bottom-up manner."""
+        Chunks linked in overlay are skipped. Returns None if no store links 
+        remain.
+        """
 
-    def __init__(self, assoc = None, default_strength = None):
+        store, get, default = self.store, strengths.get, self.default_strength
+        weights = store.weights
+        a, b = store.by_feature_indptr[i], store.by_feature_indptr[i + 1]
+        linked = False
+        for c, g in zip(
+            store.by_feature_chunk[a:b], store.by_feature_group[a:b]
+        ):
+            chunk = store.chunk(c)
+            if chunk in overlay:
+                continue
+            s = max(weights[g] * get(chunk, default(chunk)), s)
+            linked = True
+        return s if linked else None
 
-        self.assoc: InterlevelAssociation = assoc or {}
-        self.default_strength = default_strength
+    def _rest(self, cache, overlay, mf):
+        """Return resting strength of store feature mf, or None."""
 
-    def __call__(self, strengths):
+        i = self.store.ids.get(mf)
+        if i is None:
+            return None
+        try:
+            return cache[i]
+        except KeyError:
+            s = self._evaluate(i, {}, self.default_strength(mf), overlay)
+            cache[i] = s
+            return s
+
+    def _store_features(self):
+        """Iterate over features with store links."""
+
+        symbols, indptr = self.store.symbols, self.store.by_feature_indptr
+        return (
+            symbols[i] for i in range(len(symbols)) 
+            if indptr[i] < indptr[i + 1]
+        )
+
+    def _relink_store(self, chunks):
+
+        store = self.store
+        mfs, indptr = store.mfs, store.group_indptr
+        stale = set()
+        for chunk in chunks:
+            c = store.position(chunk)
+            if c is not None:
+                for g in store.groups(c):
+                    stale.update(mfs[indptr[g]:indptr[g + 1]])
+        if stale:
+            self._store_resting = {
+                i: s for i, s in self._store_resting.items() if i not in stale
+            }
+
+    def _call_sparse(self, strengths):
 
         d = {}
-        for chunk, n_dim, weight, mfs in self._iter_assoc():
-            s_mf = max(
-                strengths.get(mf, self.default_strength(mf)) for mf in mfs
-            )
-            d[chunk] = (
-                d.get(chunk, self.default_strength(chunk)) + 
-                (weight * s_mf) / (n_dim ** 1.1)
+        chunk_edges = self._chunk_edges
+        for chunk, s_chunk in strengths.items():
+            edges = chunk_edges.get(chunk)
+            if edges is None:
+                edges = self._store_edges(chunk)
+            for mf, dim, weight in edges:
+                s = weight * s_chunk
+                if d.get(mf, self.default_strength(mf)) < s:
+                    d[mf] = s
+        return d
+
+    def _store_edges(self, chunk):
+
+        store = self.store
+        if store is None or chunk in self._overlay:
+            return ()
+        c = store.position(chunk)
+        if c is None:
+            return ()
+        return [
+            (mf, store.dim_table[store.dims[g]], store.weights[g]) 
+            for g in store.groups(c) for mf in store.features(g)
+        ]
+
+    def _clear(self):
+
+        self._feature_edges: typ.Dict[ConstructSymbol, typ.Dict] = {}
+        self._chunk_edges: typ.Dict[ConstructSymbol, typ.Tuple] = {}
+        self._store_resting: typ.Dict[int, typ.Any] = {}
+
+    def _link(self, chunk, dim_dict):
+
+        edges = []
+        for dim, (weight, mfs) in dim_dict.items():
+            for mf in mfs:
+                self._feature_edges.setdefault(mf, {})[chunk, dim] = weight
+                edges.append((mf, dim, weight))
+        self._chunk_edges[chunk] = tuple(edges)
+
+    def _unlink(self, chunk):
+
+        for mf, dim, weight in self._chunk_edges.pop(chunk, ()):
+            edges = self._feature_edges[mf]
+            del edges[chunk, dim]
+            if not edges:
+                del self._feature_edges[mf]
+
+
+class BottomUpLinks(_InterlevelChannel):
+    """
+    Propagates activations in a bottom-up manner.
+    
+    Links are precomputed as dimensional feature groups for each chunk, with 
+    dimensional weights pre-divided by n_dim ** 1.1. Groups are patched when 
+    self.assoc changes (see InterlevelLinks).
+
+    A reverse index from features to linked chunks restricts computation to 
+    chunks linked to features whose input strength differs from their default 
+    strength. Other chunks take their resting strength, found when their links 
+    are indexed. Results are identical to evaluating every chunk, provided 
+    that default strengths are fixed.
+
+    In sparse mode, only chunks whose strength differs from their default 
+    strength are output.
+
+    Store chunks are visited through the reverse index of the store. Resting 
+    strengths of store chunks are found on demand and cached; in sparse mode, 
+    store chunks with a resting strength away from their default strength are 
+    found on the first call.
+    """
+
+    def __call__(self, strengths):
+
+        self._sync()
+        get, default = strengths.get, self.default_strength
+        feature_links = self._feature_links
+        affected = {}
+        for mf, s in strengths.items():
+            links = feature_links.get(mf)
+            if links is not None and s != default(mf):
+                affected.update(links)
+
+        if self.sparse:
+            d = dict(self._active_resting)
+        else:
+            d = dict(self._resting)
+        groups = self._groups
+        for chunk in affected:
+            s = default(chunk)
+            for weight, mfs in groups[chunk]:
+                s += weight * max(get(mf, default(mf)) for mf in mfs)
+            d[chunk] = s
+        if self.store is not None:
+            d = self._call_store(strengths, d)
+        if self.sparse:
+            d = {
+                chunk: s for chunk, s in d.items() 
+                if s != self.default_strength(chunk)
+            }
+        return d
+
+    def _call_store(self, strengths, d):
+        """
+        Add store links to output d.
+        
+        Only store chunks linked to input features away from their default 
+        strength are computed. In dense mode, other store chunks take their 
+        resting strength when read.
+        """
+
+        store, overlay = self.store, self._overlay
+        default = self.default_strength
+        affected = set()
+        for mf, s in strengths.items():
+            if s != default(mf):
+                affected.update(c for c, g in store.linked(mf))
+        for c in affected:
+            chunk = store.chunk(c)
+            if chunk not in overlay:
+                d[chunk] = self._evaluate(c, strengths)
+        if not self.sparse:
+            return _StoreStrengths(
+                d, partial(self._rest, overlay), self._store_chunks
             )
+        if self._store_active is None:
+            self._store_active = [
+                c for c in range(len(store)) 
+                if self._rest_at(c) != default(store.chunk(c))
+            ]
+        for c in self._store_active:
+            chunk = store.chunk(c)
+            if chunk not in d and chunk not in overlay:
+                d[chunk] = self._rest_at(c)
         return d
 
-    def _iter_assoc(self):
+    def _evaluate(self, c, strengths):
 
-        for chunk, dim_dict in self.assoc.items():
-            n_dim = len(dim_dict)
-            for dim, (weight, mfs) in dim_dict.items():
-                yield chunk, n_dim, weight, mfs
+        store, get, default = self.store, strengths.get, self.default_strength
+        symbols, mfs, indptr = store.symbols, store.mfs, store.group_indptr
+        chunk = store.chunk(c)
+        s = default(chunk)
+        for g in store.groups(c):
+            s += store.scaled[g] * max(
+                get(symbols[mfs[k]], default(symbols[mfs[k]]))
+                for k in range(indptr[g], indptr[g + 1])
+            )
+        return s
+
+    def _rest(self, overlay, chunk):
+        """Return resting strength of store chunk, or None."""
+
+        if chunk in overlay:
+            return None
+        c = self.store.position(chunk)
+        if c is None:
+            return None
+        return self._rest_at(c)
+
+    def _rest_at(self, c):
+        """Return resting strength of store chunk at position c."""
+
+        try:
+            return self._store_resting[c]
+        except KeyError:
+            s = self._store_resting[c] = self._evaluate(c, {})
+            return s
+
+    def _store_chunks(self):
+        """Iterate over chunks with store links."""
+
+        return map(self.store.chunk, range(len(self.store)))
+
+    def _clear(self):
+
+        self._groups: typ.Dict[ConstructSymbol, typ.Tuple] = {}
+        self._feature_links: typ.Dict[ConstructSymbol, typ.Dict] = {}
+        self._chunk_links: typ.Dict[ConstructSymbol, typ.Tuple] = {}
+        self._resting: typ.Dict[ConstructSymbol, typ.Any] = {}
+        self._active_resting: typ.Dict[ConstructSymbol, typ.Any] = {}
+        self._store_resting: typ.Dict[int, typ.Any] = {}
+        self._store_active: typ.Optional[typ.List[int]] = None
+
+    def _link(self, chunk, dim_dict):
+
+        if not dim_dict:
+            return
+        n_dim = len(dim_dict)
+        groups = self._groups[chunk] = tuple(
+            (weight / (n_dim ** 1.1), tuple(mfs)) 
+            for weight, mfs in dim_dict.values()
+        )
+        # Feature links map linked chunks to the number of their dimensions 
+        # holding the feature, so that each affected chunk is visited once.
+        links = []
+        for weight, mfs in dim_dict.values():
+            for mf in mfs:
+                chunks = self._feature_links.setdefault(mf, {})
+                chunks[chunk] = chunks.get(chunk, 0) + 1
+                links.append(mf)
+        self._chunk_links[chunk] = tuple(links)
+
+        default = self.default_strength
+        s = s0 = default(chunk)
+        for weight, mfs in groups:
+            s += weight * max(default(mf) for mf in mfs)
+        self._resting[chunk] = s
+        if s != s0:
+            self._active_resting[chunk] = s
+
+    def _unlink(self, chunk):
+
+        for mf in self._chunk_links.pop(chunk, ()):
+            chunks = self._feature_links[mf]
+            chunks[chunk] -= 1
+            if not chunks[chunk]:
+                del chunks[chunk]
+                if not chunks:
+                    del self._feature_links[mf]
+        self._groups.pop(chunk, None)
+        self._resting.pop(chunk, None)
+        self._active_resting.pop(chunk, None)
+
+
+def _chunks(csym):
+
+    return csym.ctype in ConstructType.Chunk | ConstructType.ChunkLayer
+
+
+def _features(csym):
+
+    return csym.ctype in ConstructType.Feature | ConstructType.FeatureLayer
+
+
+def _nodes(csym):
+
+    return csym.ctype in ConstructType.Node | ConstructType.Layer
+
+
+def _responses(csym):
+
+    return csym.ctype == ConstructType.Response
+
+
+def _top_down_flows(csym):
+
+    return (
+        csym.ctype == ConstructType.Flow and 
+        typ.cast(FlowID, csym.cid).ftype == FlowType.TB
+    )
+
+
+def _intralevel_flows(csym):
+
+    return (
+        csym.ctype == ConstructType.Flow and 
+        typ.cast(FlowID, csym.cid).ftype in FlowType.TT | FlowType.BB
+    )
+
+
+def _bottom_up_flows(csym):
+
+    return (
+        csym.ctype == ConstructType.Flow and 
+        typ.cast(FlowID, csym.cid).ftype == FlowType.BT
+    )
+
+
+# Stages of the NACS activation cycle, in order of execution. Passed to 
+# SubsystemRealizer.run_plan(), which caches the corresponding execution plan 
+# until subsystem membership changes.
+
+NACS_PROPAGATION_STAGES = (
+    _chunks,
+    _top_down_flows,
+    _features,
+    _intralevel_flows,
+    _nodes,
+    _bottom_up_flows,
+    _chunks,
+    _responses
+)
 
 
 def nacs_propagation_cycle(realizer: SubsystemRealizer) -> None:
     """Execute NACS activation cycle on given subsystem realizer."""
 
-    for node in realizer.nodes:
-        if node.ctype == ConstructType.Chunk:
-            realizer[node].propagate()
-
-    for flow in realizer.flows:
-        if typ.cast(FlowID, flow.cid).ftype == FlowType.TB:
-            realizer[flow].propagate()
-    
-    for node in realizer.nodes:
-        if node.ctype == ConstructType.Feature:
-            realizer[node].propagate()
-    
-    for flow in realizer.flows:
-        if typ.cast(FlowID, flow.cid).ftype in FlowType.TT | FlowType.BB:
-            realizer[flow].propagate()
-    
-    for node in realizer.nodes:
-        realizer[node].propagate()
-    
-    for flow in realizer.flows:
-        if typ.cast(FlowID, flow.cid).ftype == FlowType.BT:
-            realizer[flow].propagate()
-    
-    for node in realizer.nodes:
-        if node.ctype == ConstructType.Chunk:
-            realizer[node].propagate()
-    
-    for appraisal in realizer.responses:
-        realizer[appraisal].propagate()
+    realizer.run_plan(NACS_PROPAGATION_STAGES)
@@ -0,0 +1,506 @@
+"""
+Tools for saving and restoring agent snapshots.
+
+Snapshots store the symbolic structure of an agent (construct symbols and
+realizer membership) separately from its numeric state. Numeric state, namely
+knowledge held by NACS flow channels, strengths stored in constant buffer
+sources and packets held in realizer output views, is stored in contiguous
+arrays that are memory-mapped on load. Knowledge is laid out as in knowledge
+stores (see pyClarion.components.stores), so restored channels read it from
+the mapping instead of rebuilding it in memory.
+
+Components (junctions, selectors, effectors, propagation rules, default
+strength functions, etc.) are not stored. On load, the agent is rebuilt with
+`make_agent()` and passed to a user-supplied configuration function which
+attaches components, after which stored knowledge and activations are
+restored into them.
+
+Array file headers are stored as JSON, so loading a file never runs code from
+it. Header values are limited to None, bools, numbers, strings, lists,
+tuples, sets, dicts and construct symbols whose ids are built from these.
+"""
+
+
+__all__ = ["ArrayFile", "write_array_file", "save_snapshot", "load_snapshot"]
+
+
+import typing as typ
+import json
+import mmap
+import struct
+import sys
+from array import array
+from pyClarion.base import *
+from pyClarion.components.nacs import (
+    AssociativeRuleCollection, TopDownLinks, BottomUpLinks, InterlevelLinks
+)
+from pyClarion.components.compiled import (
+    CompiledAssociativeRules, CompiledTopDownLinks, CompiledBottomUpLinks
+)
+from pyClarion.components.general import ConstantSource
+
+
+Arrays = typ.Mapping[str, array]
+Configure = typ.Callable[[AgentRealizer], None]
+
+
+_MAGIC = b"PYCLARR2"
+_ALIGN = 8
+_RULE_CHANNELS = (AssociativeRuleCollection, CompiledAssociativeRules)
+_INTERLEVEL_CHANNELS = (
+    TopDownLinks, BottomUpLinks, CompiledTopDownLinks, CompiledBottomUpLinks
+)
+
+
+def _aligned(n: int) -> int:
+
+    return -(-n // _ALIGN) * _ALIGN
+
+
+###################
+### Array Files ###
+###################
+
+
+_CIDS = (DVPair, FlowID, ResponseID, BehaviorID, BufferID, LayerID)
+_TAGS: typ.Dict[str, typ.Callable[[typ.Any], typ.Any]] = {
+    "tuple": tuple,
+    "set": set,
+    "frozenset": frozenset,
+    "dict": lambda items: {key: value for key, value in items},
+    "symbol": lambda fields: ConstructSymbol(
+        ConstructType(fields[0]), fields[1]
+    ),
+    "ConstructType": ConstructType,
+    "FlowType": FlowType,
+}
+_TAGS.update(
+    (cls.__name__, lambda fields, cls=cls: cls(*fields)) for cls in _CIDS
+)
+
+
+def _encode(obj: typ.Any) -> typ.Any:
+    """
+    Return JSON-serializable form of header value obj.
+
+    Values other than None, bools, numbers, strings and lists are encoded as 
+    single-key objects mapping a tag in _TAGS to their contents.
+    """
+
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+    elif isinstance(obj, list):
+        return [_encode(x) for x in obj]
+    elif isinstance(obj, ConstructSymbol):
+        return {"symbol": [obj.ctype.value, _encode(obj.cid)]}
+    elif isinstance(obj, (ConstructType, FlowType)):
+        return {type(obj).__name__: obj.value}
+    elif type(obj) in _CIDS or type(obj) in (tuple, set, frozenset):
+        return {type(obj).__name__: [_encode(x) for x in obj]}
+    elif isinstance(obj, dict):
+        return {
+            "dict": [[_encode(k), _encode(v)] for k, v in obj.items()]
+        }
+    else:
+        raise TypeError(
+            "Cannot store {} in an array file header.".format(repr(obj))
+        )
+
+
+def _decode(obj: typ.Dict[str, typ.Any]) -> typ.Any:
+    """Invert _encode() on a JSON object, as a json.loads() object hook."""
+
+    try:
+        ((tag, contents),) = obj.items()
+        return _TAGS[tag](contents)
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("Malformed array file header.")
+
+
+def write_array_file(path: str, header: typ.Dict, arrays: Arrays) -> None:
+    """
+    Write a JSON header followed by contiguous arrays to path.
+
+    Arrays are written in native byte order, each starting at an 8-byte
+    aligned offset, so that they may be memory-mapped by ArrayFile.
+
+    :param path: Destination file path.
+    :param header: Dict of metadata, holding values of the types listed in
+        the module docstring. Keys 'arrays' and 'byteorder' are reserved.
+    :param arrays: Mapping from array names to stdlib arrays.
+    """
+
+    specs, offset = [], 0
+    for name, data in arrays.items():
+        specs.append((name, data.typecode, offset, len(data)))
+        offset += _aligned(len(data) * data.itemsize)
+    header = dict(header, arrays=specs, byteorder=sys.byteorder)
+    blob = json.dumps(_encode(header)).encode("utf-8")
+    start = _aligned(len(_MAGIC) + 8 + len(blob))
+    with open(path, "wb") as f:
+        f.write(_MAGIC)
+        f.write(struct.pack("<Q", len(blob)))
+        f.write(blob)
+        f.write(bytes(start - f.tell()))
+        for data in arrays.values():
+            size = len(data) * data.itemsize
+            data.tofile(f)
+            f.write(bytes(_aligned(size) - size))
+
+
+class ArrayFile(object):
+    """
+    Read-only, memory-mapped view of a file written by write_array_file().
+
+    Arrays are exposed as typed memoryviews into the mapping, so reading them
+    does not copy file contents and pages are shared among processes mapping
+    the same file. Views must be released before the file is closed.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Map an array file.
+
+        :param path: Path of array file.
+        :raises ValueError: If path is not an array file or was written with a
+            different byte order.
+        """
+
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(_MAGIC)] != _MAGIC:
+            self._mmap.close()
+            raise ValueError("{} is not an array file.".format(path))
+        i = len(_MAGIC)
+        (n,) = struct.unpack("<Q", self._mmap[i:i + 8])
+        try:
+            self.header: typ.Dict = json.loads(
+                self._mmap[i + 8:i + 8 + n], object_hook=_decode
+            )
+        except ValueError:
+            self._mmap.close()
+            raise ValueError("{} has a malformed header.".format(path))
+        if self.header["byteorder"] != sys.byteorder:
+            self._mmap.close()
+            raise ValueError(
+                "{} was written with {}-endian byte order.".format(
+                    path, self.header["byteorder"]
+                )
+            )
+        self._start = _aligned(i + 8 + n)
+        self._specs = {
+            name: (typecode, offset, length)
+            for name, typecode, offset, length in self.header["arrays"]
+        }
+
+    def __enter__(self) -> 'ArrayFile':
+
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+
+        self.close()
+
+    def __contains__(self, name: str) -> bool:
+
+        return name in self._specs
+
+    def __getitem__(self, name: str) -> memoryview:
+        """Return a typed memoryview of named array."""
+
+        typecode, offset, length = self._specs[name]
+        a = self._start + offset
+        b = a + length * array(typecode).itemsize
+        return memoryview(self._mmap)[a:b].cast(typecode)
+
+    def close(self) -> None:
+        """Unmap file. Raises BufferError if views are still in use."""
+
+        self._mmap.close()
+
+
+#################
+### Snapshots ###
+#################
+
+
+def save_snapshot(agent: AgentRealizer, path: str) -> None:
+    """
+    Save a snapshot of agent to path.
+
+    Stores agent structure, knowledge of associative rule and interlevel link
+    channels (dict-based or compiled; for channels with a store, only their 
+    assoc overlay), strengths of ConstantSource buffer sources and packets in 
+    output views. Channels sharing an assoc object are stored once and share 
+    it again on load. Strengths, weights and activations are assumed to be 
+    floats.
+
+    :param agent: Agent realizer to be saved.
+    :param path: Destination file path.
+    :raises ValueError: If a dimension of an interlevel link has no features.
+    :raises TypeError: If a construct id is not storable in a JSON header.
+    """
+
+    writer = _SnapshotWriter()
+    writer.add_agent(agent)
+    write_array_file(path, writer.header(), writer.arrays)
+
+
+def load_snapshot(path: str, configure: Configure = None) -> AgentRealizer:
+    """
+    Rebuild an agent from a snapshot saved at path.
+
+    The agent is built with make_agent() and passed to configure, which
+    should attach components as when the agent was first built. Stored
+    knowledge is then restored: dict-based channels left without a store by 
+    configure receive a read-only RuleStore or LinkStore over the mapped 
+    snapshot arrays, with an empty assoc overlay, so that knowledge is read 
+    from the mapping rather than copied. Other channels (compiled channels, 
+    or channels given a store of their own) receive stored knowledge as 
+    their assoc. Channels are then reindexed or recompiled. ConstantSource 
+    strengths are restored (buffers without a source receive a new 
+    ConstantSource) and output views are refilled.
+
+    The snapshot file stays mapped while stores over it are in use.
+
+    :param path: Path of snapshot file.
+    :param configure: Callable attaching components to the rebuilt agent.
+    :raises ValueError: If stored knowledge belongs to a flow lacking a
+        channel of a compatible type after configuration.
+    """
+
+    f = ArrayFile(path)
+    reader = _SnapshotReader(f)
+    agent = reader.build_agent()
+    if configure is not None:
+        configure(agent)
+    reader.restore(agent)
+    if not reader.attached:
+        f.close()
+    return agent
+
+
+class _SnapshotWriter(object):
+    """Collects structure and arrays of an agent snapshot."""
+
+    def __init__(self) -> None:
+
+        self.symbols = SymbolIndex()
+        self.dims: typ.Dict[typ.Hashable, int] = {}
+        self.arrays: typ.Dict[str, array] = {}
+        self.structure: typ.Dict[str, typ.Any] = {}
+        self.channels: typ.List[typ.Tuple] = []
+        self.sources: typ.List[typ.Tuple] = []
+        self.outputs: typ.List[typ.Tuple] = []
+        self.kbs: typ.Dict[str, int] = {}
+        self._kbs: typ.Dict[int, typ.Tuple[str, str]] = {}
+
+    def header(self) -> typ.Dict:
+
+        return {
+            "format": 2,
+            "symbols": list(self.symbols),
+            "dims": list(self.dims),
+            "structure": self.structure,
+            "kbs": self.kbs,
+            "channels": self.channels,
+            "sources": self.sources,
+            "outputs": self.outputs,
+        }
+
+    def add_agent(self, agent: AgentRealizer) -> None:
+
+        sid = self.symbols.add
+        self.structure = {
+            "agent": sid(agent.csym),
+            "subsystems": [
+                (sid(subsystem), [sid(m) for m in agent[subsystem]])
+                for subsystem in agent.subsystems
+            ],
+            "buffers": [sid(buffer) for buffer in agent.buffers],
+        }
+        for buffer in agent.buffers:
+            realizer = agent[buffer]
+            self._add_output((sid(buffer),), realizer)
+            source = getattr(realizer, "source", None)
+            if isinstance(source, ConstantSource):
+                name = "source{}".format(len(self.sources))
+                self._add_strengths(name, source.strengths)
+                self.sources.append((sid(buffer), name))
+        for subsystem in agent.subsystems:
+            for csym, realizer in agent[subsystem].items():
+                path = (sid(subsystem), sid(csym))
+                self._add_output(path, realizer)
+                channel = getattr(realizer, "channel", None)
+                if channel is not None:
+                    self._add_channel(path, channel)
+
+    def _add_channel(self, path, channel) -> None:
+
+        # Imported here, as stores depends on this module for array files.
+        from pyClarion.components.stores import rule_arrays, link_arrays
+
+        if isinstance(channel, _RULE_CHANNELS):
+            kind = "rules"
+        elif isinstance(channel, _INTERLEVEL_CHANNELS):
+            kind = "interlevel"
+        else:
+            return
+        key = id(channel.assoc)
+        if key not in self._kbs:
+            name = "kb{}".format(len(self._kbs))
+            if kind == "rules":
+                arrays = rule_arrays(channel.assoc, self.symbols)
+            else:
+                arrays = link_arrays(channel.assoc, self.symbols, self.dims)
+            self._store(name, **arrays)
+            # Store arrays only cover symbols known when they were built.
+            self.kbs[name] = len(self.symbols)
+            self._kbs[key] = (kind, name)
+        self.channels.append((path,) + self._kbs[key])
+
+    def _add_strengths(self, name, strengths) -> None:
+
+        sid = self.symbols.add
+        self._store(
+            name,
+            keys=array('q', (sid(node) for node in strengths)),
+            values=array('d', strengths.values())
+        )
+
+    def _add_output(self, path, realizer) -> None:
+
+        output = getattr(realizer, "output", None)
+        packet = output.view() if output is not None else None
+        if packet is None:
+            return
+        name = "output{}".format(len(self.outputs))
+        self._add_strengths(name, packet.strengths)
+        if isinstance(packet, DecisionPacket):
+            sid = self.symbols.add
+            self._store(name, chosen=array('q', map(sid, packet.chosen)))
+        self.outputs.append(
+            (path, name, isinstance(packet, DecisionPacket), packet.origin)
+        )
+
+    def _store(self, name, **arrays) -> None:
+
+        for key, data in arrays.items():
+            self.arrays["{}.{}".format(name, key)] = data
+
+
+class _SnapshotReader(object):
+    """Restores snapshot contents from an array file."""
+
+    def __init__(self, f: ArrayFile) -> None:
+
+        self.file = f
+        self.symbols = f.header["symbols"]
+        self.dims = f.header["dims"]
+        self.header = f.header
+        self.attached = False
+
+    def build_agent(self) -> AgentRealizer:
+
+        symbols, structure = self.symbols, self.header["structure"]
+        return make_agent(
+            csym=symbols[structure["agent"]],
+            subsystems={
+                symbols[subsystem]: [symbols[m] for m in members]
+                for subsystem, members in structure["subsystems"]
+            },
+            buffers=[symbols[buffer] for buffer in structure["buffers"]]
+        )
+
+    def restore(self, agent: AgentRealizer) -> None:
+
+        symbols = self.symbols
+        stores: typ.Dict[str, typ.Any] = {}
+        overlays: typ.Dict[str, typ.Any] = {}
+        copies: typ.Dict[str, typ.Any] = {}
+        for path, kind, name in self.header["channels"]:
+            index = tuple(symbols[i] for i in path)
+            channel = getattr(agent[index], "channel", None)
+            if kind == "rules":
+                expected = _RULE_CHANNELS
+            else:
+                expected = _INTERLEVEL_CHANNELS
+            if not isinstance(channel, expected):
+                raise ValueError(
+                    "Snapshot holds {} knowledge for {}, but its channel is "
+                    "{}.".format(kind, str(index[-1]), repr(channel))
+                )
+            if name not in stores:
+                stores[name] = self._open_store(kind, name)
+            if getattr(channel, "store", False) is None:
+                if name not in overlays:
+                    overlays[name] = (
+                        {} if kind == "rules" else InterlevelLinks()
+                    )
+                channel.store = stores[name]
+                channel.assoc = overlays[name]
+            else:
+                if name not in copies:
+                    copies[name] = self._copy(kind, stores[name])
+                channel.assoc = copies[name]
+            if hasattr(channel, "reindex"):
+                channel.reindex()
+            else:
+                channel.compile()
+        for name, store in stores.items():
+            if name not in overlays:
+                store.close()
+        self.attached = bool(overlays)
+
+        for i, name in self.header["sources"]:
+            realizer = agent[symbols[i]]
+            strengths = self._read_strengths(name)
+            source = getattr(realizer, "source", None)
+            if isinstance(source, ConstantSource):
+                source.strengths = strengths
+            elif source is None:
+                realizer.source = ConstantSource(strengths)
+
+        for path, name, is_decision, origin in self.header["outputs"]:
+            index = tuple(symbols[i] for i in path)
+            realizer = agent[index if len(index) > 1 else index[0]]
+            strengths = self._read_strengths(name)
+            if is_decision:
+                chosen = tuple(
+                    symbols[j] for j in self.file[name + ".chosen"]
+                )
+                packet: typ.Any = DecisionPacket(strengths, chosen, origin)
+            else:
+                packet = ActivationPacket(strengths, origin)
+            realizer.output.update(packet)
+
+    def _open_store(self, kind, name) -> typ.Any:
+        """Return a store over knowledge arrays stored under name."""
+
+        # Imported here, as stores depends on this module for array files.
+        from pyClarion.components.stores import RuleStore, LinkStore
+
+        cls = RuleStore if kind == "rules" else LinkStore
+        header = {
+            "symbols": self.symbols[:self.header["kbs"][name]],
+            "dims": self.dims
+        }
+        return cls.view(self.file, name + ".", header)
+
+    @staticmethod
+    def _copy(kind, store) -> typ.Any:
+        """Return knowledge of store as an in-memory assoc."""
+
+        if kind == "interlevel":
+            return InterlevelLinks(dict(store.items()))
+        assoc: typ.Dict = {}
+        for conc, conds in store.items():
+            assoc.setdefault(conc, []).append(conds)
+        return assoc
+
+    def _read_strengths(self, name) -> typ.Dict:
+
+        symbols = self.symbols
+        keys = self.file[name + ".keys"].tolist()
+        values = self.file[name + ".values"].tolist()
+        return {symbols[k]: v for k, v in zip(keys, values)}
@@ -0,0 +1,270 @@
+"""Tools for timing construct realizers and their components."""
+
+
+__all__ = ["CallRecord", "Profiler"]
+
+
+import typing as typ
+from inspect import isawaitable
+from time import perf_counter
+from pyClarion.base import *
+
+
+# Realizer attributes wrapped by Profiler, with functions measuring the size
+# of their outputs.
+
+def _mapping_size(result):
+
+    return len(result)
+
+
+def _selection_size(result):
+
+    return len(result[0])
+
+
+def _no_size(result):
+
+    return 0
+
+
+_COMPONENTS = (
+    ("junction", _mapping_size),
+    ("channel", _mapping_size),
+    ("selector", _selection_size),
+    ("effector", _no_size),
+    ("source", _mapping_size),
+)
+
+
+class CallRecord(object):
+    """Accumulates call statistics for one instrumented callable."""
+
+    __slots__ = ("calls", "time", "size")
+
+    def __init__(self) -> None:
+
+        self.calls = 0
+        self.time = 0.0
+        self.size = 0
+
+    def __repr__(self) -> str:
+
+        return "<CallRecord: calls={}, time={:.6f}, size={}>".format(
+            self.calls, self.time, self.size
+        )
+
+    def add(self, time: float, size: int) -> None:
+        """Record one call taking given time and emitting given size."""
+
+        self.calls += 1
+        self.time += time
+        self.size += size
+
+    def merge(self, other: "CallRecord") -> None:
+        """Add statistics of other record to self."""
+
+        self.calls += other.calls
+        self.time += other.time
+        self.size += other.size
+
+
+class _Timed(object):
+    """
+    Wraps a callable, recording its calls in a CallRecord.
+
+    If the callable returns an awaitable (e.g., an async source or effector), 
+    an awaitable is returned in its place, and the call is recorded when it 
+    completes, timed up to completion and sized by the awaited result.
+    """
+
+    def __init__(self, func, record, size):
+
+        self.func = func
+        self.record = record
+        self.size = size
+
+    def __call__(self, *args, **kwargs):
+
+        start = perf_counter()
+        result = self.func(*args, **kwargs)
+        if isawaitable(result):
+            return self._await(result, start)
+        elapsed = perf_counter() - start
+        self.record.add(elapsed, self.size(result))
+        return result
+
+    async def _await(self, awaitable, start):
+
+        result = await awaitable
+        self.record.add(perf_counter() - start, self.size(result))
+        return result
+
+    def __getattr__(self, name):
+
+        # Expose attributes of wrapped components (e.g., effector mappings).
+        return getattr(self.func, name)
+
+    @property  # type: ignore
+    def __class__(self):
+
+        # Pass isinstance() checks on wrapped components (e.g., those of 
+        # stream_trials() and save_snapshot()) as the component would.
+        return self.func.__class__
+
+
+class Profiler(object):
+    """
+    Records call counts, cumulative wall time and output sizes of realizers.
+
+    Profilers instrument realizers in place: propagate methods, components
+    (junctions, channels, selectors, effectors and sources), agent learn
+    methods and their asyncio counterparts are shadowed by timing wrappers on
+    attach and restored on detach. Calls returning awaitables are recorded
+    when awaited to completion.
+    Realizers that are not attached run unmodified code, so instrumentation
+    has no cost when it is not in use. Wrapped components pass isinstance()
+    checks for the classes of the components they wrap.
+
+    Records are keyed by the compound index of the instrumented realizer and
+    the name of the instrumented attribute. Sizes count entries in emitted
+    strength mappings. Times of container propagate methods include the times
+    of their members.
+
+    .. warning:
+       Components assigned to realizers while a profiler is attached are not
+       instrumented.
+    """
+
+    def __init__(self) -> None:
+
+        self.records: typ.Dict[typ.Tuple[typ.Any, str], CallRecord] = {}
+        self._patched: typ.List[typ.Tuple[typ.Any, str, typ.Any]] = []
+        self._subsystems: typ.List[SubsystemRealizer] = []
+
+    def attach(self, realizer: ConstructRealizer) -> None:
+        """Instrument realizer and, recursively, all of its members."""
+
+        self._attach(realizer, realizer.csym)
+
+    def detach(self) -> None:
+        """Remove all instrumentation. Recorded statistics are kept."""
+
+        for obj, name, original in reversed(self._patched):
+            if original is None:
+                delattr(obj, name)
+            else:
+                setattr(obj, name, original)
+        self._patched.clear()
+        for subsystem in self._subsystems:
+            subsystem.clear_plans()
+        self._subsystems.clear()
+
+    def reset(self) -> None:
+        """Discard recorded statistics."""
+
+        for record in self.records.values():
+            record.calls, record.time, record.size = 0, 0.0, 0
+
+    def summary(self) -> typ.Dict[typ.Tuple[typ.Any, ...], CallRecord]:
+        """
+        Return statistics grouped by construct type, flow type and attribute.
+
+        Keys have the form (ctype, ftype, name), where ftype is None for
+        constructs other than flows.
+        """
+
+        groups: typ.Dict[typ.Tuple[typ.Any, ...], CallRecord] = {}
+        for (index, name), record in self.records.items():
+            csym = index if isinstance(index, ConstructSymbol) else index[-1]
+            ftype = (
+                typ.cast(FlowID, csym.cid).ftype
+                if csym.ctype == ConstructType.Flow else None
+            )
+            key = (csym.ctype, ftype, name)
+            groups.setdefault(key, CallRecord()).merge(record)
+        return groups
+
+    def report(self, top: int = 10) -> str:
+        """
+        Return a text report of recorded statistics.
+
+        The report lists grouped statistics (see Profiler.summary()) followed
+        by the most time-consuming individual records.
+
+        :param top: Number of individual records to list.
+        """
+
+        row = "{:<36} {:>10} {:>12} {:>12} {:>10}"
+        header = row.format("", "calls", "time (s)", "mean (s)", "mean size")
+        lines = ["By construct type:", header]
+        for (ctype, ftype, name), record in sorted(
+            self.summary().items(), key=lambda item: -item[1].time
+        ):
+            label = ctype.name or str(ctype)
+            if ftype is not None:
+                label += "[{}]".format(ftype.name or str(ftype))
+            lines.append(self._format_row(row, label + "." + name, record))
+        lines.extend(["", "Top {} records:".format(top), header])
+        for (index, name), record in sorted(
+            self.records.items(), key=lambda item: -item[1].time
+        )[:top]:
+            csym = index if isinstance(index, ConstructSymbol) else index[-1]
+            lines.append(self._format_row(row, str(csym) + "." + name, record))
+        return "\n".join(lines)
+
+    @staticmethod
+    def _format_row(row, label, record):
+
+        calls = max(record.calls, 1)
+        return row.format(
+            label[:36], record.calls, "{:.6f}".format(record.time),
+            "{:.6f}".format(record.time / calls),
+            "{:.1f}".format(record.size / calls)
+        )
+
+    def _attach(self, realizer, index):
+
+        if isinstance(realizer, BasicConstructRealizer):
+            for name, size in _COMPONENTS:
+                if name in realizer.__slots__ and hasattr(realizer, name):
+                    self._patch(realizer, name, index, size)
+            size = lambda result, r=realizer: self._output_size(r)
+            self._patch(realizer, "propagate", index, size)
+            if hasattr(realizer, "apropagate"):
+                self._patch(realizer, "apropagate", index, size)
+        elif isinstance(realizer, ContainerConstructRealizer):
+            for csym, member in realizer.items():
+                self._attach(member, self._compound(index, csym))
+            self._patch(realizer, "propagate", index, _no_size)
+            if isinstance(realizer, SubsystemRealizer):
+                for name in ("execute", "aexecute"):
+                    self._patch(realizer, name, index, _no_size)
+                realizer.clear_plans()
+                self._subsystems.append(realizer)
+            elif isinstance(realizer, AgentRealizer):
+                for name in ("learn", "apropagate", "aexecute", "alearn"):
+                    self._patch(realizer, name, index, _no_size)
+
+    def _patch(self, obj, name, index, size):
+
+        original = obj.__dict__.get(name)
+        if original is None and name in getattr(type(obj), "__slots__", ()):
+            original = getattr(obj, name)
+        record = self.records.setdefault((index, name), CallRecord())
+        setattr(obj, name, _Timed(getattr(obj, name), record, size))
+        self._patched.append((obj, name, original))
+
+    @staticmethod
+    def _output_size(realizer):
+
+        output = getattr(realizer, "output", None)
+        packet = output.view() if output is not None else None
+        return len(packet.strengths) if packet is not None else 0
+
+    @staticmethod
+    def _compound(index, csym):
+
+        if isinstance(index, ConstructSymbol):
+            return (index, csym)
+        return index + (csym,)
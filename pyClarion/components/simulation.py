@@ -0,0 +1,186 @@
+"""Tools for driving agents through many stimuli."""
+
+
+__all__ = ["TrialRunner", "stream_trials"]
+
+
+import typing as typ
+import random
+import multiprocessing
+from collections import deque
+from itertools import islice
+from pyClarion.base import *
+from pyClarion.components.general import ConstantSource, StreamingSource
+
+
+Stimulus = typ.Mapping[ConstructSymbol, typ.Mapping[ConstructSymbol, typ.Any]]
+AgentFactory = typ.Callable[[], AgentRealizer]
+Extractor = typ.Callable[[AgentRealizer], typ.Any]
+Shard = typ.Tuple[int, typ.List[Stimulus]]
+
+
+class TrialRunner(object):
+    """
+    Runs independent stimulus trials on worker processes.
+
+    Each worker builds its own agent once, using the agent factory, so agents 
+    are never pickled. Trials are split into shards of consecutive stimuli 
+    and shards are distributed among workers. Each trial presents its 
+    stimulus to the buffers of the agent, propagates and (optionally) 
+    executes, extracts a result and finally clears agent activations.
+
+    Before running a shard, the global `random` generator used by stock 
+    selectors is seeded from the runner seed and the shard position. Results 
+    are therefore reproducible regardless of how shards are scheduled, 
+    provided that trials do not alter agent knowledge.
+    """
+
+    def __init__(
+        self, 
+        agent_factory: AgentFactory, 
+        extractor: Extractor, 
+        processes: typ.Optional[int] = None, 
+        seed: int = 0,
+        shard_size: int = 64,
+        execute: bool = True,
+        max_pending: typ.Optional[int] = None
+    ) -> None:
+        """
+        Initialize a new trial runner.
+
+        :param agent_factory: Picklable callable taking no arguments and 
+            returning a ready agent realizer (e.g., a module-level function).
+        :param extractor: Picklable callable taking the agent realizer at the 
+            end of a trial and returning a picklable result.
+        :param processes: Number of worker processes. If None, uses the 
+            multiprocessing default. If 0, trials run in the current process.
+        :param seed: Base seed for shard random number generation.
+        :param shard_size: Number of consecutive trials per shard.
+        :param execute: If true, execute selected actions in each trial.
+        :param max_pending: Maximum number of shards submitted to workers 
+            ahead of the results being consumed. If None, twice the number of 
+            worker processes.
+        """
+
+        self.agent_factory = agent_factory
+        self.extractor = extractor
+        self.processes = processes
+        self.seed = seed
+        self.shard_size = shard_size
+        self.execute = execute
+        self.max_pending = max_pending
+
+    def run(self, stimuli: typ.Iterable[Stimulus]) -> typ.Iterator[typ.Any]:
+        """
+        Run one trial per stimulus and yield results in stimulus order.
+
+        Stimuli are consumed lazily, so long or unbounded stimulus streams are 
+        supported: at most self.max_pending shards are submitted to workers 
+        beyond the shard whose results are being yielded.
+
+        :param stimuli: Iterable of mappings from buffer symbols to buffer 
+            strengths. Buffers missing from a mapping output nothing.
+        """
+
+        args = (self.agent_factory, self.extractor, self.seed, self.execute)
+        shards = self._iter_shards(stimuli)
+        if self.processes == 0:
+            _init_worker(*args)
+            for shard in shards:
+                yield from _run_shard(shard)
+        else:
+            processes = self.processes or multiprocessing.cpu_count()
+            max_pending = self.max_pending or 2 * processes
+            with multiprocessing.Pool(
+                processes, initializer=_init_worker, initargs=args
+            ) as pool:
+                pending: typ.Deque = deque(
+                    pool.apply_async(_run_shard, (shard,)) 
+                    for shard in islice(shards, max_pending)
+                )
+                while pending:
+                    results = pending.popleft().get()
+                    for shard in islice(shards, 1):
+                        pending.append(pool.apply_async(_run_shard, (shard,)))
+                    yield from results
+
+    def _iter_shards(
+        self, stimuli: typ.Iterable[Stimulus]
+    ) -> typ.Iterator[Shard]:
+
+        stimuli = iter(stimuli)
+        position = 0
+        while True:
+            shard = list(islice(stimuli, self.shard_size))
+            if not shard:
+                return
+            yield position, shard
+            position += 1
+
+
+def stream_trials(
+    agent: AgentRealizer, 
+    extractor: typ.Optional[Extractor] = None, 
+    execute: bool = False
+) -> typ.Iterator[typ.Any]:
+    """
+    Advance streaming buffer sources of agent in lockstep with agent.
+
+    Each step advances every buffer source of agent that is a StreamingSource 
+    by one delta, then propagates (and optionally executes) agent and yields 
+    the result of extractor, or agent itself if no extractor is given. Agent 
+    activations are cleared and streaming sources released (see 
+    StreamingSource.release()) when the next step is requested, which lets 
+    sources apply their next delta in place. Stops as soon as any stream is 
+    exhausted. Buffer strengths seen at one step are therefore only valid 
+    until the next step is requested; copy them to keep them.
+
+    :param agent: A ready agent realizer.
+    :param extractor: Optional callable taking agent at the end of a step.
+    :param execute: If true, execute selected actions at each step.
+    :raises ValueError: If agent has no streaming buffer sources.
+    """
+
+    sources = [
+        agent[buffer].source for buffer in agent.buffers 
+        if isinstance(agent[buffer].source, StreamingSource)
+    ]
+    if not sources:
+        raise ValueError("Agent has no streaming buffer sources.")
+    while all([source.advance() for source in sources]):
+        agent.propagate()
+        if execute:
+            agent.execute()
+        yield extractor(agent) if extractor is not None else agent
+        agent.clear_activations()
+        for source in sources:
+            source.release()
+
+
+# Worker state for TrialRunner. Set once per worker process by _init_worker().
+
+_worker: typ.Dict[str, typ.Any] = {}
+
+
+def _init_worker(agent_factory, extractor, seed, execute):
+
+    _worker.update(
+        agent=agent_factory(), extractor=extractor, seed=seed, execute=execute
+    )
+
+
+def _run_shard(shard: Shard) -> typ.List[typ.Any]:
+
+    position, stimuli = shard
+    agent, extractor = _worker["agent"], _worker["extractor"]
+    random.seed("{}:{}".format(_worker["seed"], position))
+    results = []
+    for stimulus in stimuli:
+        for buffer in agent.buffers:
+            agent[buffer].source = ConstantSource(stimulus.get(buffer))
+        agent.propagate()
+        if _worker["execute"]:
+            agent.execute()
+        results.append(extractor(agent))
+        agent.clear_activations()
+    return results
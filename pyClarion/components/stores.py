@@ -0,0 +1,343 @@
+"""
+Read-only, memory-mapped knowledge stores for NACS flow channels.
+
+Stores hold associative rules or interlevel links as CSR arrays in files
+written by `write_rule_store()` and `write_link_store()`. Files are
+memory-mapped on open, so processes opening the same store share its pages
+and each process only materializes the symbol table.
+
+Channels take a store through their `store` argument and treat their own
+`assoc` as an in-memory overlay, to which learning updates go: overlay rules
+are evaluated alongside store rules, and overlay links of a chunk replace its
+store links. See AssociativeRuleCollection, TopDownLinks and BottomUpLinks.
+"""
+
+
+__all__ = [
+    "RuleStore", "LinkStore", "write_rule_store", "write_link_store", 
+    "rule_arrays", "link_arrays"
+]
+
+
+import typing as typ
+from array import array
+from pyClarion.base import *
+from pyClarion.components.persistence import ArrayFile, write_array_file
+
+
+def _csr_by(keys, values, n_keys):
+    """Return CSR arrays (indptr, values) grouping values by integer key."""
+
+    counts = [0] * (n_keys + 1)
+    for key in keys:
+        counts[key + 1] += 1
+    for i in range(n_keys):
+        counts[i + 1] += counts[i]
+    indptr = array('q', counts)
+    grouped = array('q', bytes(8 * len(values)))
+    fill = counts[:-1]
+    for key, value in zip(keys, values):
+        grouped[fill[key]] = value
+        fill[key] += 1
+    return indptr, grouped
+
+
+def write_rule_store(path: str, assoc) -> None:
+    """
+    Write associative rules to a rule store file.
+
+    :param path: Destination file path.
+    :param assoc: Associative rules, in the form taken by
+        AssociativeRuleCollection.
+    """
+
+    symbols = SymbolIndex()
+    arrays = rule_arrays(assoc, symbols)
+    write_array_file(path, {"kind": "rules", "symbols": list(symbols)}, arrays)
+
+
+def write_link_store(path: str, assoc) -> None:
+    """
+    Write interlevel links to a link store file.
+
+    :param path: Destination file path.
+    :param assoc: Interlevel links, in the form taken by TopDownLinks and
+        BottomUpLinks. Chunks without links are omitted.
+    :raises ValueError: If a dimension has no features.
+    """
+
+    symbols, dims = SymbolIndex(), {}
+    arrays = link_arrays(assoc, symbols, dims)
+    write_array_file(
+        path,
+        {"kind": "links", "symbols": list(symbols), "dims": list(dims)},
+        arrays
+    )
+
+
+def rule_arrays(assoc, symbols: SymbolIndex) -> typ.Dict[str, array]:
+    """
+    Return arrays of a RuleStore holding associative rules.
+
+    :param assoc: Associative rules, in the form taken by
+        AssociativeRuleCollection.
+    :param symbols: Symbol table, extended with symbols of assoc. Arrays
+        refer to symbols by their position in it.
+    """
+
+    concs, indptr = array('q'), array('q', [0])
+    conds, weights, rule_ids = array('q'), array('d'), array('q')
+    for conc, cond_list in assoc.items():
+        for rule in cond_list:
+            r = len(concs)
+            concs.append(symbols.add(conc))
+            for cond, weight in rule.items():
+                conds.append(symbols.add(cond))
+                weights.append(weight)
+                rule_ids.append(r)
+            indptr.append(len(conds))
+    by_cond_indptr, by_cond = _csr_by(conds, rule_ids, len(symbols))
+    return {
+        "concs": concs, "indptr": indptr, "conds": conds, "weights": weights,
+        "by_cond_indptr": by_cond_indptr, "by_cond": by_cond
+    }
+
+
+def link_arrays(
+    assoc, symbols: SymbolIndex, dims: typ.Dict[typ.Hashable, int]
+) -> typ.Dict[str, array]:
+    """
+    Return arrays of a LinkStore holding interlevel links.
+
+    :param assoc: Interlevel links, in the form taken by TopDownLinks and
+        BottomUpLinks. Chunks without links are omitted.
+    :param symbols: Symbol table, extended with symbols of assoc. Arrays
+        refer to symbols by their position in it.
+    :param dims: Mapping from dimensions to their ids, extended with
+        dimensions of assoc.
+    :raises ValueError: If a dimension has no features.
+    """
+
+    chunks, chunk_indptr = array('q'), array('q', [0])
+    group_dims, weights, scaled = array('q'), array('d'), array('d')
+    group_indptr, mfs = array('q', [0]), array('q')
+    for chunk, dim_dict in assoc.items():
+        if not dim_dict:
+            continue
+        chunks.append(symbols.add(chunk))
+        n_dim = len(dim_dict)
+        for dim, (weight, features) in dim_dict.items():
+            if not features:
+                raise ValueError(
+                    "Dimension {} of {} has no features.".format(
+                        repr(dim), str(chunk)
+                    )
+                )
+            group_dims.append(dims.setdefault(dim, len(dims)))
+            weights.append(weight)
+            scaled.append(weight / (n_dim ** 1.1))
+            mfs.extend(symbols.add(mf) for mf in features)
+            group_indptr.append(len(mfs))
+        chunk_indptr.append(len(weights))
+
+    # Reverse index from features to (chunk position, group) pairs.
+    sym_chunk = array('q', [-1]) * len(symbols)
+    for position, sid in enumerate(chunks):
+        sym_chunk[sid] = position
+    mf_chunks, mf_groups = array('q'), array('q')
+    for c in range(len(chunks)):
+        for g in range(chunk_indptr[c], chunk_indptr[c + 1]):
+            for k in range(group_indptr[g], group_indptr[g + 1]):
+                mf_chunks.append(c)
+                mf_groups.append(g)
+    by_feature_indptr, by_feature_group = _csr_by(
+        mfs, range(len(mfs)), len(symbols)
+    )
+    by_feature_chunk = array(
+        'q', (mf_chunks[k] for k in by_feature_group)
+    )
+    by_feature_group = array('q', (mf_groups[k] for k in by_feature_group))
+    return {
+        "chunks": chunks, "sym_chunk": sym_chunk,
+        "chunk_indptr": chunk_indptr, "dims": group_dims, "weights": weights,
+        "scaled": scaled, "group_indptr": group_indptr, "mfs": mfs,
+        "by_feature_indptr": by_feature_indptr,
+        "by_feature_chunk": by_feature_chunk,
+        "by_feature_group": by_feature_group
+    }
+
+
+class _Store(object):
+    """Base class for memory-mapped knowledge stores."""
+
+    kind: typ.ClassVar[str] = ""
+    _arrays: typ.ClassVar[typ.Tuple[str, ...]] = ()
+
+    def __init__(self, path: str) -> None:
+        """
+        Open a store file.
+
+        :param path: Path of store file.
+        :raises ValueError: If path does not hold a store of the right kind.
+        """
+
+        f = ArrayFile(path)
+        if f.header.get("kind") != self.kind:
+            f.close()
+            raise ValueError(
+                "{} does not hold {}.".format(path, self.kind)
+            )
+        self._open(f, "", f.header)
+        self._owns_file = True
+
+    @classmethod
+    def view(cls, f: ArrayFile, prefix: str, header: typ.Dict) -> '_Store':
+        """
+        Return a store over arrays held in an open array file.
+
+        Used to read knowledge stored alongside other arrays, as in agent 
+        snapshots. The store does not close f.
+
+        :param f: Array file holding arrays returned by rule_arrays() or 
+            link_arrays().
+        :param prefix: Prefix of store array names in f.
+        :param header: Dict giving the symbol table of the arrays under key 
+            'symbols' (and, for links, the dimension table under 'dims').
+        """
+
+        store = cls.__new__(cls)
+        store._open(f, prefix, header)
+        store._owns_file = False
+        return store
+
+    def _open(self, f: ArrayFile, prefix: str, header: typ.Dict) -> None:
+
+        self._file = f
+        self.symbols: typ.List[ConstructSymbol] = header["symbols"]
+        self.ids = {csym: i for i, csym in enumerate(self.symbols)}
+        for name in self._arrays:
+            setattr(self, name, f[prefix + name])
+
+    def close(self) -> None:
+        """Release array views and unmap store file, if opened from path."""
+
+        for name in self._arrays:
+            getattr(self, name).release()
+        if self._owns_file:
+            self._file.close()
+
+
+class RuleStore(_Store):
+    """
+    Memory-mapped associative rules, indexed by condition chunk.
+
+    Rule r concludes symbols[concs[r]] with condition ids conds[a:b] and
+    weights weights[a:b], where a, b = indptr[r], indptr[r + 1].
+    """
+
+    kind = "rules"
+    _arrays = (
+        "concs", "indptr", "conds", "weights", "by_cond_indptr", "by_cond"
+    )
+
+    def __len__(self) -> int:
+
+        return len(self.concs)
+
+    def rules_with(self, csym: ConstructSymbol) -> typ.Sequence[int]:
+        """Return ids of rules having csym as a condition."""
+
+        i = self.ids.get(csym)
+        if i is None:
+            return ()
+        return self.by_cond[self.by_cond_indptr[i]:self.by_cond_indptr[i + 1]]
+
+    def rule(self, r: int) -> typ.Tuple[ConstructSymbol, typ.List, typ.Any]:
+        """Return conclusion, condition symbols and weights of rule r."""
+
+        a, b = self.indptr[r], self.indptr[r + 1]
+        symbols = self.symbols
+        return (
+            symbols[self.concs[r]],
+            [symbols[c] for c in self.conds[a:b]],
+            self.weights[a:b]
+        )
+
+    def items(self) -> typ.Iterator[typ.Tuple[ConstructSymbol, typ.Dict]]:
+        """Iterate over (conclusion, conditions) pairs, one per rule."""
+
+        for r in range(len(self)):
+            conc, conds, weights = self.rule(r)
+            yield conc, dict(zip(conds, weights))
+
+
+class LinkStore(_Store):
+    """
+    Memory-mapped interlevel links, indexed by chunk and by feature.
+
+    Chunk c (i.e., symbols[chunks[c]]) has dimensional groups g in
+    range(chunk_indptr[c], chunk_indptr[c + 1]), each with a raw weight, a
+    weight scaled by n_dim ** 1.1 and features mfs[group_indptr[g]:
+    group_indptr[g + 1]].
+    """
+
+    kind = "links"
+    _arrays = (
+        "chunks", "sym_chunk", "chunk_indptr", "dims", "weights", "scaled", 
+        "group_indptr", "mfs", "by_feature_indptr", "by_feature_chunk", 
+        "by_feature_group"
+    )
+
+    def _open(self, f: ArrayFile, prefix: str, header: typ.Dict) -> None:
+
+        super()._open(f, prefix, header)
+        self.dim_table: typ.List[typ.Hashable] = header["dims"]
+
+    def __len__(self) -> int:
+
+        return len(self.chunks)
+
+    def chunk(self, c: int) -> ConstructSymbol:
+        """Return symbol of chunk at position c."""
+
+        return self.symbols[self.chunks[c]]
+
+    def position(self, csym: ConstructSymbol) -> typ.Optional[int]:
+        """Return position of chunk csym, or None if it has no links."""
+
+        i = self.ids.get(csym)
+        if i is None or self.sym_chunk[i] < 0:
+            return None
+        return self.sym_chunk[i]
+
+    def groups(self, c: int) -> range:
+        """Return ids of dimensional groups of chunk at position c."""
+
+        return range(self.chunk_indptr[c], self.chunk_indptr[c + 1])
+
+    def features(self, g: int) -> typ.List[ConstructSymbol]:
+        """Return features of group g."""
+
+        symbols = self.symbols
+        a, b = self.group_indptr[g], self.group_indptr[g + 1]
+        return [symbols[mf] for mf in self.mfs[a:b]]
+
+    def linked(self, csym: ConstructSymbol) -> typ.Iterator[typ.Tuple]:
+        """Iterate over (chunk position, group) pairs linked to feature."""
+
+        i = self.ids.get(csym)
+        if i is None:
+            return iter(())
+        a, b = self.by_feature_indptr[i], self.by_feature_indptr[i + 1]
+        return zip(self.by_feature_chunk[a:b], self.by_feature_group[a:b])
+
+    def items(self) -> typ.Iterator[typ.Tuple[ConstructSymbol, typ.Dict]]:
+        """Iterate over chunks and their links, as in InterlevelAssociation."""
+
+        for c in range(len(self)):
+            yield self.chunk(c), {
+                self.dim_table[self.dims[g]]: (
+                    self.weights[g], set(self.features(g))
+                )
+                for g in self.groups(c)
+            }
@@ -0,0 +1,48 @@
+import unittest
+from array import array
+from pyClarion.base.symbols import *
+from pyClarion.base.packets import *
+
+
+class ArrayStrengthsTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.index = SymbolIndex([Chunk(1), Chunk(2), Chunk(3)])
+        self.strengths = ArrayStrengths(self.index, array('d', [.1, .2]))
+
+    def test_mapping_interface(self):
+
+        self.assertEqual(len(self.strengths), 2)
+        self.assertEqual(self.strengths[Chunk(2)], .2)
+        self.assertIn(Chunk(1), self.strengths)
+        self.assertNotIn(Chunk(3), self.strengths)
+        self.assertEqual(self.strengths.get(Chunk(3), 0.), 0.)
+        with self.assertRaises(KeyError):
+            self.strengths[Chunk(3)]
+        self.assertEqual(
+            dict(self.strengths.items()), {Chunk(1): .1, Chunk(2): .2}
+        )
+        self.assertEqual(self.strengths, {Chunk(1): .1, Chunk(2): .2})
+
+    def test_from_mapping(self):
+
+        index = SymbolIndex()
+        strengths = ArrayStrengths.from_mapping(
+            index, {Chunk(1): 1., Chunk(2): 2.}
+        )
+        self.assertEqual(list(strengths), [Chunk(1), Chunk(2)])
+        self.assertEqual(strengths[Chunk(2)], 2.)
+
+    def test_aligned(self):
+
+        other = ArrayStrengths(self.index, array('d', [0., 0.]))
+        self.assertTrue(self.strengths.aligned(other))
+        other = ArrayStrengths(self.index, array('d', [0., 0., 0.]))
+        self.assertFalse(self.strengths.aligned(other))
+        self.assertFalse(self.strengths.aligned({}))
+
+    def test_too_many_values(self):
+
+        with self.assertRaises(ValueError):
+            ArrayStrengths(self.index, array('d', [0.] * 4))
@@ -1,6 +1,9 @@
 import unittest
+import asyncio
+import warnings
 from pyClarion.base.symbols import *
 from pyClarion.base.realizers import *
+from pyClarion.base.packets import *
 
 
 class TestMayConnect(unittest.TestCase):
@@ -93,3 +96,527 @@ class TestAgentRealizerMayConnect(TestMayConnect):
             (Buffer(1, (Subsystem(1), Subsystem(2))), Subsystem(2),  True),
             (Buffer(1, (Subsystem(1), Subsystem(2))), Subsystem(3),  False),
         ]
+
+
+class TestSubsystemRealizerPlan(unittest.TestCase):
+
+    stages = (
+        lambda csym: csym.ctype == ConstructType.Chunk,
+        lambda csym: csym.ctype == ConstructType.Flow,
+    )
+
+    def setUp(self):
+
+        self.subsystem = make_subsystem(
+            Subsystem(1), [Chunk(1), Chunk(2), Flow(1, FlowType.TT)]
+        )
+
+    def test_plan_stages(self):
+
+        plan = self.subsystem.compile_plan(self.stages)
+        self.assertEqual(
+            [[m.__self__.csym for m in stage] for stage in plan],
+            [[Chunk(1), Chunk(2)], [Flow(1, FlowType.TT)]]
+        )
+
+    def test_plan_cached(self):
+
+        plan = self.subsystem.compile_plan(self.stages)
+        self.assertIs(self.subsystem.compile_plan(self.stages), plan)
+
+    def test_plan_invalidated_on_membership_change(self):
+
+        self.subsystem.compile_plan(self.stages)
+        self.subsystem.insert_realizers(make_realizer(Chunk(3)))
+        plan = self.subsystem.compile_plan(self.stages)
+        self.assertEqual(len(plan[0]), 3)
+        del self.subsystem[Chunk(1)]
+        plan = self.subsystem.compile_plan(self.stages)
+        self.assertEqual(len(plan[0]), 2)
+
+
+class TestIncrementalPropagation(unittest.TestCase):
+
+    def setUp(self):
+
+        self.calls = 0
+        self.strengths = {Chunk(1): 1.}
+
+        def junction(packets):
+            self.calls += 1
+            return {Chunk(1): max(p.strengths[Chunk(1)] for p in packets)}
+
+        self.subsystem = SubsystemRealizer(Subsystem(1))
+        self.subsystem.incremental = True
+        self.subsystem.insert_realizers(NodeRealizer(Chunk(1), junction))
+        self.buffer = BufferRealizer(
+            Buffer(1, (Subsystem(1),)), lambda: self.strengths
+        )
+        self.subsystem.input.watch(self.buffer.csym, self.buffer.output.view)
+
+    def test_unchanged_input_skipped(self):
+
+        node = self.subsystem[Chunk(1)]
+        self.buffer.propagate()
+        node.propagate()
+        node.propagate()
+        self.assertEqual(self.calls, 1)
+
+    def test_new_packet_recomputed(self):
+
+        node = self.subsystem[Chunk(1)]
+        self.buffer.propagate()
+        node.propagate()
+        self.strengths = {Chunk(1): 2.}
+        self.buffer.propagate()
+        node.propagate()
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(node.output.view().strengths[Chunk(1)], 2.)
+
+    def test_cleared_output_recomputed(self):
+
+        node = self.subsystem[Chunk(1)]
+        self.buffer.propagate()
+        node.propagate()
+        node.clear_activations()
+        node.propagate()
+        self.assertEqual(self.calls, 2)
+
+    def test_versioned_source(self):
+
+        class Source(object):
+            version = 0
+            def __call__(self):
+                return {}
+
+        buffer = BufferRealizer(Buffer(2, ()), Source())
+        buffer.incremental = True
+        buffer.propagate()
+        packet = buffer.output.view()
+        buffer.propagate()
+        self.assertIs(buffer.output.view(), packet)
+        buffer.source.version += 1
+        buffer.propagate()
+        self.assertIsNot(buffer.output.view(), packet)
+
+
+class TestDefaultStrength(unittest.TestCase):
+
+    def setUp(self):
+
+        def node_junction(packets, default_strength = None):
+            return {Chunk(1): default_strength(Chunk(1))}
+
+        def layer_junction(packets, default_strength = None):
+            return {Chunk(3): 1.}
+
+        def merge(packets):
+            d = {}
+            for packet in packets:
+                d.update(packet.strengths)
+            return d
+
+        def selector(strengths, choices = (), default_strength = None):
+            d = {csym: strengths.get(csym) for csym in choices}
+            return {csym: d[csym] or default_strength(csym) for csym in d}, ()
+
+        self.agent = AgentRealizer(Agent(1))
+        self.agent.default_strength = lambda csym: .5
+        self.subsystem = SubsystemRealizer(Subsystem(1))
+        self.agent.insert_realizers(self.subsystem)
+        self.subsystem.insert_realizers(
+            NodeRealizer(Chunk(1), node_junction), 
+            NodeRealizer(Chunk(2), lambda packets, default_strength: {}), 
+            NodeRealizer(Layer(1, [Chunk(3), Chunk(4)]), layer_junction), 
+            ResponseRealizer(Response(1, ConstructType.Chunk), merge, selector)
+        )
+
+    def test_inherited_by_members(self):
+
+        for realizer in self.subsystem.values():
+            with self.subTest(csym=str(realizer.csym)):
+                self.assertIs(
+                    realizer.default_strength, self.agent.default_strength
+                )
+
+    def test_missing_choices_take_default(self):
+
+        for realizer in self.subsystem.values():
+            realizer.propagate()
+        response = self.subsystem[Response(1, ConstructType.Chunk)]
+        self.assertEqual(
+            response.output.view().strengths, 
+            {Chunk(1): .5, Chunk(2): .5, Chunk(3): 1., Chunk(4): .5}
+        )
+
+
+class TestContainerWiring(unittest.TestCase):
+    """Bucketed wiring should agree with may_connect on all member pairs."""
+
+    def assertWiringMatches(self, container):
+
+        for target, realizer in container.items():
+            if not hasattr(realizer, "input"): 
+                continue
+            expected = {
+                source for source in container 
+                if container.may_connect(source, target)
+            }
+            if target.ctype in ConstructType.Node:
+                expected.update(container.input.input_links)
+            with self.subTest(i=str(target)):
+                self.assertEqual(set(realizer.input.input_links), expected)
+
+    def test_subsystem_wiring(self):
+
+        response = Response(1, ConstructType.Chunk)
+        members = [
+            Chunk(1), Chunk(2), Feature(1, 1), Feature(1, 2),
+            Flow(1, FlowType.TT), Flow(2, FlowType.TB), Flow(3, FlowType.BT), 
+            Flow(4, FlowType.BB), Flow(5, FlowType.TT | FlowType.BB), 
+            response, Response(2, ConstructType.Node | ConstructType.Flow),
+            Behavior(1, response)
+        ]
+        subsystem = make_subsystem(Subsystem(1), members)
+        subsystem.input.watch(Buffer(1, (Subsystem(1),)), lambda: None)
+        subsystem.insert_realizers(make_realizer(Chunk(3)))
+        self.assertWiringMatches(subsystem)
+        del subsystem[Chunk(1)]
+        del subsystem[Flow(1, FlowType.TT)]
+        self.assertWiringMatches(subsystem)
+
+    def test_agent_wiring(self):
+
+        agent = make_agent(
+            Agent(1),
+            subsystems={Subsystem(1): [], Subsystem(2): []},
+            buffers=[
+                Buffer(1, (Subsystem(1),)), 
+                Buffer(2, (Subsystem(1), Subsystem(2)))
+            ]
+        )
+        for subsystem in agent.subsystems:
+            with self.subTest(i=str(subsystem)):
+                self.assertEqual(
+                    set(agent[subsystem].input.input_links),
+                    {
+                        buffer for buffer in agent.buffers 
+                        if agent.may_connect(buffer, subsystem)
+                    }
+                )
+
+
+class TestInsertRealizers(unittest.TestCase):
+
+    def test_invalid_batch_not_inserted(self):
+
+        subsystem = SubsystemRealizer(Subsystem(1))
+        with self.assertRaises(ValueError):
+            subsystem.insert_realizers(
+                make_realizer(Chunk(1)), 
+                make_realizer(Buffer(1, (Subsystem(1),)))
+            )
+        self.assertEqual(len(subsystem), 0)
+
+    def test_batch_links_new_members_once(self):
+
+        calls = []
+        subsystem = make_subsystem(Subsystem(1), [Flow(1, FlowType.TT)])
+        flow_input = subsystem[Flow(1, FlowType.TT)].input
+        watch = flow_input.watch
+        flow_input.watch = lambda *args: calls.append(args) or watch(*args)
+        subsystem.insert_realizers(
+            make_realizer(Chunk(1)), make_realizer(Chunk(2))
+        )
+        self.assertEqual([args[0] for args in calls], [Chunk(1), Chunk(2)])
+
+
+class TestAgentRealizerExecutor(unittest.TestCase):
+
+    def make_agent(self, executor=None):
+
+        agent = AgentRealizer(Agent(1), executor=executor)
+        self.calls = []
+        for i in range(4):
+            agent.insert_realizers(
+                SubsystemRealizer(
+                    Subsystem(i), 
+                    lambda realizer: self.calls.append(realizer.csym)
+                )
+            )
+        return agent
+
+    def test_all_subsystems_propagated(self):
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            self.make_agent(executor).propagate()
+        self.assertEqual(
+            set(self.calls), {Subsystem(i) for i in range(4)}
+        )
+
+    def test_exceptions_reraised(self):
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        def fail(realizer):
+            raise RuntimeError()
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            agent = self.make_agent(executor)
+            agent[Subsystem(2)].propagation_rule = fail
+            with self.assertRaises(RuntimeError):
+                agent.propagate()
+
+    def test_process_executors_rejected(self):
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            with self.assertRaises(TypeError):
+                self.make_agent(executor)
+            agent = self.make_agent()
+            with self.assertRaises(TypeError):
+                agent.executor = executor
+
+
+class TestSubsystemRealizerSettle(unittest.TestCase):
+
+    def setUp(self):
+
+        self.sweeps = 0
+        flow = Flow(1, FlowType.TT)
+
+        def junction(packets):
+            return {Chunk(1): sum(p.strengths[Chunk(1)] for p in packets)}
+
+        def rule(realizer):
+            self.sweeps += 1
+            realizer[Chunk(1)].propagate()
+            realizer[flow].propagate()
+
+        # Chunk(1) settles at s = .5 + .5 * s, i.e., at 1.
+        self.subsystem = SubsystemRealizer(Subsystem(1), rule)
+        self.subsystem.insert_realizers(
+            NodeRealizer(Chunk(1), junction),
+            FlowRealizer(
+                flow, junction, lambda s: {Chunk(1): .5 * s[Chunk(1)]}
+            )
+        )
+        self.buffer = BufferRealizer(
+            Buffer(1, (Subsystem(1),)), lambda: {Chunk(1): .5}
+        )
+        self.subsystem.input.watch(self.buffer.csym, self.buffer.output.view)
+        self.buffer.propagate()
+
+    def strength(self):
+
+        return self.subsystem[Chunk(1)].output.view().strengths[Chunk(1)]
+
+    def test_converges(self):
+
+        iterations = self.subsystem.settle(tolerance=1e-6)
+        self.assertTrue(self.subsystem.converged)
+        self.assertEqual(iterations, self.sweeps)
+        self.assertLess(iterations, 100)
+        self.assertAlmostEqual(self.strength(), 1., places=5)
+
+    def test_iteration_cap(self):
+
+        self.assertEqual(self.subsystem.settle(max_iter=3), 3)
+        self.assertFalse(self.subsystem.converged)
+
+    def test_incremental_skips_settled_state(self):
+
+        self.subsystem.incremental = True
+        self.buffer.incremental = True
+        self.subsystem.settle()
+        sweeps = self.sweeps
+        self.assertEqual(self.subsystem.settle(), 0)
+        self.assertEqual(self.sweeps, sweeps)
+        self.subsystem.clear_activations()
+        self.assertGreater(self.subsystem.settle(), 0)
+
+    def test_new_input_resettled(self):
+
+        self.subsystem.incremental = True
+        self.subsystem.settle()
+        self.buffer.propagate()
+        self.assertGreater(self.subsystem.settle(), 0)
+        self.assertTrue(self.subsystem.converged)
+
+
+class TestAgentRealizerAsync(unittest.TestCase):
+
+    def setUp(self):
+
+        self.agent = AgentRealizer(Agent(1))
+        self.subsystem = SubsystemRealizer(Subsystem(1), lambda r: None)
+        self.agent.insert_realizers(self.subsystem)
+        self.response = Response(1, ConstructType.Chunk)
+        self.packet = DecisionPacket(
+            strengths={}, chosen=(Chunk(1),), origin=self.response
+        )
+
+    def add_behavior(self, name, effector):
+
+        behavior = BehaviorRealizer(Behavior(name, self.response), effector)
+        behavior.input.watch(self.response, lambda: self.packet)
+        self.subsystem.insert_realizers(behavior)
+
+    def test_behaviors_awaited_concurrently(self):
+
+        events = []
+
+        async def first(packet):
+            # Completes only if the second behavior runs in the meantime.
+            await asyncio.wait_for(self.event.wait(), timeout=1)
+            events.append(1)
+
+        async def second(packet):
+            self.event.set()
+            events.append(2)
+
+        async def run():
+            self.event = asyncio.Event()
+            await self.agent.aexecute()
+
+        self.add_behavior(1, first)
+        self.add_behavior(2, second)
+        asyncio.run(run())
+        self.assertEqual(events, [2, 1])
+
+    def test_sync_effectors(self):
+
+        calls = []
+        self.add_behavior(1, calls.append)
+        asyncio.run(self.agent.aexecute())
+        self.assertEqual(calls, [self.packet])
+
+    def test_sync_execute_rejects_async_effectors(self):
+
+        calls = []
+
+        async def effector(packet):
+            calls.append(packet)
+
+        self.add_behavior(1, effector)
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", RuntimeWarning)
+            with self.assertRaisesRegex(TypeError, "aexecute"):
+                self.agent.execute()
+        self.assertEqual(calls, [])
+        asyncio.run(self.agent.aexecute())
+        self.assertEqual(calls, [self.packet])
+
+    def test_async_sources(self):
+
+        async def source():
+            await asyncio.sleep(0)
+            return {Chunk(1): 1.}
+
+        buffer = BufferRealizer(Buffer(1, (Subsystem(1),)), source)
+        self.agent.insert_realizers(buffer)
+        asyncio.run(self.agent.apropagate())
+        self.assertEqual(buffer.output.view().strengths, {Chunk(1): 1.})
+
+    def test_updaters_awaited_in_order(self):
+
+        calls = []
+
+        async def updater():
+            await asyncio.sleep(0)
+            calls.append(1)
+
+        self.agent.attach(updater, lambda: calls.append(2))
+        asyncio.run(self.agent.alearn())
+        self.assertEqual(calls, [1, 2])
+
+
+class TestLazySubsystem(unittest.TestCase):
+
+    def setUp(self):
+
+        self.calls = []
+
+        def junction(csym, source):
+            def f(packets):
+                self.calls.append(csym)
+                return {
+                    csym: max(p.strengths.get(source, 0.) for p in packets)
+                }
+            return f
+
+        flow = Flow(1, FlowType.TB)
+        self.chunk_response = Response(1, ConstructType.Chunk)
+        self.feature_response = Response(2, ConstructType.Feature)
+        self.subsystem = SubsystemRealizer(Subsystem(1), self.eager)
+        self.subsystem.insert_realizers(
+            NodeRealizer(Chunk(1), junction(Chunk(1), Chunk(1))),
+            FlowRealizer(flow, junction(flow, Chunk(1)), lambda s: {
+                Feature(1, 1): 2 * s[flow]
+            }),
+            NodeRealizer(
+                Feature(1, 1), junction(Feature(1, 1), Feature(1, 1))
+            ),
+            ResponseRealizer(
+                self.chunk_response, 
+                junction(self.chunk_response, Chunk(1)), 
+                lambda s: (s, ())
+            ),
+            ResponseRealizer(
+                self.feature_response, 
+                junction(self.feature_response, Feature(1, 1)), 
+                lambda s: (s, ())
+            )
+        )
+        self.buffer = BufferRealizer(
+            Buffer(1, (Subsystem(1),)), lambda: {Chunk(1): .5}
+        )
+        self.subsystem.input.watch(self.buffer.csym, self.buffer.output.view)
+        self.buffer.propagate()
+
+    def eager(self, realizer):
+
+        for csym in realizer:
+            realizer[csym].propagate()
+
+    def view(self, csym):
+
+        return self.subsystem[csym].output.view()
+
+    def test_matches_eager(self):
+
+        self.subsystem.propagate()
+        eager = self.view(self.feature_response).strengths
+        self.subsystem.clear_activations()
+        self.subsystem.lazy = True
+        self.subsystem.propagate()
+        self.assertEqual(self.view(self.feature_response).strengths, eager)
+
+    def test_unused_branch_skipped(self):
+
+        self.subsystem.lazy = True
+        self.subsystem.propagate()
+        self.view(self.chunk_response)
+        self.assertEqual(set(self.calls), {self.chunk_response, Chunk(1)})
+
+    def test_memoized_within_step(self):
+
+        self.subsystem.lazy = True
+        self.subsystem.propagate()
+        self.view(self.feature_response)
+        self.view(self.feature_response)
+        self.view(self.chunk_response)
+        self.assertEqual(len(self.calls), len(set(self.calls)))
+        self.subsystem.propagate()
+        self.view(self.feature_response)
+        self.assertEqual(self.calls.count(Chunk(1)), 2)
+
+    def test_lazy_disabled(self):
+
+        self.subsystem.lazy = True
+        self.subsystem.lazy = False
+        self.view(self.feature_response)
+        self.assertEqual(self.calls, [])
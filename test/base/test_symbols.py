@@ -60,6 +60,12 @@ class ConstructFactoryTest(unittest.TestCase):
                 ConstructType.Chunk,
                 None
             ),
+            (
+                Layer,
+                ("name", (Chunk("name1"), Chunk("name2"))),
+                ConstructType.ChunkLayer,
+                LayerID
+            ),
             (
                 Flow, 
                 ("name", FlowType.TT), 
@@ -106,3 +112,75 @@ class ConstructFactoryTest(unittest.TestCase):
                 self.assertCtypeIs(csym, ctype)
                 if cid_type is not None:
                     self.assertCidTypeIs(csym, cid_type)
+
+
+    def test_layer_rejects_non_node_ctype(self):
+
+        for nodes in (
+            (), (Chunk(1), Feature("dim", "val")), (Subsystem("name"),)
+        ):
+            with self.subTest(nodes=nodes):
+                with self.assertRaises(ValueError):
+                    Layer("name", nodes)
+
+    def test_layer_ctype(self):
+
+        layer = Layer("name", [Feature("dim", 1), Feature("dim", 2)])
+        self.assertEqual(layer.ctype, ConstructType.FeatureLayer)
+        self.assertEqual(
+            layer.cid.nodes, (Feature("dim", 1), Feature("dim", 2))
+        )
+
+
+class SymbolIndexTest(unittest.TestCase):
+
+    def test_positions_stable(self):
+
+        index = SymbolIndex([Chunk(1), Chunk(2)])
+        index.add(Chunk(1))
+        index.add(Chunk(3))
+        self.assertEqual(list(index), [Chunk(1), Chunk(2), Chunk(3)])
+        self.assertEqual(index[Chunk(3)], 2)
+        self.assertEqual(index.symbol(1), Chunk(2))
+        self.assertIsNone(index.get(Chunk(4)))
+
+
+class ConstructSymbolInterningTest(unittest.TestCase):
+
+    def test_factories_return_canonical_instances(self):
+
+        self.assertIs(Feature("d", "v"), Feature("d", "v"))
+        self.assertIs(
+            Behavior(1, Response(1, ConstructType.Chunk)),
+            Behavior(1, Response(1, ConstructType.Chunk))
+        )
+
+    def test_sid(self):
+
+        csym = Chunk("sid test")
+        self.assertIsInstance(csym.sid, int)
+        self.assertIs(ConstructSymbol.from_sid(csym.sid), csym)
+        self.assertNotEqual(Chunk("sid test 2").sid, csym.sid)
+
+    def test_equality_and_hash_match_tuples(self):
+
+        csym = Chunk("APPLE")
+        self.assertEqual(csym, (ConstructType.Chunk, "APPLE"))
+        self.assertEqual(hash(csym), hash((ConstructType.Chunk, "APPLE")))
+        self.assertNotEqual(csym, Chunk("ORANGE"))
+
+    def test_copies_are_canonical(self):
+
+        import copy
+        import pickle
+
+        csym = Feature("color", "red")
+        self.assertIs(pickle.loads(pickle.dumps(csym)), csym)
+        self.assertIs(copy.deepcopy(csym), csym)
+        self.assertIs(csym._replace(cid=DVPair("color", "red")), csym)
+
+    def test_unhashable_not_interned(self):
+
+        csym = ConstructSymbol(ConstructType.Chunk, [1])
+        self.assertIsNone(csym.sid)
+        self.assertEqual(csym, ConstructSymbol(ConstructType.Chunk, [1]))
@@ -0,0 +1,136 @@
+import unittest
+import random
+from pyClarion.base.symbols import *
+from pyClarion.components.nacs import *
+from pyClarion.components.compiled import *
+
+
+def default_strength(csym):
+
+    return 0.0
+
+
+class CompiledChannelTest(unittest.TestCase):
+    """Compiled channels should agree with their dict-based counterparts."""
+
+    def setUp(self):
+
+        rng = random.Random(0)
+        chunks = [Chunk(i) for i in range(30)]
+        features = [Feature(d, v) for d in range(6) for v in range(3)]
+
+        self.rules = {
+            conc: [
+                {c: rng.random() for c in rng.sample(chunks, 3)}
+                for _ in range(rng.randint(1, 3))
+            ]
+            for conc in rng.sample(chunks, 15)
+        }
+        self.interlevel = {
+            ck: {
+                d: (rng.random(), set(rng.sample(features[3*d:3*d+3], 2)))
+                for d in rng.sample(range(6), 3)
+            }
+            for ck in rng.sample(chunks, 20)
+        }
+        self.strengths = {n: rng.random() for n in rng.sample(chunks, 10)}
+        self.strengths.update(
+            {n: rng.random() for n in rng.sample(features, 8)}
+        )
+
+    def assertChannelsAgree(self, expected_channel, channel):
+
+        expected = expected_channel(self.strengths)
+        actual = channel(self.strengths)
+        self.assertEqual(set(expected), set(actual))
+        for csym, s in expected.items():
+            with self.subTest(i=str(csym)):
+                self.assertAlmostEqual(s, actual[csym])
+
+    def test_associative_rules(self):
+
+        self.assertChannelsAgree(
+            AssociativeRuleCollection(self.rules, default_strength),
+            CompiledAssociativeRules(self.rules, default_strength)
+        )
+
+    def test_top_down_links(self):
+
+        self.assertChannelsAgree(
+            TopDownLinks(self.interlevel, default_strength),
+            CompiledTopDownLinks(self.interlevel, default_strength)
+        )
+
+    def test_bottom_up_links(self):
+
+        self.assertChannelsAgree(
+            BottomUpLinks(self.interlevel, default_strength),
+            CompiledBottomUpLinks(self.interlevel, default_strength)
+        )
+
+    def test_shared_index(self):
+
+        index = SymbolIndex()
+        CompiledTopDownLinks(self.interlevel, default_strength, index)
+        self.assertChannelsAgree(
+            AssociativeRuleCollection(self.rules, default_strength),
+            CompiledAssociativeRules(self.rules, default_strength, index)
+        )
+
+    def test_packed_channels(self):
+
+        index = SymbolIndex()
+        channels = [
+            (
+                TopDownLinks(self.interlevel, default_strength),
+                CompiledTopDownLinks(
+                    self.interlevel, default_strength, index, packed=True
+                )
+            ),
+            (
+                BottomUpLinks(self.interlevel, default_strength),
+                CompiledBottomUpLinks(
+                    self.interlevel, default_strength, index, packed=True
+                )
+            ),
+        ]
+        packed_input = ArrayStrengths.from_mapping(index, self.strengths)
+        for expected_channel, channel in channels:
+            expected = expected_channel(self.strengths)
+            actual = channel(packed_input)
+            self.assertIsInstance(actual, ArrayStrengths)
+            for csym in index:
+                with self.subTest(i=str(csym)):
+                    self.assertAlmostEqual(
+                        expected.get(csym, 0.0), actual[csym]
+                    )
+
+    def test_sparse_channels(self):
+
+        channels = [
+            (
+                TopDownLinks(self.interlevel, default_strength),
+                TopDownLinks(self.interlevel, default_strength, sparse=True),
+                CompiledTopDownLinks(
+                    self.interlevel, default_strength, sparse=True
+                )
+            ),
+            (
+                BottomUpLinks(self.interlevel, default_strength),
+                BottomUpLinks(self.interlevel, default_strength, sparse=True),
+                CompiledBottomUpLinks(
+                    self.interlevel, default_strength, sparse=True
+                )
+            ),
+        ]
+        for dense_channel, *sparse_channels in channels:
+            expected = {
+                csym: s for csym, s in dense_channel(self.strengths).items()
+                if s != 0.0
+            }
+            for channel in sparse_channels:
+                actual = channel(self.strengths)
+                self.assertEqual(set(expected), set(actual))
+                for csym, s in expected.items():
+                    with self.subTest(i=str(csym)):
+                        self.assertAlmostEqual(s, actual[csym])
@@ -0,0 +1,236 @@
+import unittest
+import asyncio
+import math
+import random
+from array import array
+from pyClarion.base import *
+from pyClarion.components.general import *
+
+
+class ArrayJunctionTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.index = SymbolIndex([Chunk(1), Chunk(2)])
+        self.packets = [
+            ActivationPacket(
+                ArrayStrengths(self.index, array('d', [.5, .1])), Chunk(1)
+            ),
+            ActivationPacket(
+                ArrayStrengths(self.index, array('d', [.2, .3])), Chunk(2)
+            )
+        ]
+
+    def test_simple_junction(self):
+
+        d = SimpleJunction()(self.packets)
+        self.assertIs(d, self.packets[-1].strengths)
+
+    def test_max_junction(self):
+
+        d = MaxJunction()(self.packets)
+        self.assertIsInstance(d, ArrayStrengths)
+        self.assertEqual(d, {Chunk(1): .5, Chunk(2): .3})
+
+    def test_max_junction_floors_negative_strengths(self):
+
+        packets = [
+            ActivationPacket(
+                ArrayStrengths(self.index, array('d', [-.5, .1])), Chunk(1)
+            ),
+            ActivationPacket(
+                ArrayStrengths(self.index, array('d', [-.2, -.3])), Chunk(2)
+            )
+        ]
+        d_array = MaxJunction()(packets)
+        d_dict = MaxJunction()(
+            ActivationPacket(dict(p.strengths), p.origin) for p in packets
+        )
+        self.assertEqual(d_array, {Chunk(1): 0., Chunk(2): .1})
+        self.assertEqual(d_dict, {Chunk(2): .1})
+        for node in self.index:
+            self.assertEqual(d_array[node], d_dict.get(node, 0.))
+
+    def test_filtered_junction(self):
+
+        d = FilteredSimpleJunction({Chunk(2): .5})(self.packets)
+        self.assertEqual(d, {Chunk(1): .2, Chunk(2): .15})
+        self.assertEqual(self.packets[-1].strengths[Chunk(2)], .3)
+
+    def test_mixed_packets_fall_back_to_dicts(self):
+
+        packets = self.packets + [
+            ActivationPacket({Chunk(3): 1.}, Chunk(3))
+        ]
+        d = MaxJunction()(packets)
+        self.assertEqual(d, {Chunk(1): .5, Chunk(2): .3, Chunk(3): 1.})
+
+
+class SimpleNodeJunctionTest(unittest.TestCase):
+
+    def test_missing_node_takes_default(self):
+
+        junction = SimpleNodeJunction(Chunk(1), lambda csym: -1.0)
+        packets = [
+            ActivationPacket({Chunk(2): .5}, Chunk(2)),
+            ActivationPacket({Chunk(3): .5}, Chunk(3))
+        ]
+        self.assertEqual(junction(packets), {Chunk(1): -1.0})
+        packets.append(ActivationPacket({Chunk(1): .2}, Chunk(1)))
+        self.assertEqual(junction(packets), {Chunk(1): .2})
+
+    def test_default_given_on_call(self):
+
+        packets = [ActivationPacket({Chunk(2): .5}, Chunk(2))]
+        junction = SimpleNodeJunction(Chunk(1))
+        self.assertEqual(
+            junction(packets, default_strength=lambda csym: .1), {Chunk(1): .1}
+        )
+        with self.assertRaises(ValueError):
+            junction(packets)
+        junction = SimpleNodeJunction(Chunk(1), lambda csym: -1.0)
+        self.assertEqual(
+            junction(packets, default_strength=lambda csym: .1), 
+            {Chunk(1): -1.0}
+        )
+
+
+class NodeLayerJunctionTest(unittest.TestCase):
+
+    def test_matches_simple_node_junctions(self):
+
+        def default_strength(csym):
+            return .1 if csym == Chunk(3) else 0.0
+
+        nodes = [Chunk(1), Chunk(2), Chunk(3), Chunk(4)]
+        packets = [
+            ActivationPacket({Chunk(1): .5, Chunk(2): .2}, Chunk(5)),
+            ActivationPacket({Chunk(2): -.3, Chunk(3): .05}, Chunk(6)),
+            ActivationPacket({Chunk(1): -.1, Chunk(5): .9}, Chunk(7))
+        ]
+        expected = {}
+        for node in nodes:
+            expected.update(SimpleNodeJunction(node, default_strength)(packets))
+        actual = NodeLayerJunction(nodes, default_strength)(packets)
+        self.assertEqual(actual, expected)
+
+
+class SelectorTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.index = SymbolIndex([Chunk(1), Feature("d", 1), Chunk(2)])
+        self.strengths = {Chunk(1): 1., Feature("d", 1): 5., Chunk(2): 2.}
+
+    def test_boltzmann_distribution(self):
+
+        selector = BoltzmannSelector(temperature=.5)
+        bd = selector.get_boltzmann_distribution(self.strengths)
+        z = math.exp(2.) + math.exp(4.)
+        self.assertEqual(set(bd), {Chunk(1), Chunk(2)})
+        self.assertAlmostEqual(bd[Chunk(1)], math.exp(2.) / z)
+        self.assertAlmostEqual(bd[Chunk(2)], math.exp(4.) / z)
+
+    def test_boltzmann_stable_at_low_temperature(self):
+
+        selector = BoltzmannSelector(temperature=1e-3)
+        bd, chosen = selector({Chunk(1): 1000., Chunk(2): 999.})
+        self.assertAlmostEqual(bd[Chunk(1)], 1.)
+        self.assertEqual(chosen, (Chunk(1),))
+
+    def test_categorical_stable_at_low_temperature(self):
+
+        selector = CategoricalSelector(temperature=1e-3)
+        cd = selector.get_categorical_distribution({Chunk(1): 4., Chunk(2): 2.})
+        self.assertAlmostEqual(cd[Chunk(1)], 1.)
+
+    def test_array_strengths(self):
+
+        selector = BoltzmannSelector(temperature=.5)
+        packed = ArrayStrengths.from_mapping(self.index, self.strengths)
+        self.assertEqual(
+            selector.get_boltzmann_distribution(packed),
+            selector.get_boltzmann_distribution(self.strengths)
+        )
+
+    def test_sample_and_select_many(self):
+
+        selector = CategoricalSelector()
+        samples = selector.sample(self.strengths, k=300, rng=random.Random(0))
+        self.assertEqual(len(samples), 300)
+        self.assertGreater(samples.count(Chunk(2)), samples.count(Chunk(1)))
+        results = selector.select_many([self.strengths, {Chunk(3): 1.}])
+        self.assertEqual(results[1], ({Chunk(3): 1.}, (Chunk(3),)))
+
+    def test_pruning(self):
+
+        strengths = {Chunk(i): float(i) for i in range(10)}
+        selector = BoltzmannSelector(temperature=1., top_k=3)
+        bd, chosen = selector(strengths)
+        self.assertEqual(list(bd), [Chunk(7), Chunk(8), Chunk(9)])
+        self.assertAlmostEqual(sum(bd.values()), 1.)
+        self.assertIn(chosen[0], bd)
+
+        selector = CategoricalSelector(threshold=5.)
+        self.assertEqual(
+            set(selector.get_categorical_distribution(strengths)),
+            {Chunk(i) for i in range(5, 10)}
+        )
+        selector = CategoricalSelector(top_k=2, threshold=8.5)
+        self.assertEqual(
+            selector.get_categorical_distribution(strengths), {Chunk(9): 1.}
+        )
+
+    def test_missing_choices_filled(self):
+
+        selector = BoltzmannSelector(temperature=1.)
+        choices = [Chunk(1), Chunk(2), Chunk(3), Feature("d", 1)]
+        for strengths in (
+            self.strengths, 
+            ArrayStrengths.from_mapping(self.index, self.strengths)
+        ):
+            with self.subTest(strengths=type(strengths).__name__):
+                bd, chosen = selector(
+                    strengths, choices, default_strength=lambda csym: 2.
+                )
+                self.assertEqual(list(bd), [Chunk(1), Chunk(2), Chunk(3)])
+                self.assertAlmostEqual(bd[Chunk(2)], bd[Chunk(3)])
+        bd, chosen = selector(self.strengths, choices)
+        self.assertEqual(list(bd), [Chunk(1), Chunk(2)])
+
+    def test_nothing_survives_pruning(self):
+
+        strengths = {Chunk(1): .1}
+        for selector in (
+            BoltzmannSelector(.1, threshold=.5), 
+            BoltzmannSelector(.1, top_k=0),
+            CategoricalSelector(threshold=.5)
+        ):
+            with self.subTest(selector=selector):
+                self.assertEqual(selector(strengths), ({}, ()))
+                self.assertEqual(selector.sample(strengths, k=3), ())
+
+
+class MappingEffectorTest(unittest.TestCase):
+
+    def test_sync_callbacks(self):
+
+        calls = []
+        effector = MappingEffector({Chunk(1): lambda: calls.append(1)})
+        packet = DecisionPacket({}, (Chunk(1),), Chunk(1))
+        self.assertIsNone(effector(packet))
+        self.assertEqual(calls, [1])
+
+    def test_async_callbacks_gathered(self):
+
+        calls = []
+
+        async def callback():
+            calls.append(1)
+
+        effector = MappingEffector(
+            {Chunk(1): callback, Chunk(2): lambda: calls.append(2)}
+        )
+        packet = DecisionPacket({}, (Chunk(1), Chunk(2)), Chunk(1))
+        asyncio.run(effector(packet))
+        self.assertEqual(sorted(calls), [1, 2])
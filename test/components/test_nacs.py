@@ -0,0 +1,417 @@
+import unittest
+import random
+from pyClarion.base.symbols import *
+from pyClarion.base.realizers import make_agent
+from pyClarion.components.nacs import *
+from pyClarion.components.general import (
+    ConstantSource, SimpleJunction, SimpleNodeJunction
+)
+
+
+def evaluate_rules(assoc, strengths, default_strength):
+    """Evaluate every rule in assoc, without indexing."""
+
+    d = {}
+    for conc, cond_list in assoc.items():
+        for conds in cond_list:
+            s = sum(
+                w * strengths.get(c, default_strength(c)) 
+                for c, w in conds.items()
+            )
+            if d.get(conc, default_strength(conc)) < s:
+                d[conc] = s
+    return d
+
+
+class AssociativeRuleCollectionTest(unittest.TestCase):
+
+    def setUp(self):
+
+        rng = random.Random(0)
+        self.chunks = [Chunk(i) for i in range(20)]
+        self.rules = [
+            (
+                rng.choice(self.chunks), 
+                {c: rng.random() for c in rng.sample(self.chunks, 2)}
+            )
+            for _ in range(30)
+        ]
+        self.strengths = {c: rng.random() for c in rng.sample(self.chunks, 3)}
+        self.strengths.update({c: 0.0 for c in self.chunks[:5]})
+        # A resting rule, firing with all conditions at default strength.
+        self.rules.append((Chunk("R"), {Chunk("X"): 2.}))
+
+    def default_strength(self, csym):
+
+        return .1 if csym == Chunk("X") else 0.0
+
+    def test_matches_full_evaluation(self):
+
+        assoc = {}
+        for conc, conds in self.rules:
+            assoc.setdefault(conc, []).append(conds)
+        channel = AssociativeRuleCollection(assoc, self.default_strength)
+        self.assertEqual(
+            channel(self.strengths), 
+            evaluate_rules(assoc, self.strengths, self.default_strength)
+        )
+        self.assertIn(Chunk("R"), channel(self.strengths))
+
+    def test_add_rule(self):
+
+        channel = AssociativeRuleCollection({}, self.default_strength)
+        for conc, conds in self.rules:
+            channel.add_rule(conc, conds)
+            self.assertEqual(
+                channel(self.strengths), 
+                evaluate_rules(
+                    channel.assoc, self.strengths, self.default_strength
+                )
+            )
+
+    def test_reindex(self):
+
+        channel = AssociativeRuleCollection(
+            {Chunk(1): [{Chunk(2): 1.}]}, self.default_strength
+        )
+        channel.assoc[Chunk(1)].append({Chunk(3): .5})
+        channel.reindex()
+        self.assertEqual(channel({Chunk(3): 1.}), {Chunk(1): .5})
+
+    def test_direct_changes_found(self):
+
+        channel = AssociativeRuleCollection(
+            {Chunk(1): [{Chunk(2): 1.}]}, self.default_strength
+        )
+        channel.assoc[Chunk(1)].append({Chunk(3): .5})
+        channel.assoc.setdefault(Chunk(4), []).append({Chunk(3): .25})
+        self.assertEqual(
+            channel({Chunk(3): 1.}), {Chunk(1): .5, Chunk(4): .25}
+        )
+        channel.assoc[Chunk(1)] = [{Chunk(2): .75}]
+        del channel.assoc[Chunk(4)]
+        self.assertEqual(channel({Chunk(3): 1.}), {})
+        self.assertEqual(channel({Chunk(2): 1.}), {Chunk(1): .75})
+
+    def test_same_size_changes_found(self):
+
+        assoc = {
+            Chunk("A"): [{Chunk(1): 1.}], 
+            Chunk("B"): [{Chunk(2): .25}]
+        }
+        channel = AssociativeRuleCollection(assoc, self.default_strength)
+        self.assertEqual(channel({Chunk(1): 1.}), {Chunk("A"): 1.})
+        # Moves one rule, leaving the total number of rules unchanged.
+        assoc[Chunk("A")].pop()
+        assoc[Chunk("B")].append({Chunk(1): .5})
+        self.assertEqual(channel({Chunk(1): 1.}), {Chunk("B"): .5})
+        # Replaces a rule in place.
+        assoc[Chunk("B")][1] = {Chunk(1): .75}
+        self.assertEqual(channel({Chunk(1): 1.}), {Chunk("B"): .75})
+        channel.add_rule(Chunk("A"), {Chunk(2): 1.})
+        channel.add_rule(Chunk("B"), {Chunk(2): .5})
+        strengths = {Chunk(1): 1., Chunk(2): 1.}
+        self.assertEqual(
+            channel(strengths), 
+            evaluate_rules(assoc, strengths, self.default_strength)
+        )
+
+
+def propagate_top_down(assoc, strengths, default_strength):
+    """Compute top-down strengths by walking assoc."""
+
+    d = {}
+    for chunk, dim_dict in assoc.items():
+        for dim, (weight, mfs) in dim_dict.items():
+            for mf in mfs:
+                s = weight * strengths.get(chunk, default_strength(chunk))
+                d[mf] = max(s, d.get(mf, default_strength(mf)))
+    return d
+
+
+def propagate_bottom_up(assoc, strengths, default_strength):
+    """Compute bottom-up strengths by walking assoc."""
+
+    d = {}
+    for chunk, dim_dict in assoc.items():
+        n_dim = len(dim_dict)
+        for dim, (weight, mfs) in dim_dict.items():
+            s_mf = max(strengths.get(mf, default_strength(mf)) for mf in mfs)
+            d[chunk] = (
+                d.get(chunk, default_strength(chunk)) + 
+                (weight * s_mf) / (n_dim ** 1.1)
+            )
+    return d
+
+
+class InterlevelLinksTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.rng = random.Random(0)
+        self.chunks = [Chunk(i) for i in range(20)]
+        self.features = [Feature(d, v) for d in range(5) for v in range(4)]
+        self.strengths = {
+            n: self.rng.random() 
+            for n in self.rng.sample(self.chunks + self.features, 12)
+        }
+
+    def default_strength(self, csym):
+
+        return 0.0
+
+    def random_links(self):
+
+        dims = self.rng.sample(range(5), self.rng.randint(1, 3))
+        return {
+            d: (
+                self.rng.random(), 
+                set(self.rng.sample(self.features[4*d:4*d+4], 2))
+            )
+            for d in dims
+        }
+
+    def assertChannelsCurrent(self, td, bu):
+
+        for channel, reference in (
+            (td, propagate_top_down), (bu, propagate_bottom_up)
+        ):
+            expected = reference(
+                td.assoc, self.strengths, self.default_strength
+            )
+            actual = channel(self.strengths)
+            self.assertEqual(set(expected), set(actual))
+            for csym, s in expected.items():
+                self.assertAlmostEqual(s, actual[csym])
+
+    def test_shared_links_patched(self):
+
+        td = TopDownLinks(
+            {c: self.random_links() for c in self.chunks[:10]}, 
+            self.default_strength
+        )
+        bu = BottomUpLinks(td.assoc, self.default_strength)
+        self.assertIs(td.assoc, bu.assoc)
+        self.assertChannelsCurrent(td, bu)
+
+        td.assoc[self.chunks[12]] = self.random_links()
+        td.assoc[self.chunks[3]] = self.random_links()
+        del td.assoc[self.chunks[5]]
+        self.assertChannelsCurrent(td, bu)
+
+        weight, mfs = td.assoc[self.chunks[0]].popitem()
+        td.assoc.touch(self.chunks[0])
+        self.assertChannelsCurrent(td, bu)
+
+    def test_plain_dict_shared(self):
+
+        data = {c: self.random_links() for c in self.chunks[:5]}
+        td = TopDownLinks(data, self.default_strength)
+        bu = BottomUpLinks(data, self.default_strength)
+        self.assertIs(td.assoc, bu.assoc)
+        td.assoc[self.chunks[8]] = self.random_links()
+        self.assertChannelsCurrent(td, bu)
+
+    def test_direct_changes_found(self):
+
+        data = {c: self.random_links() for c in self.chunks[:5]}
+        td = TopDownLinks(data, self.default_strength)
+        bu = BottomUpLinks(td.assoc, self.default_strength)
+        self.assertChannelsCurrent(td, bu)
+        data[self.chunks[7]] = self.random_links()
+        data[self.chunks[1]] = self.random_links()
+        del data[self.chunks[2]]
+        self.assertChannelsCurrent(td, bu)
+        data[self.chunks[2]] = data.pop(self.chunks[3])
+        self.assertChannelsCurrent(td, bu)
+
+    def test_changes_bounded_by_chunks(self):
+
+        class Channel(object):
+            pass
+
+        links = InterlevelLinks({c: self.random_links() for c in self.chunks})
+        channel = Channel()
+        self.assertIsNone(links.changes(channel))
+        for _ in range(100):
+            for chunk in self.chunks[:3]:
+                links[chunk] = self.random_links()
+        self.assertEqual(links.changes(channel), set(self.chunks[:3]))
+        self.assertEqual(links.changes(channel), set())
+
+    def test_reindex(self):
+
+        data = {c: self.random_links() for c in self.chunks[:5]}
+        td = TopDownLinks(data, self.default_strength)
+        bu = BottomUpLinks(td.assoc, self.default_strength)
+        data[self.chunks[7]] = self.random_links()
+        td.reindex()
+        bu.reindex()
+        self.assertChannelsCurrent(td, bu)
+
+    def test_feature_in_several_dimensions(self):
+
+        shared = self.features[0]
+        data = {
+            c: {0: (.5, {shared}), 1: (.25, {shared, self.features[5]})}
+            for c in self.chunks[:3]
+        }
+        td = TopDownLinks(data, self.default_strength)
+        bu = BottomUpLinks(td.assoc, self.default_strength)
+        self.strengths = {shared: 1., self.features[5]: .5}
+        self.assertChannelsCurrent(td, bu)
+
+        td.assoc[self.chunks[0]] = {2: (1., {self.features[9]})}
+        del td.assoc[self.chunks[1]]
+        self.strengths[self.features[9]] = .75
+        self.assertChannelsCurrent(td, bu)
+
+    def test_bottom_up_resting_strengths(self):
+
+        def default_strength(csym):
+            return .2 if csym in self.features[:6] else 0.0
+
+        assoc = {c: self.random_links() for c in self.chunks}
+        strengths = {self.features[10]: 1., self.features[0]: .2}
+        expected = propagate_bottom_up(assoc, strengths, default_strength)
+        for sparse in (False, True):
+            bu = BottomUpLinks(assoc, default_strength, sparse=sparse)
+            actual = bu(strengths)
+            with self.subTest(sparse=sparse):
+                self.assertEqual(
+                    set(actual), 
+                    {c for c, s in expected.items() if s != 0.0} 
+                    if sparse else set(expected)
+                )
+                for csym, s in actual.items():
+                    self.assertAlmostEqual(expected[csym], s)
+
+
+def make_nacs_agent():
+
+    nacs, response = Subsystem("NACS"), Response("Out", ConstructType.Chunk)
+    stimulus = Buffer("Stimulus", outputs=(nacs,))
+    rules = Flow("Rules", ftype=FlowType.TT)
+    top_down = Flow("Top Down", ftype=FlowType.TB)
+    bottom_up = Flow("Bottom Up", ftype=FlowType.BT)
+    chunks = [Chunk("A"), Chunk("B"), Chunk("C")]
+    features = [Feature("color", "red"), Feature("color", "green")]
+    agent = make_agent(
+        csym=Agent("A"),
+        subsystems={
+            nacs: chunks + features + [
+                rules, top_down, bottom_up, response
+            ]
+        },
+        buffers=[stimulus]
+    )
+    default = lambda csym: 0.0
+    links = {
+        Chunk("A"): {"color": (1., {features[0]})},
+        Chunk("C"): {"color": (.5, set(features))}
+    }
+    agent[stimulus].source = ConstantSource({Chunk("A"): 1.})
+    agent[nacs].propagation_rule = nacs_propagation_cycle
+    agent[nacs, rules].junction = SimpleJunction()
+    agent[nacs, rules].channel = AssociativeRuleCollection(
+        {Chunk("B"): [{Chunk("A"): .5}]}, default
+    )
+    agent[nacs, top_down].junction = SimpleJunction()
+    agent[nacs, top_down].channel = TopDownLinks(links, default)
+    agent[nacs, bottom_up].junction = SimpleJunction()
+    agent[nacs, bottom_up].channel = BottomUpLinks(links, default)
+    for node, realizer in agent[nacs].items_ctype(ConstructType.Node):
+        realizer.junction = SimpleNodeJunction(node, default)
+    agent[nacs, response].junction = SimpleJunction()
+    agent[nacs, response].selector = lambda s: (dict(s), ())
+    return agent, nacs, response
+
+
+class LazyPropagationTest(unittest.TestCase):
+
+    def test_matches_staged_cycle(self):
+
+        eager, nacs, response = make_nacs_agent()
+        lazy = make_nacs_agent()[0]
+        lazy[nacs].lazy_stages = NACS_PROPAGATION_STAGES
+        lazy[nacs].lazy = True
+        for agent in (eager, lazy):
+            agent[Buffer("Stimulus", (nacs,))].source.update(
+                {Chunk("B"): .5}
+            )
+        for step in range(3):
+            eager.propagate()
+            lazy.propagate()
+            with self.subTest(step=step):
+                self.assertEqual(
+                    lazy[nacs, response].output.view().strengths,
+                    eager[nacs, response].output.view().strengths
+                )
+
+    def test_cycles_require_stages(self):
+
+        agent, nacs, response = make_nacs_agent()
+        with self.assertRaises(ValueError):
+            agent[nacs].lazy = True
+
+
+class IncrementalPropagationTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.agent, self.nacs, self.response = make_nacs_agent()
+        self.agent.incremental = True
+        self.calls = []
+        for node, realizer in self.agent[self.nacs].items_ctype(
+            ConstructType.Node
+        ):
+            realizer.junction = self.count_calls(node, realizer.junction)
+
+    def count_calls(self, node, junction):
+
+        def counted(packets):
+            self.calls.append(node)
+            return junction(packets)
+
+        return counted
+
+    def present(self, agent, strengths):
+        """Present strengths anew and return nodes recomputed by agent."""
+
+        self.calls.clear()
+        agent[Buffer("Stimulus", (self.nacs,))].source.strengths = dict(
+            strengths
+        )
+        agent.propagate()
+        return set(self.calls)
+
+    def test_only_affected_nodes_recomputed(self):
+
+        stimulus = {Chunk("A"): 1.}
+        for _ in range(3):
+            self.present(self.agent, stimulus)
+        self.assertEqual(self.present(self.agent, stimulus), set())
+        stimulus[Chunk("B")] = .2
+        self.assertEqual(self.present(self.agent, stimulus), {Chunk("B")})
+        stimulus[Chunk("C")] = 2.
+        self.assertEqual(
+            self.present(self.agent, stimulus), 
+            {Chunk("C"), Feature("color", "green")}
+        )
+
+    def test_matches_full_propagation(self):
+
+        full = make_nacs_agent()[0]
+        stimuli = [
+            {Chunk("A"): 1.}, {Chunk("A"): 1.}, {Chunk("A"): .5}, 
+            {Chunk("C"): 1.}, {Chunk("C"): 1., Chunk("B"): .1}, {}
+        ]
+        key = (self.nacs, self.response)
+        for step, stimulus in enumerate(stimuli):
+            self.present(self.agent, stimulus)
+            self.present(full, stimulus)
+            with self.subTest(step=step):
+                self.assertEqual(
+                    self.agent[key].output.view().strengths,
+                    full[key].output.view().strengths
+                )
@@ -0,0 +1,208 @@
+import unittest
+import os
+import json
+import struct
+import tempfile
+from array import array
+from pyClarion import *
+
+
+NACS = Subsystem("NACS")
+STIMULUS = Buffer("Stimulus", outputs=(NACS,))
+RULES = Flow("Rules", ftype=FlowType.TT)
+TOP_DOWN = Flow("Top Down", ftype=FlowType.TB)
+BOTTOM_UP = Flow("Bottom Up", ftype=FlowType.BT)
+RESPONSE = Response("Output", itype=ConstructType.Chunk)
+CHUNKS = [Chunk("A"), Chunk("B"), Chunk("C")]
+FEATURES = [Feature("color", "red"), Feature("color", "green")]
+
+
+def default_strength(csym=None):
+
+    return 0.0
+
+
+def configure(agent):
+
+    agent[STIMULUS].source = ConstantSource()
+    agent[NACS].propagation_rule = nacs_propagation_cycle
+    agent[NACS, RULES].junction = SimpleJunction()
+    agent[NACS, RULES].channel = AssociativeRuleCollection(
+        default_strength=default_strength
+    )
+    agent[NACS, TOP_DOWN].junction = SimpleJunction()
+    agent[NACS, TOP_DOWN].channel = TopDownLinks(
+        default_strength=default_strength
+    )
+    agent[NACS, BOTTOM_UP].junction = SimpleJunction()
+    agent[NACS, BOTTOM_UP].channel = BottomUpLinks(
+        assoc=agent[NACS, TOP_DOWN].channel.assoc, 
+        default_strength=default_strength
+    )
+    for node, realizer in agent[NACS].items_ctype(ConstructType.Node):
+        realizer.junction = SimpleNodeJunction(node, default_strength)
+    agent[NACS, RESPONSE].junction = SimpleJunction()
+    agent[NACS, RESPONSE].selector = BoltzmannSelector(temperature=.1)
+
+
+def make_nacs_agent():
+
+    agent = make_agent(
+        csym=Agent("A"),
+        subsystems={
+            NACS: CHUNKS + FEATURES + [RULES, TOP_DOWN, BOTTOM_UP, RESPONSE]
+        },
+        buffers=[STIMULUS]
+    )
+    configure(agent)
+    agent[NACS, RULES].channel.add_rule(Chunk("B"), {Chunk("A"): .5})
+    agent[NACS, RULES].channel.add_rule(
+        Chunk("C"), {Chunk("A"): .25, Chunk("B"): .5}
+    )
+    links = agent[NACS, TOP_DOWN].channel.assoc
+    links[Chunk("A")] = {"color": (1., {FEATURES[0]})}
+    links[Chunk("C")] = {"color": (.5, set(FEATURES))}
+    agent[STIMULUS].source.update({Chunk("A"): 1.})
+    return agent
+
+
+class ArrayFileTest(unittest.TestCase):
+
+    def test_unstorable_header(self):
+
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        with self.assertRaises(TypeError):
+            write_array_file(path, {"value": object()}, {})
+
+    def test_round_trip(self):
+
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        arrays = {
+            "a": array('q', [1, 2, 3]), "b": array('d'), "c": array('d', [.5])
+        }
+        header = {
+            "name": "test",
+            "values": [None, True, 1, .5, (1, "a"), frozenset({2})],
+            "symbols": [Chunk(("x", 1)), FEATURES[0], STIMULUS, RESPONSE],
+            "table": {("a", 1): {"b"}},
+        }
+        write_array_file(path, header, arrays)
+        with ArrayFile(path) as f:
+            for key, value in header.items():
+                self.assertEqual(f.header[key], value)
+            for name, data in arrays.items():
+                view = f[name]
+                self.assertEqual(view.tolist(), data.tolist())
+                view.release()
+
+
+class SnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, self.path)
+
+    def test_round_trip(self):
+
+        agent = make_nacs_agent()
+        agent[NACS, TOP_DOWN].channel.assoc[Chunk("B")] = {}
+        agent.propagate()
+        save_snapshot(agent, self.path)
+        restored = load_snapshot(self.path, configure)
+
+        self.assertTrue(restored.ready())
+        self.assertEqual(
+            list(restored[NACS]), list(agent[NACS])
+        )
+        rules = restored[NACS, RULES].channel
+        self.assertIsInstance(rules.store, RuleStore)
+        self.assertEqual(rules.assoc, {})
+        self.assertEqual(
+            [(conc, conds) for conc, conds in rules.store.items()],
+            [
+                (conc, conds) 
+                for conc, cond_list in agent[NACS, RULES].channel.assoc.items()
+                for conds in cond_list
+            ]
+        )
+        links = restored[NACS, TOP_DOWN].channel
+        self.assertIsInstance(links.store, LinkStore)
+        self.assertEqual(dict(links.assoc), {})
+        expected = dict(agent[NACS, TOP_DOWN].channel.assoc)
+        del expected[Chunk("B")]
+        self.assertEqual(dict(links.store.items()), expected)
+        self.assertIs(links.store, restored[NACS, BOTTOM_UP].channel.store)
+        self.assertIs(links.assoc, restored[NACS, BOTTOM_UP].channel.assoc)
+        self.assertEqual(
+            restored[STIMULUS].source.strengths, {Chunk("A"): 1.}
+        )
+        for index in [(NACS, c) for c in CHUNKS] + [(NACS, RESPONSE)]:
+            with self.subTest(i=str(index[-1])):
+                self.assertEqual(
+                    restored[index].output.view(), 
+                    agent[index].output.view()
+                )
+
+        restored.clear_activations()
+        agent.clear_activations()
+        agent.propagate()
+        restored.propagate()
+        self.assertEqual(
+            restored[NACS, RESPONSE].output.view().strengths,
+            agent[NACS, RESPONSE].output.view().strengths
+        )
+
+    def test_copied_into_channels_with_store(self):
+
+        agent = make_nacs_agent()
+        save_snapshot(agent, self.path)
+        fd, store_path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, store_path)
+        write_rule_store(store_path, {Chunk("C"): [{Chunk("B"): 1.}]})
+        store = RuleStore(store_path)
+        self.addCleanup(store.close)
+
+        def store_configure(agent):
+            configure(agent)
+            agent[NACS, RULES].channel.store = store
+
+        restored = load_snapshot(self.path, store_configure)
+        self.assertIs(restored[NACS, RULES].channel.store, store)
+        self.assertEqual(
+            restored[NACS, RULES].channel.assoc,
+            agent[NACS, RULES].channel.assoc
+        )
+        self.assertIsInstance(
+            restored[NACS, TOP_DOWN].channel.store, LinkStore
+        )
+
+    def test_json_header(self):
+
+        save_snapshot(make_nacs_agent(), self.path)
+        with open(self.path, "rb") as f:
+            f.seek(8)
+            (n,) = struct.unpack("<Q", f.read(8))
+            json.loads(f.read(n))
+        with ArrayFile(self.path) as f:
+            self.assertIn(Feature("color", "red"), f.header["symbols"])
+            self.assertIn(TOP_DOWN, f.header["symbols"])
+
+    def test_incompatible_channel(self):
+
+        save_snapshot(make_nacs_agent(), self.path)
+
+        def bad_configure(agent):
+            configure(agent)
+            agent[NACS, RULES].channel = TopDownLinks(
+                default_strength=default_strength
+            )
+
+        with self.assertRaises(ValueError):
+            load_snapshot(self.path, bad_configure)
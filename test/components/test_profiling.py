@@ -0,0 +1,88 @@
+import unittest
+import asyncio
+from pyClarion import *
+from test.components.test_simulation import (
+    make_nacs_agent, extract_response
+)
+
+
+class ProfilerTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.agent = make_nacs_agent()
+        self.nacs = Subsystem("NACS")
+        self.rules = Flow("Rules", ftype=FlowType.TT)
+        stimulus = Buffer("Stimulus", outputs=(self.nacs,))
+        self.agent[stimulus].source.update({Chunk("A"): 1.})
+
+    def test_records_calls(self):
+
+        profiler = Profiler()
+        profiler.attach(self.agent)
+        self.agent.propagate()
+        self.agent.propagate()
+        index = (self.agent.csym, self.nacs, self.rules)
+        self.assertEqual(profiler.records[index, "channel"].calls, 2)
+        self.assertEqual(profiler.records[index, "propagate"].calls, 2)
+        self.assertGreater(profiler.records[index, "channel"].size, 0)
+        summary = profiler.summary()
+        self.assertEqual(
+            summary[ConstructType.Flow, FlowType.TT, "junction"].calls, 2
+        )
+        self.assertIn("Flow[TT].channel", profiler.report())
+
+    def test_detach_restores_realizers(self):
+
+        rules = self.agent[self.nacs, self.rules]
+        channel = rules.channel
+        profiler = Profiler()
+        profiler.attach(self.agent)
+        self.assertIsNot(rules.channel, channel)
+        self.assertIs(rules.channel.assoc, channel.assoc)
+        profiler.detach()
+        self.assertIs(rules.channel, channel)
+        self.assertNotIn("propagate", rules.__dict__)
+        self.agent.propagate()
+        index = (self.agent.csym, self.nacs, self.rules)
+        self.assertEqual(profiler.records[index, "channel"].calls, 0)
+
+    def test_streaming_agent(self):
+
+        stimulus = Buffer("Stimulus", outputs=(self.nacs,))
+        self.agent[stimulus].source = StreamingSource(
+            [{Chunk("A"): 1.}, {Chunk("B"): 1.}]
+        )
+        profiler = Profiler()
+        profiler.attach(self.agent)
+        self.assertIsInstance(self.agent[stimulus].source, StreamingSource)
+        self.assertIsInstance(
+            self.agent[self.nacs, self.rules].channel, 
+            AssociativeRuleCollection
+        )
+        steps = list(stream_trials(self.agent, extract_response))
+        self.assertEqual(len(steps), 2)
+        record = profiler.records[(self.agent.csym, stimulus), "source"]
+        self.assertEqual(record.calls, 2)
+        profiler.detach()
+
+    def test_async_sources(self):
+
+        stimulus = Buffer("Stimulus", outputs=(self.nacs,))
+
+        async def source():
+            await asyncio.sleep(0)
+            return {Chunk("A"): 1.}
+
+        self.agent[stimulus].source = source
+        profiler = Profiler()
+        profiler.attach(self.agent)
+        asyncio.run(self.agent.apropagate())
+        record = profiler.records[(self.agent.csym, stimulus), "source"]
+        self.assertEqual((record.calls, record.size), (1, 1))
+        record = profiler.records[(self.agent.csym, stimulus), "apropagate"]
+        self.assertEqual((record.calls, record.size), (1, 1))
+        self.assertEqual(
+            profiler.records[self.agent.csym, "apropagate"].calls, 1
+        )
+        profiler.detach()
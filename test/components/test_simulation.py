@@ -0,0 +1,191 @@
+import unittest
+from pyClarion import *
+
+
+def default_strength(csym=None):
+
+    return 0.0
+
+
+def make_nacs_agent(layered=False):
+
+    nacs = Subsystem("NACS")
+    stimulus = Buffer("Stimulus", outputs=(nacs,))
+    rules = Flow("Rules", ftype=FlowType.TT)
+    response = Response("Output", itype=ConstructType.Chunk)
+    chunks = [Chunk("A"), Chunk("B"), Chunk("C")]
+    layer = Layer("Chunks", chunks)
+    agent = make_agent(
+        csym=Agent("A"),
+        subsystems={
+            nacs: ([layer] if layered else chunks) + [rules, response]
+        },
+        buffers=[stimulus]
+    )
+    agent[stimulus].source = ConstantSource()
+    agent[nacs].propagation_rule = nacs_propagation_cycle
+    agent[nacs, rules].junction = SimpleJunction()
+    agent[nacs, rules].channel = AssociativeRuleCollection(
+        assoc={
+            Chunk("B"): [{Chunk("A"): .5}], 
+            Chunk("C"): [{Chunk("B"): .5}, {Chunk("A"): .25}]
+        },
+        default_strength=default_strength
+    )
+    if layered:
+        agent[nacs, layer].junction = NodeLayerJunction(
+            chunks, default_strength
+        )
+    for node, realizer in agent[nacs].items_ctype(ConstructType.Node):
+        if not layered:
+            realizer.junction = SimpleNodeJunction(node, default_strength)
+    agent[nacs, response].junction = SimpleJunction()
+    agent[nacs, response].selector = BoltzmannSelector(temperature=.1)
+    return agent
+
+
+class NodeLayerTest(unittest.TestCase):
+
+    def test_matches_node_realizers(self):
+
+        nacs = Subsystem("NACS")
+        stimulus = Buffer("Stimulus", outputs=(nacs,))
+        response = Response("Output", itype=ConstructType.Chunk)
+        agent, layered = make_nacs_agent(), make_nacs_agent(layered=True)
+        self.assertEqual(layered[nacs].nodes, [])
+        self.assertEqual(
+            [layer.ctype for layer in layered[nacs].layers], 
+            [ConstructType.ChunkLayer]
+        )
+        for i, strengths in enumerate([{Chunk("A"): 1.}, {Chunk("B"): 1.}]):
+            for a in (agent, layered):
+                a.clear_activations()
+                a[stimulus].source.strengths = strengths
+                a.propagate()
+            with self.subTest(i=i):
+                self.assertEqual(
+                    layered[nacs, response].output.view().strengths,
+                    agent[nacs, response].output.view().strengths
+                )
+
+
+def extract_response(agent):
+
+    realizer = agent[
+        Subsystem("NACS"), Response("Output", ConstructType.Chunk)
+    ]
+    return realizer.output.view().chosen
+
+
+def extract_strength(agent):
+
+    realizer = agent[Subsystem("NACS"), Chunk("C")]
+    return realizer.output.view().strengths[Chunk("C")]
+
+
+class TrialRunnerTest(unittest.TestCase):
+
+    def setUp(self):
+
+        stimulus = Buffer("Stimulus", outputs=(Subsystem("NACS"),))
+        self.stimuli = [
+            {stimulus: {Chunk("A"): 1.}} if i % 2 else {} for i in range(20)
+        ]
+
+    def test_results_in_order(self):
+
+        stimulus = Buffer("Stimulus", outputs=(Subsystem("NACS"),))
+        stimuli = [{stimulus: {Chunk("A"): float(i)}} for i in range(20)]
+        results = [
+            list(
+                TrialRunner(
+                    make_nacs_agent, extract_strength, processes=n, 
+                    shard_size=3, max_pending=2
+                ).run(iter(stimuli))
+            )
+            for n in (0, 3)
+        ]
+        # Each position gives a distinct result.
+        self.assertEqual(len(set(results[0])), 20)
+        self.assertEqual(results[0], [.25 * i for i in range(20)])
+        self.assertEqual(results[1], results[0])
+
+    def test_reproducible_across_process_counts(self):
+
+        results = [
+            list(
+                TrialRunner(
+                    make_nacs_agent, extract_response, processes=n, 
+                    shard_size=3, seed=1
+                ).run(self.stimuli)
+            )
+            for n in (0, 2)
+        ]
+        self.assertEqual(results[0], results[1])
+
+    def test_stimuli_consumed_lazily(self):
+
+        consumed = []
+
+        def stimuli():
+            while True:
+                consumed.append(None)
+                yield self.stimuli[len(consumed) % 2]
+
+        runner = TrialRunner(
+            make_nacs_agent, extract_response, processes=1, shard_size=2, 
+            max_pending=3
+        )
+        results = runner.run(stimuli())
+        for _ in range(5):
+            next(results)
+        results.close()
+        # Shards yielded so far (3), plus the pending window (3).
+        self.assertLessEqual(len(consumed), 6 * 2)
+
+
+class StreamTrialsTest(unittest.TestCase):
+
+    def test_lockstep_and_copy_on_write(self):
+
+        agent = make_nacs_agent()
+        nacs = Subsystem("NACS")
+        stimulus = Buffer("Stimulus", outputs=(nacs,))
+        deltas = [
+            {Chunk("A"): 1.}, {Chunk("A"): None, Chunk("B"): 1.}, {}
+        ]
+        agent[stimulus].source = StreamingSource(iter(deltas))
+        expected = [{Chunk("A"): 1.}, {Chunk("B"): 1.}, {Chunk("B"): 1.}]
+        for i, agent_ in enumerate(stream_trials(agent)):
+            packet = agent_[stimulus].output.view()
+            self.assertEqual(packet.strengths, expected[i])
+            self.assertEqual(
+                agent_[nacs, Chunk("C")].output.view().strengths[Chunk("C")],
+                0.5 if i > 0 else 0.25
+            )
+        self.assertEqual(i, 2)
+
+    def test_copy_on_write(self):
+
+        source = StreamingSource(
+            [{Chunk("A"): 1.}, {Chunk("B"): 1.}, {Chunk("A"): None}]
+        )
+        source.advance()
+        emitted = source()
+        source.advance()
+        # Handed out strengths are not mutated by later deltas.
+        self.assertEqual(emitted, {Chunk("A"): 1.})
+        self.assertIsNot(source(), emitted)
+        emitted = source()
+        source.release()
+        source.advance()
+        # Released strengths are updated in place.
+        self.assertIs(source(), emitted)
+        self.assertEqual(emitted, {Chunk("B"): 1.})
+        self.assertFalse(source.advance())
+        self.assertEqual(source.version, 3)
+
+    def test_requires_streaming_source(self):
+
+        with self.assertRaises(ValueError):
+            next(stream_trials(make_nacs_agent()))
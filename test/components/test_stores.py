@@ -0,0 +1,206 @@
+import unittest
+import os
+import random
+import tempfile
+from pyClarion.base.symbols import *
+from pyClarion.components.nacs import *
+from pyClarion.components.stores import *
+
+
+def default_strength(csym):
+
+    if csym.ctype == ConstructType.Feature:
+        return .1
+    return 0.0
+
+
+class StoreTestCase(unittest.TestCase):
+
+    def setUp(self):
+
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, self.path)
+        self.rng = random.Random(0)
+        self.chunks = [Chunk(i) for i in range(20)]
+        self.features = [
+            Feature(dim, val) for dim in range(4) for val in range(3)
+        ]
+
+    def open(self, cls):
+
+        store = cls(self.path)
+        self.addCleanup(store.close)
+        return store
+
+    def random_strengths(self, csyms):
+
+        strengths = {c: self.rng.random() for c in self.rng.sample(csyms, 6)}
+        strengths.update({c: default_strength(c) for c in csyms[:3]})
+        return strengths
+
+
+class RuleStoreTest(StoreTestCase):
+
+    def setUp(self):
+
+        super().setUp()
+        rng = self.rng
+        self.assoc = {}
+        for _ in range(30):
+            conds = {c: rng.random() for c in rng.sample(self.chunks, 2)}
+            self.assoc.setdefault(rng.choice(self.chunks), []).append(conds)
+        # A resting rule, firing with all conditions at default strength.
+        self.assoc[Chunk("R")] = [{Feature("x", 0): 2.}]
+        write_rule_store(self.path, self.assoc)
+
+    def test_items_round_trip(self):
+
+        store = self.open(RuleStore)
+        items = [
+            (conc, conds)
+            for conc, cond_list in self.assoc.items() for conds in cond_list
+        ]
+        self.assertEqual(len(store), len(items))
+        self.assertEqual(list(store.items()), items)
+
+    def test_store_with_overlay_matches_in_memory(self):
+
+        store = self.open(RuleStore)
+        channel = AssociativeRuleCollection(
+            default_strength=default_strength, store=store
+        )
+        combined = {
+            conc: list(cond_list) for conc, cond_list in self.assoc.items()
+        }
+        reference = AssociativeRuleCollection(
+            assoc=combined, default_strength=default_strength
+        )
+        for _ in range(5):
+            conc = self.rng.choice(self.chunks)
+            conds = {c: self.rng.random() for c in self.chunks[:2]}
+            channel.add_rule(conc, conds)
+            reference.add_rule(conc, conds)
+        for _ in range(10):
+            strengths = self.random_strengths(self.chunks)
+            self.assertEqual(channel(strengths), reference(strengths))
+
+
+class LinkStoreTest(StoreTestCase):
+
+    def setUp(self):
+
+        super().setUp()
+        rng = self.rng
+        self.assoc = {
+            chunk: {
+                dim: (
+                    rng.random(),
+                    {Feature(dim, val) for val in rng.sample(range(3), 2)}
+                )
+                for dim in rng.sample(range(4), rng.randint(1, 3))
+            }
+            for chunk in self.chunks
+        }
+        write_link_store(self.path, self.assoc)
+
+    def test_items_round_trip(self):
+
+        store = self.open(LinkStore)
+        self.assertEqual(dict(store.items()), self.assoc)
+        self.assertIsNone(store.position(Chunk("missing")))
+
+    def test_rejects_other_kinds(self):
+
+        with self.assertRaises(ValueError):
+            RuleStore(self.path)
+
+    def overlay(self):
+        """Return overlay links, replacing and removing some store links."""
+
+        return {
+            self.chunks[0]: {0: (.5, {self.features[0]})},
+            self.chunks[1]: {},
+            Chunk("new"): {1: (.75, set(self.features[3:6]))}
+        }
+
+    def check_channels(self, cls, sparse, strength_keys):
+
+        store = self.open(LinkStore)
+        channel = cls(
+            default_strength=default_strength, sparse=sparse, store=store
+        )
+        combined = dict(self.assoc)
+        reference = cls(
+            assoc=combined, default_strength=default_strength, sparse=sparse
+        )
+        for chunk, dim_dict in self.overlay().items():
+            channel.assoc[chunk] = dim_dict
+            reference.assoc[chunk] = dim_dict
+        strength_keys = strength_keys + [Chunk("new")]
+        for _ in range(10):
+            strengths = self.random_strengths(strength_keys)
+            self.assertEqual(channel(strengths), reference(strengths))
+
+        # Removing overlay links restores store links.
+        del channel.assoc[self.chunks[0]]
+        reference.assoc[self.chunks[0]] = self.assoc[self.chunks[0]]
+        strengths = self.random_strengths(strength_keys)
+        self.assertEqual(channel(strengths), reference(strengths))
+
+    def test_store_read_on_demand(self):
+
+        store = self.open(LinkStore)
+        seen = []
+
+        def counted(csym):
+            seen.append(csym)
+            return default_strength(csym)
+
+        def seen_of(ctype):
+            return {csym for csym in seen if csym.ctype == ctype}
+
+        chunk, feature = self.chunks[0], self.features[0]
+        top_down = TopDownLinks(default_strength=counted, store=store)
+        bottom_up = BottomUpLinks(default_strength=counted, store=store)
+        self.assertEqual(seen, [])
+
+        strengths = top_down({chunk: 1.})
+        linked = set().union(*(mfs for w, mfs in self.assoc[chunk].values()))
+        self.assertEqual(seen_of(ConstructType.Feature), linked)
+        seen.clear()
+        other = next(mf for mf in self.features if mf not in linked)
+        strengths.get(other)
+        self.assertEqual(seen_of(ConstructType.Feature), {other})
+
+        seen.clear()
+        strengths = bottom_up({feature: 1.})
+        linked = {
+            chunk for chunk, dim_dict in self.assoc.items() 
+            if any(feature in mfs for w, mfs in dim_dict.values())
+        }
+        self.assertEqual(seen_of(ConstructType.Chunk), linked)
+        seen.clear()
+        other = next(chunk for chunk in self.chunks if chunk not in linked)
+        strengths.get(other)
+        self.assertEqual(seen_of(ConstructType.Chunk), {other})
+
+    def test_top_down(self):
+
+        self.check_channels(TopDownLinks, False, self.chunks)
+
+    def test_top_down_sparse(self):
+
+        self.check_channels(TopDownLinks, True, self.chunks)
+
+    def test_bottom_up(self):
+
+        self.check_channels(BottomUpLinks, False, self.features)
+
+    def test_bottom_up_sparse(self):
+
+        self.check_channels(BottomUpLinks, True, self.features)
+
+
+if __name__ == "__main__":
+    unittest.main()